@@ -2,6 +2,8 @@
 ASGI config for IMDB project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests are routed through IMDB/asgi_urls.py, which serves the read endpoints
+with async views.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -9,8 +11,22 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'IMDB.settings')
 
-application = get_asgi_application()
+ASGI_URLCONF = 'IMDB.asgi_urls'
+
+
+class AsyncURLConfHandler(ASGIHandler):
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = ASGI_URLCONF
+        return request, error_response
+
+
+# What get_asgi_application() does, with the handler above.
+django.setup(set_prefix=False)
+application = AsyncURLConfHandler()
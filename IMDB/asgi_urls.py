@@ -0,0 +1,15 @@
+"""
+URL configuration used by IMDB/asgi.py.
+
+Identical to IMDB/urls.py except that the watchlist read endpoints are served
+by the async views in watchlist/async_views.py.
+"""
+from django.contrib import admin
+from django.urls import path, include
+
+
+urlpatterns = [
+    path('', include('watchlist.async_urls')),
+    path('auth/', include('auth_app.urls')),
+    path('admin/', admin.site.urls)
+]
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +48,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover the rest of the stack.
+    'watchlist.metrics.MetricsMiddleware',
+    'watchlist.replicas.ReplicaPinMiddleware',
+    # Above every middleware that sets or reads the response body.
+    'watchlist.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,7 +83,8 @@ TEMPLATES = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         # 'rest_framework.authentication.TokenAuthentication'
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication with cached users and a Bloom-filtered blacklist
+        'auth_app.authentication.CachedJWTAuthentication',
     ],
     
     'DEFAULT_THROTTLE_RATES': {
@@ -90,6 +98,19 @@ REST_FRAMEWORK = {
     # 'DEFAULT_RENDERER_CLASSES': (
     #     'rest_framework.renderers.JSONRenderer',
     # )
+    'DEFAULT_RENDERER_CLASSES': [
+        # Same output as JSONRenderer, faster when orjson is installed
+        'watchlist.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
+    # "database is locked" becomes a 503 with Retry-After, see watchlist.db
+    'EXCEPTION_HANDLER': 'watchlist.db.exception_handler',
 
     # Global Pagination
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
@@ -97,6 +118,47 @@ REST_FRAMEWORK = {
 
 }
 
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'auth_app.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'auth_app.serializers.TokenRefreshSerializer',
+}
+
+# Authenticated users are cached this many seconds, see
+# auth_app.authentication.CachedJWTAuthentication. Users saved or deleted in
+# this process are dropped at once; other workers see the change on expiry.
+AUTH_USER_CACHE_SECONDS = 30
+
+# How often each process reads tokens blacklisted by other processes, see
+# auth_app.revocation.RevokedTokens.
+TOKEN_BLACKLIST_SYNC_SECONDS = 1
+
+# Where revoked tokens are kept, see auth_app.revocation: 'simplejwt' for the
+# token_blacklist tables, which also hold every refresh token issued, or
+# 'compact' for auth_app.RevokedToken, which holds only the jti and expiry of
+# revoked tokens. Revocations are not carried over when switching. Expired
+# tokens are deleted from both by ``manage.py prune_tokens``.
+TOKEN_BLACKLIST_STORE = 'simplejwt'
+
+# DRF authtoken keys for TokenAuthentication, created with every user when
+# True. Requests authenticate with JWT, so nothing reads them.
+CREATE_AUTH_TOKENS = False
+
+# Sign-ups hash passwords on a pool of PASSWORD_HASH_WORKERS threads, with up
+# to PASSWORD_HASH_QUEUE more waiting; others get a 503 at once, see
+# auth_app.hashing.PasswordHasherPool.
+PASSWORD_HASH_WORKERS = os.cpu_count() or 1
+PASSWORD_HASH_QUEUE = 2 * PASSWORD_HASH_WORKERS
+
+# MessagePack (``application/msgpack``) is negotiated through Accept and
+# Content-Type when the msgpack package is installed.
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('watchlist.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('watchlist.parsers.MessagePackParser')
+
+# Smallest response body, in bytes, that watchlist.compression.CompressionMiddleware
+# compresses; below about a kilobyte the saving does not pay for the CPU time.
+COMPRESSION_MIN_SIZE = 1024
+
 WSGI_APPLICATION = 'IMDB.wsgi.application'
 
 
@@ -105,11 +167,140 @@ WSGI_APPLICATION = 'IMDB.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Django's SQLite backend, retrying BEGIN on a busy database
+        'ENGINE': 'watchlist.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Keep connections across requests, so SQLITE_PRAGMAS run once per
+        # connection rather than once per request.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Transactions take the write lock when they begin. Writers then
+            # queue on busy_timeout, retried SQLITE_BEGIN_RETRIES times,
+            # instead of failing with "database is locked" when a read lock
+            # cannot be upgraded. A writer still waiting after that gets a 503;
+            # write transactions must stay short.
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # A file-backed test database lets concurrency tests use real connections
+        # from several threads; in-memory SQLite cannot be shared that way.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    # Read replica. Locally a second SQLite file stands in for it, refreshed
+    # from the primary with ``manage.py sync_replica``.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DATABASE_REPLICA_PATH', BASE_DIR / 'replica.sqlite3'),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            'NAME': BASE_DIR / 'test_replica.sqlite3',
+        },
+    },
 }
 
+# Reads are spread over these aliases, see watchlist.replicas.ReplicaRouter;
+# the replica is only used when DATABASE_REPLICA_PATH is set.
+DATABASE_REPLICAS = ['replica'] if os.environ.get('DATABASE_REPLICA_PATH') else []
+DATABASE_ROUTERS = ['watchlist.replicas.ReplicaRouter']
+
+# After writing, a client reads from the primary for this many seconds, which
+# must exceed the replication lag (the sync_replica interval locally).
+REPLICA_PIN_SECONDS = 10
+# Holds the pins of clients sending an Authorization header, see
+# watchlist.replicas.ReplicaPinMiddleware. The default cache is per process,
+# so with several workers point this at a shared cache.
+REPLICA_PIN_CACHE = 'default'
+
+# Applied to every new SQLite connection, see watchlist.db.configure_sqlite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL', # Readers and the writer no longer block each other
+    'synchronous': 'NORMAL', # Sync at checkpoints only; durable enough with WAL
+    'busy_timeout': 5000, # Milliseconds a connection waits for a lock
+    'cache_size': -20000, # Page cache per connection, in KiB
+    'mmap_size': 256 * 1024 * 1024, # Read pages through a memory map
+    'temp_store': 'MEMORY',
+}
+
+# Extra attempts at BEGIN IMMEDIATE after busy_timeout ran out, each waiting
+# busy_timeout again; then the request gets a 503 asking the client to retry
+# after DATABASE_BUSY_RETRY_AFTER seconds.
+SQLITE_BEGIN_RETRIES = 2
+DATABASE_BUSY_RETRY_AFTER = 1
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Serialized movie and platform payloads, see watchlist.cache.ResponseCache.
+    # LocMemCache moves entries to the end on every read and culls from the
+    # front, so MAX_ENTRIES makes it a bounded LRU. It is per process: entries
+    # invalidated in another worker, or by a management command, expire after
+    # TIMEOUT seconds. Point it at a shared backend (Redis, Memcached) to
+    # invalidate across processes.
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+
+# Request metrics
+# Exported at /metrics, see watchlist.metrics. Set METRICS_DIR to a directory
+# shared by all worker processes of one server so /metrics reports their sum;
+# each process writes its totals there every METRICS_FLUSH_INTERVAL seconds.
+
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+
+
+# Ratings
+# Prior of the Bayesian average used to order movies by rating, see
+# watchlist.models.bayesian_rating: every movie counts as if it had
+# RATING_PRIOR_WEIGHT extra ratings of RATING_PRIOR_MEAN stars.
+
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_WEIGHT = 10
+
+# Movies need this many ratings to be ranked on the leaderboards. Run
+# ``manage.py rebuild_ratings`` after changing it or the prior.
+LEADERBOARD_MIN_VOTES = 5
+
+
+# Batch requests
+# Most ids one ``?ids=`` list request may name, and most items one batch
+# create or update may carry, see watchlist.filters.IdsFilter and
+# watchlist.batch.
+
+BATCH_MAX_ITEMS = 100
+
+
+# Change feed
+# Most entries one page of /changes/ returns, see watchlist.changes.ChangeFeed.
+
+CHANGES_PAGE_SIZE = 500
+
+
+# Rate limiting
+# DRF throttles count requests in this SQLite file, shared by every worker
+# process on the host, see watchlist.throttling.SlidingWindowStore.
+
+THROTTLE_STORE_PATH = os.environ.get('THROTTLE_STORE_PATH', BASE_DIR / 'throttle.sqlite3')
+
+# Points the throttle store at a scratch file while tests run.
+TEST_RUNNER = 'IMDB.test_runner.TestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner that keeps rate limit counters out of the development
+    throttle store: every run starts from an empty one in a temporary directory.
+    """
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.throttle_directory = tempfile.TemporaryDirectory()
+        self.throttle_settings = override_settings(
+            THROTTLE_STORE_PATH=os.path.join(self.throttle_directory.name, 'throttle.sqlite3'),
+        )
+        self.throttle_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.throttle_settings.disable()
+        self.throttle_directory.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,76 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ups at once, try again in a moment.'
+    default_code = 'password_hashing_busy'
+
+
+class PasswordHasherPool:
+    """
+    Password hashing on a fixed pool of worker threads, which limits how many
+    sign-ups hash at once.
+
+    Password hashers are slow on purpose, and a caller still waits for its own
+    hash. What the pool bounds is how many callers do: at most ``workers``
+    passwords are hashed at once and at most ``queue`` more wait for a worker.
+    A caller that finds no room gets PasswordHashingBusy (503) at once rather
+    than joining the wait, so a burst of sign-ups cannot occupy every request
+    thread. hashlib releases the GIL while hashing, so the workers hash in
+    parallel.
+
+    The threads are started on first use in each process, so the pool is
+    safe to create before a server forks its workers.
+    """
+    def __init__(self, workers=None, queue=None):
+        self.workers = workers
+        self.queue = queue
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _start(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                workers = self.workers or settings.PASSWORD_HASH_WORKERS
+                queue = self.queue if self.queue is not None else settings.PASSWORD_HASH_QUEUE
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+                self._slots = threading.BoundedSemaphore(workers + queue)
+                self._pid = os.getpid()
+        return self._executor
+
+    def make_password(self, password):
+        """
+        ``django.contrib.auth.hashers.make_password`` on the pool.
+        """
+        executor = self._executor if self._pid == os.getpid() else self._start()
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy()
+        try:
+            return executor.submit(make_password, password).result()
+        finally:
+            self._slots.release()
+
+    def map(self, passwords):
+        """
+        Hash many passwords in parallel and return the hashes in order. For
+        batch jobs: the call waits for the pool rather than giving up.
+        """
+        executor = self._executor if self._pid == os.getpid() else self._start()
+        return list(executor.map(make_password, passwords))
+
+    def shutdown(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._executor.shutdown()
+            self._pid = None
+
+
+password_hasher = PasswordHasherPool()
@@ -0,0 +1,39 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.provisioning import UserProvisioner
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file ('-' reads standard input) with a username column "
+        "and optional email, password and password_hash columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row, or '-' for stdin.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Users validated and inserted per batch.")
+        parser.add_argument('--workers', type=int, help="Threads hashing passwords; defaults to PASSWORD_HASH_WORKERS.")
+        parser.add_argument('--max-errors', type=int, default=100, help="Invalid rows to report in detail.")
+
+    def handle(self, *args, **options):
+        provisioner = UserProvisioner(
+            batch_size=options['batch_size'], workers=options['workers'], max_errors=options['max_errors'],
+        )
+        try:
+            if options['path'] == '-':
+                summary = provisioner.run(sys.stdin)
+            else:
+                with open(options['path'], encoding='utf-8', newline='') as feed:
+                    summary = provisioner.run(feed)
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        for error in summary['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['created']} users, skipped {summary['skipped']} existing usernames, "
+            f"rejected {summary['failed']} rows."
+        ))
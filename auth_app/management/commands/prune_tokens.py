@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.revocation import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired tokens from the token blacklist stores in small batches, "
+        "once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows deleted per transaction.")
+        parser.add_argument('--pause', type=float, default=0.05, help="Seconds to wait between batches.")
+        parser.add_argument('--interval', type=float, help="Keep pruning, waiting this many seconds between runs.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        while True:
+            start = time.perf_counter()
+            deleted = prune_expired_tokens(options['batch_size'], options['pause'])
+            summary = ', '.join(f"{count} {label}" for label, count in sorted(deleted.items())) or "nothing"
+            self.stdout.write(f"Pruned {summary} in {(time.perf_counter() - start) * 1000:.1f} ms.")
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
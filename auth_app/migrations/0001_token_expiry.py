@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        # simplejwt does not index expiry, which the pruner and the revocation
+        # filter select on. The table belongs to token_blacklist, so the index
+        # is created here rather than declared on its model.
+        migrations.RunSQL(
+            'CREATE INDEX outstandingtoken_expires_at_idx ON token_blacklist_outstandingtoken (expires_at)',
+            'DROP INDEX outstandingtoken_expires_at_idx',
+        ),
+    ]
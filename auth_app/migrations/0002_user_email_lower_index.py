@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0001_token_expiry'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        # Sign-up checks emails ignoring case, see auth_app.serializers.users_with_email.
+        # auth_user belongs to django.contrib.auth, so the index is created here.
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_lower_idx ON auth_user (LOWER(email))',
+            'DROP INDEX auth_user_email_lower_idx',
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0002_user_email_lower_index'),
+    ]
+
+    operations = [
+        # Two sign-ups with one email can both pass the check in
+        # RegistrationSerializer.save; the unique index turns the later one
+        # away. Users without an email are left out.
+        migrations.RunSQL(
+            [
+                "CREATE UNIQUE INDEX auth_user_email_lower_uniq ON auth_user (LOWER(email)) WHERE email <> ''",
+                'DROP INDEX auth_user_email_lower_idx',
+            ],
+            [
+                'CREATE INDEX auth_user_email_lower_idx ON auth_user (LOWER(email))',
+                'DROP INDEX auth_user_email_lower_uniq',
+            ],
+        ),
+    ]
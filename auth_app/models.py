@@ -6,5 +6,17 @@ from rest_framework.authtoken.models import Token
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
-    if created:
+    if created and settings.CREATE_AUTH_TOKENS:
         Token.objects.create(user=instance)
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked token in the compact blacklist store: only its ``jti`` and when
+    it expires, see ``TOKEN_BLACKLIST_STORE``.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,138 @@
+import csv
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+
+from auth_app.hashing import PasswordHasherPool
+from auth_app.serializers import users_with_email
+
+
+class UserProvisionSerializer(serializers.Serializer):
+    """
+    One row of a user CSV. The password is given either in clear, to be
+    hashed, or already hashed in a format Django's hashers know. Users with
+    neither get an unusable password.
+    """
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(required=False, allow_blank=True, default='')
+    password = serializers.CharField(required=False, allow_blank=True, trim_whitespace=False)
+    password_hash = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_password_hash(self, value):
+        if value:
+            try:
+                identify_hasher(value)
+            except ValueError:
+                raise serializers.ValidationError('Unknown password hash format.')
+        return value
+
+
+class UserProvisioner:
+    """
+    Stream users from CSV into the database.
+
+    Rows are read lazily and handled in batches: every batch is validated,
+    checked against existing usernames and emails with two set-based queries,
+    its passwords are hashed in parallel on a PasswordHasherPool of
+    ``workers`` threads, and it is inserted with ``bulk_create`` in one
+    transaction. Memory use depends on the batch size, not on the size of
+    the input.
+
+    Users whose username already exists are skipped, so an interrupted run
+    can be repeated. Emails are unique ignoring case. Invalid rows are
+    reported with their line number, up to ``max_errors`` of them.
+    """
+    def __init__(self, batch_size=1000, workers=None, max_errors=100):
+        self.batch_size = batch_size
+        self.hasher = PasswordHasherPool(workers=workers, queue=0)
+        self.max_errors = max_errors
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, lines):
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is None or 'username' not in reader.fieldnames:
+            raise ValueError("The CSV header must name a 'username' column.")
+        # Line 1 is the header.
+        numbered = ((reader.line_num, row) for row in reader)
+        try:
+            while True:
+                batch = list(islice(numbered, self.batch_size))
+                if not batch:
+                    break
+                self.provision_batch(batch)
+        finally:
+            self.hasher.shutdown()
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+    def provision_batch(self, batch):
+        rows = []
+        for line_number, row in batch:
+            # DictReader fills short rows with None and puts extra fields under None.
+            serializer = UserProvisionSerializer(data={
+                key: value for key, value in row.items() if key is not None and value is not None
+            })
+            if serializer.is_valid():
+                rows.append((line_number, serializer.validated_data))
+            else:
+                self.fail(line_number, serializer.errors)
+        if not rows:
+            return
+
+        existing_usernames = set(
+            User.objects.filter(username__in={row['username'] for _, row in rows}).values_list('username', flat=True)
+        )
+        emails = {User.objects.normalize_email(row['email']) for _, row in rows if row['email']}
+        taken_emails = {email.lower() for email in users_with_email(*emails).values_list('email', flat=True)}
+
+        accepted = []
+        for line_number, row in rows:
+            email = User.objects.normalize_email(row['email'])
+            if row['username'] in existing_usernames:
+                self.skipped += 1
+            elif email and email.lower() in taken_emails:
+                self.fail(line_number, {'email': ['Email already used.']})
+            else:
+                existing_usernames.add(row['username'])
+                if email:
+                    taken_emails.add(email.lower())
+                accepted.append((row, email))
+        if not accepted:
+            return
+
+        hashes = iter(self.hasher.map([row['password'] for row, _ in accepted if row.get('password')]))
+        users = []
+        for row, email in accepted:
+            if row.get('password'):
+                password = next(hashes)
+            else:
+                password = row.get('password_hash') or make_password(None)
+            users.append(User(username=row['username'], email=email, password=password))
+
+        # bulk_create skips the post_save receiver that creates auth tokens.
+        with transaction.atomic():
+            users = User.objects.bulk_create(users)
+            if settings.CREATE_AUTH_TOKENS:
+                Token.objects.bulk_create(Token(key=Token.generate_key(), user=user) for user in users)
+        self.created += len(users)
+
+    def fail(self, line_number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line_number, 'errors': errors})
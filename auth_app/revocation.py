@@ -0,0 +1,249 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import BlacklistMixin
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from auth_app.models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed bit array: no false negatives, false positives at
+    about ``error_rate`` once ``capacity`` keys are in.
+    """
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key):
+        # Double hashing: k positions out of the two halves of one digest.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & 1 << (position & 7) for position in self.positions(key))
+
+
+class SimpleJWTStore:
+    """
+    simplejwt's token_blacklist tables: every refresh token issued is an
+    OutstandingToken row holding the whole token, and a revoked one also has
+    a BlacklistedToken row.
+    """
+    model = BlacklistedToken
+    jti = 'token__jti'
+    expires_at = 'token__expires_at'
+    records_issued = True
+
+    def revoke(self, token):
+        # Refresh tokens are outstanding from issue on, so the mixin's user
+        # lookup, which only fills in a new OutstandingToken, is skipped for them.
+        outstanding = OutstandingToken.objects.filter(jti=token[api_settings.JTI_CLAIM]).first()
+        if outstanding is None:
+            return BlacklistMixin.blacklist(token)
+        return BlacklistedToken.objects.get_or_create(token=outstanding)
+
+
+class CompactStore:
+    """
+    One RevokedToken row per revoked token, holding only its ``jti`` and
+    expiry. Issued tokens are not recorded.
+    """
+    model = RevokedToken
+    jti = 'jti'
+    expires_at = 'expires_at'
+    records_issued = False
+
+    def revoke(self, token):
+        # A single INSERT, which needs no transaction of its own; the
+        # post_save receiver adds the token to revoked_tokens.
+        try:
+            RevokedToken.objects.create(
+                jti=token[api_settings.JTI_CLAIM], expires_at=datetime_from_epoch(token['exp']))
+        except IntegrityError:
+            # Revoked already, by a concurrent request.
+            pass
+
+
+compact_store = CompactStore()
+STORES = {'simplejwt': SimpleJWTStore(), 'compact': compact_store}
+
+
+def blacklist_store():
+    """
+    The store ``TOKEN_BLACKLIST_STORE`` selects.
+    """
+    return STORES[settings.TOKEN_BLACKLIST_STORE]
+
+
+def revocation_stores():
+    """
+    The stores revoked tokens are read from: ``blacklist_store()``, and the
+    compact store, which holds revoked access tokens whatever the setting.
+    """
+    store = blacklist_store()
+    return (store,) if store is compact_store else (store, compact_store)
+
+
+class RevokedTokens:
+    """
+    Per-process view of the token blacklist in ``revocation_stores()`` that
+    answers most lookups without a query.
+
+    The ``jti`` of every unexpired blacklisted token is in a Bloom filter, so a
+    token that was never revoked, which is nearly every token, is let through
+    on a filter miss. A filter hit may be a false positive and is confirmed
+    against the database; confirmed revocations go into a set and are not
+    looked up again.
+
+    Tokens blacklisted in this process are added at once, by the stores and
+    the post_save receivers on their models. Every
+    ``TOKEN_BLACKLIST_SYNC_SECONDS`` at most, a lookup first reads the rows
+    other processes added since the last read, so a revocation elsewhere
+    takes up to that long to reach this process. The filter is rebuilt from
+    the tables once it holds more than its capacity, which also drops expired
+    tokens.
+    """
+    min_capacity = 10000
+    error_rate = 0.001
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.filter = None
+            self.stores = ()
+            self.revoked = set()
+            self.last_ids = {}
+            self.synced_at = 0.0
+
+    def is_revoked(self, jti):
+        """
+        Return whether the token with this ``jti`` is blacklisted.
+        """
+        self.sync()
+        if jti in self.revoked:
+            return True
+        if jti not in self.filter:
+            return False
+        if not any(store.model.objects.filter(**{store.jti: jti}).exists() for store in self.stores):
+            return False
+        self.revoked.add(jti)
+        return True
+
+    def add(self, jti):
+        """
+        Record a token blacklisted by this process.
+        """
+        if self.filter is not None:
+            self.filter.add(jti)
+        # Only the exact set skips the database, so it waits for the commit;
+        # the filter entry just sends lookups to the database until then.
+        transaction.on_commit(lambda: self.revoked.add(jti))
+
+    def sync(self):
+        now = time.monotonic()
+        stores = revocation_stores()
+        if self.is_current(stores, now):
+            return
+        with self._lock:
+            if self.is_current(stores, now):
+                return
+            if self.filter is None or self.stores != stores or self.filter.count > self.filter.capacity:
+                self.rebuild(stores)
+            else:
+                self.load(self.filter)
+            self.synced_at = now
+
+    def is_current(self, stores, now):
+        return self.filter is not None and self.stores == stores \
+            and now - self.synced_at < settings.TOKEN_BLACKLIST_SYNC_SECONDS
+
+    def rebuild(self, stores):
+        unexpired = sum(
+            store.model.objects.filter(**{f'{store.expires_at}__gt': timezone.now()}).count() for store in stores)
+        capacity = max(self.min_capacity, 2 * unexpired)
+        bloom = BloomFilter(capacity, self.error_rate)
+        self.stores = stores
+        self.last_ids = {}
+        self.load(bloom)
+        self.filter = bloom
+        self.revoked = set()
+
+    def load(self, bloom):
+        # The new rows of every store in one query, each tagged with its store.
+        now = timezone.now()
+        rows = [
+            store.model.objects.filter(id__gt=self.last_ids.get(store, 0), **{f'{store.expires_at}__gt': now})
+            .annotate(store=Value(index)).values_list('store', 'id', store.jti)
+            for index, store in enumerate(self.stores)
+        ]
+        for index, ident, jti in rows[0].union(*rows[1:], all=True).iterator():
+            bloom.add(jti)
+            store = self.stores[index]
+            self.last_ids[store] = max(ident, self.last_ids.get(store, 0))
+
+
+revoked_tokens = RevokedTokens()
+
+
+def prune_batches(batch_size=500, now=None):
+    """
+    Delete expired tokens from both stores, ``batch_size`` rows at a time.
+
+    Each batch is its own short transaction, so writers are never held off
+    for longer than one batch takes. After each batch, yields the label of
+    every model it deleted from and the number of rows. Deleting an OutstandingToken deletes its
+    BlacklistedToken with it. Tokens are kept for ``LEEWAY`` past their
+    expiry, as long as they still validate.
+    """
+    leeway = api_settings.LEEWAY
+    if not isinstance(leeway, timedelta):
+        leeway = timedelta(seconds=leeway)
+    cutoff = (now or timezone.now()) - leeway
+    for model in (RevokedToken, OutstandingToken):
+        while True:
+            batch = list(model.objects.filter(expires_at__lte=cutoff).values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                _, deleted = model.objects.filter(id__in=batch).delete()
+            for label, count in deleted.items():
+                yield label, count
+
+
+def prune_expired_tokens(batch_size=500, pause=0.0, now=None):
+    """
+    Run ``prune_batches`` to the end, sleeping ``pause`` seconds between
+    batches to leave room for other writers. Returns the number of rows
+    deleted per model.
+    """
+    totals = {}
+    for label, count in prune_batches(batch_size, now):
+        totals[label] = totals.get(label, 0) + count
+        if pause:
+            time.sleep(pause)
+    return totals
@@ -1,5 +1,19 @@
 from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.db.models.functions import Lower
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from auth_app.hashing import password_hasher
+from auth_app.tokens import RefreshToken
+
+
+def users_with_email(*emails):
+    """
+    Users whose email is one of ``emails``, ignoring case. Served by the
+    unique ``lower(email)`` index.
+    """
+    return User.objects.alias(email_lower=Lower('email')).filter(email_lower__in=[email.lower() for email in emails])
 
 class RegistrationSerializer(serializers.ModelSerializer):
     password_confirmation = serializers.CharField(style={'input_type': 'password'}, write_only=True) # User can only write can not read
@@ -17,11 +31,26 @@ class RegistrationSerializer(serializers.ModelSerializer):
         if password != password_confirmation:
             raise serializers.ValidationError({'Error': 'Password does not match'})
         
-        if User.objects.filter(email=self.validated_data['email']).exists():
+        email = User.objects.normalize_email(self.validated_data['email'])
+        if users_with_email(email).exists():
             raise serializers.ValidationError({'Error': 'Email already used'})
         
-        account = User(email=self.validated_data['email'], username=self.validated_data['username'])
-        account.set_password(password)
-        account.save()
+        account = User(email=email, username=self.validated_data['username'])
+        account.password = password_hasher.make_password(password)
+        try:
+            account.save()
+        except IntegrityError as e:
+            # A concurrent sign-up took the email after the check above.
+            if 'auth_user_email_lower_uniq' not in str(e):
+                raise
+            raise serializers.ValidationError({'Error': 'Email already used'})
         
-        return account
\ No newline at end of file
+        return account
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken # Recorded as outstanding only if the blacklist store keeps issued tokens
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken # Checks the blacklist through revoked_tokens
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from auth_app.authentication import forget_users
+from auth_app.models import RevokedToken
+from auth_app.revocation import revoked_tokens
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_users([instance.pk])
+
+
+@receiver(post_save, sender='token_blacklist.BlacklistedToken')
+def revoke_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        revoked_tokens.add(instance.token.jti)
+
+
+@receiver(post_save, sender=RevokedToken)
+def revoke_compact_token(sender, instance, created, **kwargs):
+    if created:
+        revoked_tokens.add(instance.jti)
@@ -4,6 +4,24 @@ from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from uuid import uuid4
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from auth_app.authentication import CachedJWTAuthentication
+from auth_app.hashing import password_hasher
+from auth_app.models import RevokedToken
+from auth_app.provisioning import UserProvisioner
+from auth_app.revocation import BloomFilter, prune_expired_tokens, revoked_tokens
+from auth_app.tokens import RefreshToken, blacklist_access_token
 
 class RegisterTestCase(APITestCase):
     def test_register(self):
@@ -44,3 +62,239 @@ class LoginLogoutTestCase(APITestCase):
 
 
         self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        revoked_tokens.reset()
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+        self.authentication = CachedJWTAuthentication()
+
+    def authenticate(self, token):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.authentication.authenticate(request)
+
+    def test_user_served_from_cache(self):
+        self.assertEqual(self.authenticate(self.access)[0], self.user)
+        with self.assertNumQueries(0):
+            user, token = self.authenticate(self.access)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token['jti'], self.access['jti'])
+
+    def test_saved_user_is_reloaded(self):
+        self.authenticate(self.access)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.access)
+
+    def test_deleted_user_is_rejected(self):
+        self.authenticate(self.access)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.access)
+
+    def test_blacklisted_access_token_is_rejected(self):
+        self.authenticate(self.access)
+        blacklist_access_token(self.access)
+        with self.assertRaises(InvalidToken):
+            self.authenticate(self.access)
+
+    def test_token_blacklisted_by_another_process(self):
+        self.authenticate(self.access)
+        # Rows written without signals, as another worker's are for this one.
+        outstanding = OutstandingToken.objects.create(
+            jti=self.access['jti'], token=str(self.access), expires_at=timezone.now() + timedelta(minutes=5))
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        with override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=60):
+            self.assertIsNotNone(self.authenticate(self.access))
+        with override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=0):
+            with self.assertRaises(InvalidToken):
+                self.authenticate(self.access)
+
+    def test_sync_reads_both_tables_in_one_query(self):
+        revoked_tokens.sync()
+        # Rows written without signals, as another worker's are for this one.
+        RevokedToken.objects.bulk_create([
+            RevokedToken(jti=self.access['jti'], expires_at=timezone.now() + timedelta(minutes=5))])
+        outstanding = OutstandingToken.objects.get(jti=self.refresh['jti'])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        with override_settings(TOKEN_BLACKLIST_SYNC_SECONDS=0), self.assertNumQueries(1):
+            revoked_tokens.sync()
+        self.assertIn(self.access['jti'], revoked_tokens.filter)
+        self.assertIn(self.refresh['jti'], revoked_tokens.filter)
+
+    def test_false_positive_is_confirmed_against_database(self):
+        revoked_tokens.sync()
+        revoked_tokens.filter.add(self.access['jti'])
+        # One lookup per table: the simplejwt tables and the compact one.
+        with self.assertNumQueries(2):
+            self.assertFalse(revoked_tokens.is_revoked(self.access['jti']))
+
+    def test_logout_revokes_both_tokens(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        response = self.client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+        # The access token is revoked in the compact table, never recorded as issued.
+        self.assertTrue(RevokedToken.objects.filter(jti=self.access['jti']).exists())
+        self.assertFalse(OutstandingToken.objects.filter(jti=self.access['jti']).exists())
+
+        response = self.client.post(reverse('logout'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_checks_blacklist_without_query(self):
+        revoked_tokens.sync()
+        token = RefreshToken(str(self.refresh))
+        with self.assertNumQueries(0):
+            token.check_blacklist()
+
+
+class BloomFilterTestCase(APITestCase):
+    def test_membership(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        keys = [uuid4().hex for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(uuid4().hex in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(TOKEN_BLACKLIST_STORE='compact')
+class CompactBlacklistStoreTestCase(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        revoked_tokens.reset()
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+
+    def test_login_records_no_token(self):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'testcase', 'password': 'testcase@123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_logout_stores_jti_and_expiry(self):
+        refresh = RefreshToken.for_user(self.user)
+        access = refresh.access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.post(reverse('logout'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+        self.assertEqual(
+            set(RevokedToken.objects.values_list('jti', flat=True)), {refresh['jti'], access['jti']})
+        self.assertFalse(OutstandingToken.objects.exists())
+
+        response = self.client.post(reverse('logout'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PruneTokensTestCase(APITestCase):
+    def setUp(self) -> None:
+        now = timezone.now()
+        self.expired = now - timedelta(minutes=1)
+        self.live = now + timedelta(minutes=1)
+        for index, expires_at in enumerate([self.expired] * 3 + [self.live] * 2):
+            outstanding = OutstandingToken.objects.create(jti=f'outstanding-{index}', token='', expires_at=expires_at)
+            BlacklistedToken.objects.create(token=outstanding)
+            RevokedToken.objects.create(jti=f'revoked-{index}', expires_at=expires_at)
+
+    def test_prune_deletes_expired_tokens_in_batches(self):
+        deleted = prune_expired_tokens(batch_size=2)
+        self.assertEqual(deleted, {
+            'auth_app.RevokedToken': 3,
+            'token_blacklist.OutstandingToken': 3,
+            'token_blacklist.BlacklistedToken': 3,
+        })
+        self.assertEqual(RevokedToken.objects.count(), 2)
+        self.assertFalse(OutstandingToken.objects.filter(expires_at__lte=timezone.now()).exists())
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+    def test_prune_tokens_command(self):
+        stdout = StringIO()
+        call_command('prune_tokens', batch_size=2, pause=0, stdout=stdout)
+        self.assertIn('3 auth_app.RevokedToken', stdout.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+
+
+class RegistrationTestCase(APITestCase):
+    def register(self, username, email):
+        data = {'username': username, 'email': email, 'password': 'testcase@123', 'password_confirmation': 'testcase@123'}
+        return self.client.post(reverse('register'), data, format='json')
+
+    def test_email_check_ignores_case(self):
+        self.assertEqual(self.register('first', 'test@gmail.com').status_code, status.HTTP_201_CREATED)
+        response = self.register('second', 'Test@GMAIL.com')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'Error': 'Email already used'})
+
+    def test_concurrent_sign_up_with_same_email(self):
+        self.register('first', 'test@gmail.com')
+        # The other sign-up commits between this one's check and its insert.
+        with patch('auth_app.serializers.users_with_email', return_value=User.objects.none()):
+            response = self.register('second', 'Test@GMAIL.com')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'Error': 'Email already used'})
+
+    def test_password_is_hashed(self):
+        self.register('first', 'test@gmail.com')
+        self.assertTrue(User.objects.get(username='first').check_password('testcase@123'))
+
+    def test_auth_token_only_when_enabled(self):
+        self.register('first', 'first@gmail.com')
+        self.assertFalse(Token.objects.exists())
+        with override_settings(CREATE_AUTH_TOKENS=True):
+            self.register('second', 'second@gmail.com')
+        self.assertEqual(list(Token.objects.values_list('user__username', flat=True)), ['second'])
+
+    def test_busy_hasher_pool(self):
+        password_hasher.make_password('warm-up')
+        with patch.object(password_hasher, '_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = self.register('first', 'test@gmail.com')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(User.objects.filter(username='first').exists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisionUsersTestCase(APITestCase):
+    def setUp(self) -> None:
+        User.objects.create_user(username='existing', email='Taken@Example.com', password='secret')
+        self.csv = StringIO(
+            "username,email,password,password_hash\n"
+            "alice,alice@example.com,alice-secret,\n"
+            f"bob,bob@example.com,,{make_password('bob-secret')}\n"
+            "carol,,,\n"
+            "existing,other@example.com,secret,\n"
+            "dave,taken@example.com,secret,\n"
+            "bad name!,eve@example.com,secret,\n"
+            "frank,frank@example.com,secret,not-a-hash\n"
+            "grace,ALICE@example.com,secret,\n"
+        )
+
+    def test_provision_users(self):
+        summary = UserProvisioner(batch_size=3, workers=2).run(self.csv)
+        self.assertEqual((summary['created'], summary['skipped'], summary['failed']), (3, 1, 4))
+        self.assertEqual(sorted(error['line'] for error in summary['errors']), [6, 7, 8, 9])
+        self.assertTrue(User.objects.get(username='alice').check_password('alice-secret'))
+        self.assertTrue(User.objects.get(username='bob').check_password('bob-secret'))
+        self.assertFalse(User.objects.get(username='carol').has_usable_password())
+
+    def test_command(self):
+        stdout, stderr = StringIO(), StringIO()
+        with patch('sys.stdin', self.csv):
+            call_command('provision_users', '-', stdout=stdout, stderr=stderr)
+        self.assertIn('Created 3 users, skipped 1 existing usernames, rejected 4 rows.', stdout.getvalue())
+        self.assertIn('line 6:', stderr.getvalue())
+
+    def test_header_needs_username(self):
+        with self.assertRaises(CommandError):
+            with patch('sys.stdin', StringIO("email\nalice@example.com\n")):
+                call_command('provision_users', '-', stdout=StringIO())
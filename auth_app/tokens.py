@@ -0,0 +1,42 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from auth_app.revocation import blacklist_store, compact_store, revoked_tokens
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    RefreshToken kept in the blacklist store ``TOKEN_BLACKLIST_STORE`` selects,
+    whose blacklist check goes through ``revoked_tokens`` rather than querying
+    the store every time.
+    """
+    @classmethod
+    def for_user(cls, user):
+        if blacklist_store().records_issued:
+            return super().for_user(user)
+        # Skip BlacklistMixin, which records the token as outstanding.
+        return super(tokens.BlacklistMixin, cls).for_user(user)
+
+    def outstand(self):
+        if blacklist_store().records_issued:
+            return super().outstand()
+        return None
+
+    def check_blacklist(self):
+        if revoked_tokens.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        return blacklist_store().revoke(self)
+
+
+def blacklist_access_token(token):
+    """
+    Blacklist an access token, so it stops authenticating before it expires.
+
+    Access tokens are never recorded as issued, so they go to the compact
+    store whatever ``TOKEN_BLACKLIST_STORE`` says: a single insert.
+    """
+    return compact_store.revoke(token)
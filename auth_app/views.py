@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework.authtoken.models import Token
 from auth_app.serializers import RegistrationSerializer
-from rest_framework_simplejwt.tokens import RefreshToken # Creating token manually in jwt
+from auth_app.tokens import RefreshToken, blacklist_access_token # Creating token manually in jwt
 
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
@@ -61,6 +61,8 @@ class LogoutView(APIView):
             refresh_token = request.data.get('refresh')
             token = RefreshToken(refresh_token)
             token.blacklist()
+            # The access token this request came with is revoked too.
+            blacklist_access_token(request.auth)
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
             return Response(status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Performance benchmarks for the IMDB API.
+
+Each module is a script run from the project root, e.g.::
+
+    python -m benchmarks.api --sizes 100,1000
+
+Benchmarks run against a throwaway SQLite test database and need no outside
+services.
+"""
+import json
+import os
+import platform
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+
+
+def setup():
+    sys.path.insert(0, str(BENCHMARK_DIR.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "IMDB.settings")
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Create a fresh, migrated test database and an empty throttle store for the
+    duration of the block, and disable DEBUG so query logging does not distort
+    timings.
+    """
+    import tempfile
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(THROTTLE_STORE_PATH=os.path.join(directory, 'throttle.sqlite3')):
+            yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def disable_throttling():
+    """
+    Lift every DRF rate limit so repeated requests are measured, not rejected.
+    The throttle checks themselves still run.
+    """
+    from rest_framework.throttling import SimpleRateThrottle
+    SimpleRateThrottle.THROTTLE_RATES = {
+        scope: '1000000000/second' for scope in SimpleRateThrottle.THROTTLE_RATES
+    }
+
+
+def wsgi_environ(path, method='GET', body=b'', content_type='', headers=None):
+    """
+    A minimal WSGI environ for driving the WSGI handler in process, without a server.
+    """
+    from io import BytesIO
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'wsgi.version': (1, 0),
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def percentile(samples, fraction):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def environment():
+    import django
+    import sqlite3
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+    }
+
+
+def write_json(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def read_json(path):
+    return json.loads(Path(path).read_text())
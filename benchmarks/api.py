@@ -0,0 +1,402 @@
+"""
+End-to-end API benchmark with a regression gate.
+
+Every route in watchlist/urls.py and auth_app/urls.py is exercised through the
+full Django stack (middleware, JWT authentication, throttle checks,
+serialization) against generated datasets of several sizes. Per endpoint it
+records p50/p95/p99 latency, the SQL query count and the peak Python memory of
+a cold request, writes the results as JSON and compares them with the stored
+baseline. Any regression makes the run exit with status 1.
+
+    python -m benchmarks.api                       # run and compare
+    python -m benchmarks.api --sizes 100,1000,10000
+    python -m benchmarks.api --scenarios 'movie list,movie detail'
+    python -m benchmarks.api --update-baseline     # regenerate from a full run
+
+--update-baseline replaces the whole baseline with a full run; it cannot be
+combined with --scenarios, as subset runs measure some rows differently (the
+change feed scenarios read what the write scenarios before them logged).
+Regenerate it in a commit of its own, never together with the change it
+would otherwise gate.
+"""
+import argparse
+import json
+import sys
+from io import StringIO
+import time
+import tracemalloc
+
+from benchmarks import (
+    BENCHMARK_DIR, setup, test_database, disable_throttling, percentile, environment, read_json, write_json,
+)
+
+setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from auth_app import urls as auth_urls
+from auth_app.revocation import revoked_tokens
+from watchlist import urls as watchlist_urls
+from watchlist.models import StreamPlatform, WatchList, Review, Change
+
+BASELINE = BENCHMARK_DIR / 'baselines' / 'api.json'
+OUTPUT = BENCHMARK_DIR / 'results' / 'api.json'
+
+# Latency comparisons allow this much absolute noise on top of the relative tolerance.
+LATENCY_SLACK_MS = 2.0
+MEMORY_SLACK_KB = 64
+# Items per multi-get and batch write request: one screen of the frontend.
+BATCH_SIZE = 50
+
+
+class Scenario:
+    """
+    One benchmarked request against a route.
+
+    ``prepare(ctx, index)`` runs outside the timer and returns the request to
+    send: a dict with ``method``, ``path`` and optionally ``data``,
+    ``content_type`` and ``auth`` ('user', 'staff' or None) or ``token``, an
+    access token of its own. ``cleanup(ctx)``, if given, runs after the
+    scenario to remove what it added, so later scenarios see the same dataset.
+    """
+    def __init__(self, name, route, prepare, iterations=None, cleanup=None):
+        self.name = name
+        self.route = route
+        self.prepare = prepare
+        self.iterations = iterations
+        self.cleanup = cleanup
+
+
+class Context:
+    """
+    Ids and credentials of the generated dataset the scenarios draw from.
+    """
+    def __init__(self):
+        self.movies = list(WatchList.objects.order_by('id').values_list('id', flat=True))
+        self.platforms = list(StreamPlatform.objects.order_by('id').values_list('id', flat=True))
+        self.reviews = list(Review.objects.order_by('id').values_list('id', flat=True)[:1000])
+        # A client that synced 100 changes ago, plus what the write scenarios add.
+        self.sync_point = max(0, (Change.objects.aggregate(seq=Max('seq'))['seq'] or 0) - 100)
+        self.busiest_movie = WatchList.objects.order_by('-number_of_rating', 'id').values_list('id', flat=True).first()
+        self.user = User.objects.create_user(username='bench-user', password='bench@123')
+        self.staff = User.objects.create_user(username='bench-staff', password='bench@123', is_staff=True)
+        self.tokens = {
+            'user': str(RefreshToken.for_user(self.user).access_token),
+            'staff': str(RefreshToken.for_user(self.staff).access_token),
+        }
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def logout(self):
+        # Logout revokes the access token too, so each one ends a session of its own.
+        refresh = RefreshToken.for_user(self.user)
+        return {
+            'method': 'post', 'path': reverse('logout'), 'token': str(refresh.access_token),
+            'data': {'refresh': str(refresh)},
+        }
+
+    def movie(self, index):
+        return self.movies[index % len(self.movies)]
+
+    def movie_batch(self, index, size=BATCH_SIZE):
+        return [self.movie(index * size + offset) for offset in range(size)]
+
+    def platform(self, index):
+        return self.platforms[index % len(self.platforms)]
+
+    def import_feed(self, index):
+        reviewer = User.objects.create(username=f'bench-import-{index}')
+        return "\n".join(
+            json.dumps({'watchlist': self.movie(index * 20 + offset), 'user': reviewer.pk, 'rating': offset % 5 + 1})
+            for offset in range(20)
+        )
+
+
+SCENARIOS = [
+    Scenario('movie list', ('watchlist', 'watch-list'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('watch-list'),
+    }),
+    Scenario('movie list search', ('watchlist', 'watch-list'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('watch-list') + '?search=detective',
+    }),
+    Scenario('movie list cursor', ('watchlist', 'watch-list'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('watch-list') + '?pagination=cursor&ordering=-average_rating',
+    }),
+    Scenario('movie detail', ('watchlist', 'movie-detail'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('movie-detail', args=[ctx.movie(i)]),
+    }),
+    Scenario('movie multi-get', ('watchlist', 'watch-list'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('watch-list') + '?ids=' + ','.join(map(str, ctx.movie_batch(i))),
+    }),
+    Scenario('movie update', ('watchlist', 'movie-detail'), lambda ctx, i: {
+        'method': 'put', 'path': reverse('movie-detail', args=[ctx.movie(i)]), 'auth': 'user',
+        'data': {'title': f'Benchmark {i}', 'storyline': 'Updated by the benchmark', 'active': True},
+    }),
+    Scenario('movie batch create', ('watchlist', 'watch-list-batch'), lambda ctx, i: {
+        'method': 'post', 'path': reverse('watch-list-batch'), 'auth': 'staff',
+        'data': [{'title': f'Batch {i}.{n}', 'storyline': 'Created by the benchmark', 'platform': ctx.platform(i + n)}
+                 for n in range(BATCH_SIZE)],
+    }, iterations=20, cleanup=lambda ctx: WatchList.objects.exclude(pk__in=ctx.movies).delete()),
+    Scenario('movie batch update', ('watchlist', 'watch-list-batch'), lambda ctx, i: {
+        'method': 'patch', 'path': reverse('watch-list-batch'), 'auth': 'staff',
+        'data': [{'id': movie, 'title': f'Batch {i}'} for movie in ctx.movie_batch(i)],
+    }, iterations=20),
+    Scenario('platform list', ('watchlist', 'platform-list'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('platform-list'),
+    }),
+    Scenario('platform detail', ('watchlist', 'platform-detail'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('platform-detail', args=[ctx.platform(i)]),
+    }),
+    Scenario('platform batch create', ('watchlist', 'platform-batch'), lambda ctx, i: {
+        'method': 'post', 'path': reverse('platform-batch'), 'auth': 'staff',
+        'data': [{'name': f'Batch {i}.{n}', 'about': 'Created by the benchmark', 'website': 'https://example.com'}
+                 for n in range(10)],
+    }, iterations=20, cleanup=lambda ctx: StreamPlatform.objects.exclude(pk__in=ctx.platforms).delete()),
+    Scenario('platform batch update', ('watchlist', 'platform-batch'), lambda ctx, i: {
+        'method': 'patch', 'path': reverse('platform-batch'), 'auth': 'staff',
+        'data': [{'id': platform, 'about': f'Batch {i}'} for platform in ctx.platforms[:10]],
+    }, iterations=20),
+    Scenario('review create', ('watchlist', 'review-create'), lambda ctx, i: {
+        'method': 'post', 'path': reverse('review-create', args=[ctx.movie(i)]), 'auth': 'user',
+        'data': {'rating': i % 5 + 1, 'description': 'Benchmark review'},
+    }),
+    Scenario('review list', ('watchlist', 'review-list'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('review-list', args=[ctx.busiest_movie]),
+    }),
+    Scenario('review detail', ('watchlist', 'review-detail'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('review-detail', args=[ctx.reviews[i % len(ctx.reviews)]]),
+    }),
+    Scenario('review import', ('watchlist', 'review-import'), lambda ctx, i: {
+        'method': 'post', 'path': reverse('review-import'), 'auth': 'staff',
+        'data': ctx.import_feed(i), 'content_type': 'application/x-ndjson',
+    }, iterations=20),
+    Scenario('catalog export', ('watchlist', 'catalog-export'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('catalog-export') + '?include=platform,ratings', 'auth': 'staff',
+    }, iterations=20),
+    Scenario('changes since', ('watchlist', 'changes'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('changes') + f'?since={ctx.sync_point}',
+    }),
+    Scenario('changes first sync', ('watchlist', 'changes'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('changes') + '?since=0',
+    }),
+    Scenario('top rated', ('watchlist', 'top-rated'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('top-rated'),
+    }),
+    Scenario('platform top rated', ('watchlist', 'platform-top-rated'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('platform-top-rated', args=[ctx.platform(i)]),
+    }),
+    Scenario('cache stats', ('watchlist', 'cache-stats'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('cache-stats'), 'auth': 'staff',
+    }),
+    Scenario('metrics', ('watchlist', 'metrics'), lambda ctx, i: {
+        'method': 'get', 'path': reverse('metrics'), 'auth': 'staff',
+    }),
+    Scenario('session logout', ('watchlist', 'logout'), lambda ctx, i: {
+        # Shadowed by auth_app's 'logout' name, so addressed by path.
+        'method': 'get', 'path': '/api-auth/logout/', 'auth': 'user',
+    }),
+    Scenario('register', ('auth_app', 'register'), lambda ctx, i: {
+        'method': 'post', 'path': reverse('register'),
+        'data': {'username': f'bench-register-{i}', 'email': f'bench-register-{i}@example.com',
+                 'password': 'bench@123', 'password_confirmation': 'bench@123'},
+    }, iterations=10),
+    Scenario('token obtain', ('auth_app', 'token_obtain_pair'), lambda ctx, i: {
+        'method': 'post', 'path': reverse('token_obtain_pair'),
+        'data': {'username': 'bench-user', 'password': 'bench@123'},
+    }, iterations=10),
+    Scenario('token refresh', ('auth_app', 'token_refresh'), lambda ctx, i: {
+        'method': 'post', 'path': reverse('token_refresh'), 'data': {'refresh': ctx.refresh},
+    }),
+    Scenario('token logout', ('auth_app', 'logout'), lambda ctx, i: ctx.logout()),
+]
+
+
+def check_coverage():
+    """
+    Fail loudly when a route has no scenario, so new endpoints get benchmarked.
+    """
+    routes = {('watchlist', pattern.name) for pattern in watchlist_urls.urlpatterns}
+    routes |= {('auth_app', pattern.name) for pattern in auth_urls.urlpatterns}
+    missing = routes - {scenario.route for scenario in SCENARIOS}
+    if missing:
+        sys.exit(f"No benchmark scenario for routes: {', '.join(sorted(':'.join(route) for route in missing))}")
+
+
+def selected_scenarios(names):
+    if not names:
+        return SCENARIOS
+    names = [name.strip() for name in names.split(',')]
+    unknown = set(names) - {scenario.name for scenario in SCENARIOS}
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return [scenario for scenario in SCENARIOS if scenario.name in names]
+
+
+def send(client, ctx, request):
+    token = request.get('token') or ctx.tokens.get(request.get('auth'))
+    if token:
+        client.credentials(HTTP_AUTHORIZATION='Bearer ' + token)
+    else:
+        client.credentials()
+    kwargs = {}
+    if 'data' in request:
+        kwargs['data'] = request['data']
+        if 'content_type' in request:
+            kwargs['content_type'] = request['content_type']
+        else:
+            kwargs['format'] = 'json'
+    response = getattr(client, request['method'])(request['path'], **kwargs)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{request['method'].upper()} {request['path']} returned {response.status_code}")
+    if response.streaming:
+        # A streamed body is produced while it is read; the read is part of the request.
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def run_scenario(scenario, ctx, iterations, warmup):
+    client = APIClient()
+    requests = (scenario.prepare(ctx, index) for index in range(warmup + 1 + (scenario.iterations or iterations)))
+
+    # Warm up first, so lazy imports and first-call setup do not count as memory.
+    for _ in range(warmup):
+        send(client, ctx, next(requests))
+
+    # The next request runs against empty caches and is profiled for queries and memory.
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    # The token blacklist is read every TOKEN_BLACKLIST_SYNC_SECONDS; read it
+    # now, so that read does not land in some profiled requests and not others.
+    revoked_tokens.sync()
+    request = next(requests)
+    # request_started resets the query log; start empty so the capture's
+    # starting offset stays valid.
+    reset_queries()
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        send(client, ctx, request)
+    # The captured list is a live slice of the log, which later requests reset.
+    query_count = len(queries)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies = []
+    for request in requests:
+        start = time.perf_counter()
+        send(client, ctx, request)
+        latencies.append((time.perf_counter() - start) * 1000)
+    if scenario.cleanup:
+        scenario.cleanup(ctx)
+
+    return {
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'queries': query_count,
+        'peak_kb': round(peak / 1024, 1),
+        'iterations': len(latencies),
+    }
+
+
+def run_size(size, args):
+    with test_database():
+        call_command(
+            'generate_data', platforms=max(5, size // 100), movies=size, users=max(100, size // 2),
+            mean_reviews=5, seed=args.seed, stdout=StringIO(), stderr=StringIO(),
+        )
+        ctx = Context()
+        dataset = {
+            'movies': len(ctx.movies),
+            'reviews': Review.objects.count(),
+            'max_reviews_per_movie': WatchList.objects.order_by('-number_of_rating').values_list('number_of_rating', flat=True).first(),
+        }
+        results = {}
+        for scenario in selected_scenarios(args.scenarios):
+            results[scenario.name] = run_scenario(scenario, ctx, args.iterations, args.warmup)
+            print(f"  {size:>7} {scenario.name:<21} p50 {results[scenario.name]['p50_ms']:>8.2f} ms"
+                  f"  p95 {results[scenario.name]['p95_ms']:>8.2f} ms  queries {results[scenario.name]['queries']:>3}"
+                  f"  peak {results[scenario.name]['peak_kb']:>8.1f} KB")
+        return dataset, results
+
+
+def compare(current, baseline, latency_tolerance, memory_tolerance):
+    """
+    Return human-readable regressions of ``current`` against ``baseline``.
+
+    Query counts must not grow at all. Median latency and peak memory may grow
+    by the given relative tolerance plus a small absolute slack for timer noise.
+    p95 and p99 are reported but not gated: with a few dozen samples they are
+    set by one or two outliers and flap from run to run.
+    """
+    regressions = []
+    for size, scenarios in baseline['results'].items():
+        for name, base in scenarios.items():
+            result = current['results'].get(size, {}).get(name)
+            if result is None:
+                continue
+            label = f"{name} @ {size} movies"
+            if result['queries'] > base['queries']:
+                regressions.append(f"{label}: {result['queries']} queries, baseline {base['queries']}")
+            if result['p50_ms'] > base['p50_ms'] * (1 + latency_tolerance) + LATENCY_SLACK_MS:
+                regressions.append(f"{label}: p50 {result['p50_ms']} ms, baseline {base['p50_ms']} ms")
+            if result['peak_kb'] > base['peak_kb'] * (1 + memory_tolerance) + MEMORY_SLACK_KB:
+                regressions.append(f"{label}: peak {result['peak_kb']} KB, baseline {base['peak_kb']} KB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000', help="Comma-separated dataset sizes, in movies.")
+    parser.add_argument('--iterations', type=int, default=50, help="Timed requests per endpoint.")
+    parser.add_argument('--warmup', type=int, default=3, help="Untimed requests before timing.")
+    parser.add_argument('--scenarios', help="Comma-separated scenario names to run; all by default.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=str(OUTPUT))
+    parser.add_argument('--baseline', default=str(BASELINE))
+    parser.add_argument('--latency-tolerance', type=float, default=0.5, help="Allowed relative median latency growth.")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help="Allowed relative peak memory growth.")
+    parser.add_argument('--update-baseline', action='store_true', help="Replace the baseline with this run.")
+    args = parser.parse_args(argv)
+    if args.update_baseline and args.scenarios:
+        parser.error("--update-baseline needs a full run; drop --scenarios.")
+
+    check_coverage()
+    disable_throttling()
+
+    current = {'environment': environment(), 'datasets': {}, 'results': {}}
+    for size in [int(size) for size in args.sizes.split(',')]:
+        current['datasets'][str(size)], current['results'][str(size)] = run_size(size, args)
+    write_json(args.output, current)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        write_json(args.baseline, current)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    try:
+        baseline = read_json(args.baseline)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+
+    regressions = compare(current, baseline, args.latency_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Throughput of one worker process with many slow clients: WSGI versus ASGI.
+
+Slow clients (mobile networks, far-away users) take a while to receive each
+response. A WSGI worker thread is blocked for that whole time, so a worker with
+N threads serves at most N such clients at once. Under IMDB/asgi.py the read
+endpoints are async views: a response being sent only parks a coroutine, so
+one worker keeps thousands of clients in flight.
+
+Both servers are driven in process, without sockets: the WSGI side runs the
+WSGI handler on a fixed pool of threads, like ``gunicorn --threads N``, and
+holds the thread for the client delay after each response; the ASGI side runs
+the ASGI application on one event loop and awaits the client delay while
+sending the response body.
+
+    python -m benchmarks.asgi
+    python -m benchmarks.asgi --clients 5000 --client-delay 0.5 --threads 8
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from io import StringIO
+
+from benchmarks import setup, test_database, disable_throttling, environment, wsgi_environ, write_json, BENCHMARK_DIR
+
+setup()
+
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+
+from IMDB.asgi import application as asgi_application
+
+OUTPUT = BENCHMARK_DIR / 'results' / 'asgi.json'
+
+ENDPOINTS = {
+    'movie detail': '/1/',
+    'movie list': '/',
+}
+
+
+def run_wsgi(path, threads, client_delay, duration):
+    """
+    Serve back-to-back requests on ``threads`` threads, starting new ones for
+    ``duration`` seconds, and return the requests served per second. More
+    clients than threads only wait in the accept queue, so they do not change
+    throughput.
+    """
+    handler = get_wsgi_application()
+    start = time.perf_counter()
+    deadline = start + duration
+    completed = [0] * threads
+
+    def worker(index):
+        while time.perf_counter() < deadline:
+            statuses = []
+            body = handler(wsgi_environ(path), lambda status, headers: statuses.append(status))
+            for _ in body:
+                pass
+            body.close()
+            assert statuses[0].startswith('200'), statuses[0]
+            # Writing to a slow client blocks the worker thread.
+            time.sleep(client_delay)
+            completed[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(completed) / (time.perf_counter() - start)
+
+
+async def run_asgi(path, clients, client_delay, duration):
+    """
+    Let ``clients`` concurrent clients send back-to-back requests, starting new
+    ones for ``duration`` seconds, and return the requests served per second.
+    Requests in flight at the deadline are waited for and counted.
+    """
+    start = time.perf_counter()
+    deadline = start + duration
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+        'method': 'GET', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver')], 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+
+    async def client():
+        completed = 0
+        while time.perf_counter() < deadline:
+            received = False
+            statuses = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # The client stays connected until the response is sent.
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif not message.get('more_body'):
+                    await asyncio.sleep(client_delay)
+
+            await asgi_application(dict(scope), receive, send)
+            assert statuses == [200], statuses
+            completed += 1
+        return completed
+
+    completed = sum(await asyncio.gather(*(client() for _ in range(clients))))
+    return completed / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=2000, help="Concurrent slow clients.")
+    parser.add_argument('--client-delay', type=float, default=0.2, help="Seconds a client takes to receive a response.")
+    parser.add_argument('--threads', type=int, default=8, help="Threads of the WSGI worker.")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per measurement.")
+    parser.add_argument('--movies', type=int, default=1000)
+    parser.add_argument('--output', default=str(OUTPUT))
+    args = parser.parse_args(argv)
+
+    disable_throttling()
+    results = {'environment': environment(), 'parameters': vars(args), 'results': {}}
+    with test_database():
+        call_command('generate_data', movies=args.movies, users=max(100, args.movies // 2), stdout=StringIO(), stderr=StringIO())
+        for name, path in ENDPOINTS.items():
+            wsgi = run_wsgi(path, args.threads, args.client_delay, args.duration)
+            asgi = asyncio.run(run_asgi(path, args.clients, args.client_delay, args.duration))
+            results['results'][name] = {
+                'wsgi_rps': round(wsgi, 1),
+                'asgi_rps': round(asgi, 1),
+                'speedup': round(asgi / wsgi, 1),
+            }
+            print(f"  {name:<14} WSGI ({args.threads} threads) {wsgi:>8.1f} req/s"
+                  f"   ASGI ({args.clients} clients) {asgi:>8.1f} req/s   x{asgi / wsgi:.1f}")
+
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
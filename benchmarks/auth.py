@@ -0,0 +1,124 @@
+"""
+Authentication benchmark: per-request overhead of simplejwt's
+JWTAuthentication versus CachedJWTAuthentication, and of the refresh token
+blacklist check, with blacklists of growing size.
+
+Each measurement authenticates one request, or checks one refresh token,
+for a user with a live token, and reports its latency and the SQL queries it
+ran. The blacklist is filled with revoked tokens of other users first; its
+rows are written without signals, as another worker's would be, so
+``revoked_tokens`` has to read them from the table.
+
+    python -m benchmarks.auth
+    python -m benchmarks.auth --blacklisted 0,10000,100000 --requests 2000
+"""
+import argparse
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from benchmarks import setup, test_database, environment, percentile, write_json, BENCHMARK_DIR
+
+setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+from auth_app.authentication import CachedJWTAuthentication
+from auth_app.revocation import revoked_tokens
+from auth_app.tokens import RefreshToken
+
+OUTPUT = BENCHMARK_DIR / 'results' / 'auth.json'
+BATCH = 5000
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def blacklist(count):
+    """
+    Grow the blacklist to ``count`` unexpired revoked tokens.
+    """
+    expires_at = timezone.now() + timedelta(days=1)
+    while (existing := BlacklistedToken.objects.count()) < count:
+        size = min(BATCH, count - existing)
+        outstanding = OutstandingToken.objects.bulk_create(
+            OutstandingToken(jti=uuid.uuid4().hex, token='', expires_at=expires_at) for _ in range(size))
+        BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in outstanding)
+
+
+def measure(call, requests):
+    """
+    Latency in microseconds and queries per call of ``requests`` calls, after one warm-up call.
+    """
+    call()
+    counter = QueryCounter()
+    timings = []
+    with connection.execute_wrapper(counter):
+        for _ in range(requests):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1e6)
+    return {
+        'p50_us': round(percentile(timings, 0.5), 1),
+        'p99_us': round(percentile(timings, 0.99), 1),
+        'queries_per_request': round(counter.count / requests, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blacklisted', default='0,10000,100000', help="Revoked tokens in the blacklist.")
+    parser.add_argument('--requests', type=int, default=2000, help="Timed requests per measurement.")
+    parser.add_argument('--output', default=str(OUTPUT))
+    args = parser.parse_args(argv)
+
+    results = {'environment': environment(), 'parameters': vars(args), 'results': {}}
+    with test_database():
+        user = User.objects.create_user(username='benchmark', password='benchmark')
+        refresh = str(tokens.RefreshToken.for_user(user))
+        request = RequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {tokens.RefreshToken(refresh).access_token}')
+        paths = {
+            'authenticate': {
+                'JWTAuthentication': lambda: JWTAuthentication().authenticate(request),
+                'CachedJWTAuthentication': lambda: CachedJWTAuthentication().authenticate(request),
+            },
+            'refresh check': {
+                'simplejwt RefreshToken': lambda: tokens.RefreshToken(refresh),
+                'auth_app RefreshToken': lambda: RefreshToken(refresh),
+            },
+        }
+        for count in sorted(int(count) for count in args.blacklisted.split(',')):
+            blacklist(count)
+            cache.clear()
+            revoked_tokens.reset()
+            results['results'][str(count)] = {}
+            print(f"  {count} blacklisted tokens")
+            for name, candidates in paths.items():
+                results['results'][str(count)][name] = {}
+                for label, call in candidates.items():
+                    result = results['results'][str(count)][name][label] = measure(call, args.requests)
+                    print(f"    {name:<13} {label:<24} p50 {result['p50_us']:>8.1f} us"
+                          f"  p99 {result['p99_us']:>8.1f} us  {result['queries_per_request']:.3f} queries")
+
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
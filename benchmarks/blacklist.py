@@ -0,0 +1,177 @@
+"""
+Token blacklist growth benchmark: table size and lookup latency over a
+simulated month of logins and logouts.
+
+Every simulated day, ``--logins`` refresh tokens are issued and ``--logouts``
+sessions end, revoking their refresh and access tokens as LogoutView does.
+The month is played once per blacklist store (simplejwt's token_blacklist
+tables and the compact RevokedToken table), with and without the daily
+pruner. After each day the benchmark reports the rows and bytes of the
+tables, indexes included, and the latency of the database lookup that
+confirms a revoked token, for a sample of revoked and never revoked ids. The
+pruner's longest batch is how long it held the write lock at most.
+
+    python -m benchmarks.blacklist
+    python -m benchmarks.blacklist --days 30 --logins 20000 --logouts 5000
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from benchmarks import setup, test_database, environment, percentile, write_json, BENCHMARK_DIR
+
+setup()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+from auth_app.models import RevokedToken
+from auth_app.revocation import STORES, prune_batches
+from auth_app.tokens import RefreshToken
+
+OUTPUT = BENCHMARK_DIR / 'results' / 'blacklist.json'
+MODELS = (BlacklistedToken, OutstandingToken, RevokedToken)
+REPORT_DAYS = (1, 7, 14, 21, 30)
+
+
+def table_bytes(model):
+    """
+    Bytes of the model's table and its indexes, from SQLite's dbstat table.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT name FROM pragma_index_list(%s)', [table])
+        names = [table] + [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"SELECT SUM(pgsize) FROM dbstat WHERE name IN ({', '.join(['%s'] * len(names))})", names)
+        return cursor.fetchone()[0] or 0
+
+
+def clear():
+    for model in MODELS:
+        model.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+
+
+def issue(store, user, refresh, count, now):
+    """
+    Issue ``count`` refresh tokens at ``now`` and return their ids.
+    """
+    jtis = [uuid.uuid4().hex for _ in range(count)]
+    if store.records_issued:
+        OutstandingToken.objects.bulk_create(
+            OutstandingToken(user=user, jti=jti, token=refresh, created_at=now,
+                             expires_at=now + api_settings.REFRESH_TOKEN_LIFETIME)
+            for jti in jtis
+        )
+    return jtis
+
+
+def revoke(store, user, access, jtis, now):
+    """
+    Revoke the refresh tokens ``jtis`` and an access token of each, as logouts
+    at ``now`` do. Returns the revoked ids.
+    """
+    access_jtis = [uuid.uuid4().hex for _ in jtis]
+    refresh_expiry = now + api_settings.REFRESH_TOKEN_LIFETIME
+    access_expiry = now + api_settings.ACCESS_TOKEN_LIFETIME
+    # Access tokens always go to the compact table, as blacklist_access_token puts them.
+    revoked = [RevokedToken(jti=jti, expires_at=access_expiry) for jti in access_jtis]
+    if store.records_issued:
+        BlacklistedToken.objects.bulk_create(
+            BlacklistedToken(token=token) for token in OutstandingToken.objects.filter(jti__in=jtis))
+    else:
+        revoked += [RevokedToken(jti=jti, expires_at=refresh_expiry) for jti in jtis]
+    RevokedToken.objects.bulk_create(revoked)
+    return jtis + access_jtis
+
+
+def lookup_latency(store, revoked, samples, rng):
+    """
+    Latency in microseconds of the query confirming whether a token is
+    revoked, over revoked and never revoked ids in equal parts.
+    """
+    jtis = rng.sample(revoked, min(len(revoked), samples // 2))
+    jtis += [uuid.uuid4().hex for _ in range(samples - len(jtis))]
+    rng.shuffle(jtis)
+    timings = []
+    for jti in jtis:
+        start = time.perf_counter()
+        store.model.objects.filter(**{store.jti: jti}).exists()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return round(percentile(timings, 0.5), 1), round(percentile(timings, 0.99), 1)
+
+
+def simulate(store, pruned, user, args):
+    rng = random.Random(args.seed)
+    refresh = RefreshToken.for_user(user)
+    # Stored tokens are as long as real ones.
+    refresh_text, access_text = str(refresh), str(refresh.access_token)
+    start = timezone.now() - timedelta(days=args.days)
+    revoked = []
+    days = []
+    for day in range(1, args.days + 1):
+        # Logins and logouts spread over the day, in hourly steps.
+        for hour in range(24):
+            now = start + timedelta(days=day - 1, hours=hour)
+            jtis = issue(store, user, refresh_text, args.logins // 24, now)
+            revoked += revoke(store, user, access_text, rng.sample(jtis, args.logouts // 24), now)
+
+        end = start + timedelta(days=day)
+        result = {'day': day, 'pruned_rows': 0, 'longest_prune_batch_ms': 0.0}
+        if pruned:
+            batch_start = time.perf_counter()
+            for label, count in prune_batches(args.batch_size, now=end):
+                elapsed = (time.perf_counter() - batch_start) * 1000
+                result['pruned_rows'] += count
+                result['longest_prune_batch_ms'] = round(max(result['longest_prune_batch_ms'], elapsed), 2)
+                batch_start = time.perf_counter()
+        for model in MODELS:
+            result[f'{model._meta.label}_rows'] = model.objects.count()
+        result['bytes'] = sum(table_bytes(model) for model in MODELS)
+        result['lookup_p50_us'], result['lookup_p99_us'] = lookup_latency(store, revoked, args.lookups, rng)
+        days.append(result)
+        if day in REPORT_DAYS or day == args.days:
+            rows = sum(result[f'{model._meta.label}_rows'] for model in MODELS)
+            print(f"    day {day:>3}  {rows:>9} rows  {result['bytes'] / 2 ** 20:>8.2f} MiB"
+                  f"  lookup p50 {result['lookup_p50_us']:>6.1f} us  p99 {result['lookup_p99_us']:>6.1f} us"
+                  + (f"  longest prune batch {result['longest_prune_batch_ms']:.2f} ms" if pruned else ""))
+    return days
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--logins', type=int, default=4800, help="Refresh tokens issued per day.")
+    parser.add_argument('--logouts', type=int, default=1200, help="Sessions ended per day, each revoking two tokens.")
+    parser.add_argument('--lookups', type=int, default=1000, help="Timed blacklist lookups per day.")
+    parser.add_argument('--batch-size', type=int, default=500, help="Rows the pruner deletes per transaction.")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=str(OUTPUT))
+    args = parser.parse_args(argv)
+
+    results = {'environment': environment(), 'parameters': vars(args), 'results': {}}
+    with test_database():
+        user = User.objects.create_user(username='benchmark', password='benchmark')
+        for name, store in STORES.items():
+            for pruned in (False, True):
+                scenario = f"{name}{' + pruner' if pruned else ''}"
+                print(f"  {scenario}")
+                clear()
+                with override_settings(TOKEN_BLACKLIST_STORE=name):
+                    results['results'][scenario] = simulate(store, pruned, user, args)
+
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Payload size and CPU cost per request of each response format: JSON or
+MessagePack, each uncompressed, gzipped and brotli-compressed.
+
+Requests go through the WSGI handler in process with the matching ``Accept``
+and ``Accept-Encoding`` headers, so the cost includes content negotiation,
+rendering and the compression middleware. Formats whose optional package
+(msgpack, brotli) is not installed are reported as unavailable.
+
+    python -m benchmarks.payloads
+    python -m benchmarks.payloads --movies 5000 --requests 50
+"""
+import argparse
+import sys
+import time
+from io import StringIO
+
+from benchmarks import setup, test_database, environment, percentile, wsgi_environ, write_json, BENCHMARK_DIR
+
+setup()
+
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+
+from watchlist.compression import brotli
+from watchlist.renderers import msgpack
+
+OUTPUT = BENCHMARK_DIR / 'results' / 'payloads.json'
+
+ENDPOINTS = {
+    'platform list': '/stream/',
+    'movie list': '/?limit=100',
+    'movie detail': '/1/',
+}
+
+MEDIA_TYPES = {'json': 'application/json', 'msgpack': 'application/msgpack'}
+ENCODINGS = {'identity': 'identity', 'gzip': 'gzip', 'br': 'br'}
+AVAILABLE = {'msgpack': msgpack is not None, 'br': brotli is not None}
+
+
+def request(handler, path, accept, accept_encoding):
+    """
+    Send one request and return the CPU seconds it took, its body and headers.
+    """
+    environ = wsgi_environ(path, headers={'Accept': accept, 'Accept-Encoding': accept_encoding})
+    response = []
+    start = time.process_time()
+    body = b''.join(handler(environ, lambda status, headers: response.append((status, dict(headers)))))
+    elapsed = time.process_time() - start
+    status, headers = response[0]
+    if not status.startswith('200'):
+        raise RuntimeError(f'{path}: {status}')
+    return elapsed, body, headers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--movies', type=int, default=2000, help="Movies in the catalog; the platform list nests them all.")
+    parser.add_argument('--requests', type=int, default=30, help="Timed requests per endpoint and format.")
+    parser.add_argument('--output', default=str(OUTPUT))
+    args = parser.parse_args(argv)
+
+    results = {'environment': environment(), 'parameters': vars(args), 'results': {}}
+    with test_database():
+        call_command('generate_data', movies=args.movies, users=max(100, args.movies // 10), stdout=StringIO(), stderr=StringIO())
+        handler = get_wsgi_application()
+        for endpoint, path in ENDPOINTS.items():
+            results['results'][endpoint] = {}
+            print(f"  {endpoint}")
+            for media, accept in MEDIA_TYPES.items():
+                for encoding, accept_encoding in ENCODINGS.items():
+                    name = f'{media}+{encoding}' if encoding != 'identity' else media
+                    if not AVAILABLE.get(media, True) or not AVAILABLE.get(encoding, True):
+                        results['results'][endpoint][name] = None
+                        print(f"    {name:<14} unavailable")
+                        continue
+                    request(handler, path, accept, accept_encoding) # Warm the response cache
+                    timings = []
+                    for _ in range(args.requests):
+                        elapsed, body, headers = request(handler, path, accept, accept_encoding)
+                        timings.append(elapsed * 1000)
+                    result = results['results'][endpoint][name] = {
+                        'bytes': len(body),
+                        'content_encoding': headers.get('Content-Encoding', 'identity'),
+                        'cpu_p50_ms': round(percentile(timings, 0.5), 3),
+                        'cpu_p95_ms': round(percentile(timings, 0.95), 3),
+                    }
+                    print(f"    {name:<14} {result['bytes']:>9} bytes  cpu p50 {result['cpu_p50_ms']:>8.3f} ms"
+                          f"  p95 {result['cpu_p95_ms']:>8.3f} ms")
+
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
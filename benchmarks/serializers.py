@@ -0,0 +1,98 @@
+"""
+Serialization micro-benchmark: DRF serializers and JSONRenderer versus the
+fast read path (RowSerializer and FastJSONRenderer).
+
+Each path reads a list of movies or reviews, serializes it and renders JSON,
+as WatchListView and ReviewListView do for a page of that size. Both must
+produce the same bytes; the benchmark fails if they do not.
+
+    python -m benchmarks.serializers
+    python -m benchmarks.serializers --sizes 100,1000,10000 --repeat 5
+"""
+import argparse
+import sys
+import time
+from io import StringIO
+
+from benchmarks import setup, test_database, environment, write_json, BENCHMARK_DIR
+
+setup()
+
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from watchlist.models import WatchList, Review
+from watchlist.renderers import FastJSONRenderer, orjson
+from watchlist.rows import RowSerializer
+from watchlist.serializers import WatchListSerializer, ReviewSerializer
+
+OUTPUT = BENCHMARK_DIR / 'results' / 'serializers.json'
+
+LISTS = {
+    'movies': (WatchListSerializer, lambda: WatchList.objects.select_related('platform').order_by('id')),
+    'reviews': (ReviewSerializer, lambda: Review.objects.select_related('user').order_by('id')),
+}
+
+
+def serializer_path(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+def row_path(serializer_class, queryset):
+    rows = RowSerializer.for_serializer(serializer_class())
+    return FastJSONRenderer().render(rows.serialize(rows.queryset(queryset)))
+
+
+def best_time(path, serializer_class, queryset, repeat):
+    """
+    Best of ``repeat`` runs, in seconds, and the bytes rendered.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = path(serializer_class, queryset.all())
+        timings.append(time.perf_counter() - start)
+    return min(timings), output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000', help="Items per list.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement; the best is kept.")
+    parser.add_argument('--output', default=str(OUTPUT))
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    results = {'environment': {**environment(), 'orjson': orjson.__version__ if orjson else None}, 'results': {}}
+    mismatches = []
+    with test_database():
+        call_command('generate_data', movies=max(sizes), users=2000, mean_reviews=2, stdout=StringIO(), stderr=StringIO())
+        for name, (serializer_class, queryset) in LISTS.items():
+            results['results'][name] = {}
+            for size in sizes:
+                queryset_page = queryset()[:size]
+                slow, expected = best_time(serializer_path, serializer_class, queryset_page, args.repeat)
+                fast, output = best_time(row_path, serializer_class, queryset_page, args.repeat)
+                if output != expected:
+                    mismatches.append(f'{name} x {size}')
+                rows = len(queryset_page)
+                result = results['results'][name][str(size)] = {
+                    'rows': rows,
+                    'serializer_rows_per_second': round(rows / slow),
+                    'fast_rows_per_second': round(rows / fast),
+                    'speedup': round(slow / fast, 2),
+                    'identical': output == expected,
+                }
+                print(f"  {name:<8} {rows:>6} rows  serializer {result['serializer_rows_per_second']:>9}/s"
+                      f"  fast {result['fast_rows_per_second']:>9}/s  x{result['speedup']}")
+
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    if mismatches:
+        print(f"FAILED: the fast path rendered different bytes for {', '.join(mismatches)}.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
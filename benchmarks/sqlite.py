@@ -0,0 +1,193 @@
+"""
+SQLite write-contention benchmark: the stock connection setup versus the
+production profile in IMDB/settings.py.
+
+Several worker processes, like ``gunicorn --workers N``, send a mix of review
+list reads and review creates through the WSGI handler for a fixed time. The
+stock profile is SQLite's rollback journal, deferred transactions and a new
+connection per request; the production profile is ``SQLITE_PRAGMAS`` (WAL,
+``synchronous=NORMAL``, busy timeout, cache and mmap sizes), ``IMMEDIATE``
+transactions and persistent connections. Throttles are switched off so only
+the application database is measured.
+
+    python -m benchmarks.sqlite
+    python -m benchmarks.sqlite --workers 32 --write-ratio 0.5 --duration 20
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import random
+import sys
+import time
+from io import StringIO
+
+from benchmarks import setup, test_database, environment, percentile, wsgi_environ, write_json, BENCHMARK_DIR
+
+setup()
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.signals import got_request_exception
+from django.core.wsgi import get_wsgi_application
+from django.db import connections, OperationalError
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from watchlist.models import WatchList
+from watchlist.views import ReviewCreateView, ReviewListView
+
+OUTPUT = BENCHMARK_DIR / 'results' / 'sqlite.json'
+
+PROFILES = {
+    'stock': {
+        'pragmas': {'journal_mode': 'DELETE'},
+        'options': {},
+        'conn_max_age': 0,
+    },
+    'production': {
+        'pragmas': settings.SQLITE_PRAGMAS,
+        'options': settings.DATABASES['default'].get('OPTIONS', {}),
+        'conn_max_age': settings.DATABASES['default'].get('CONN_MAX_AGE', 0),
+    },
+}
+
+
+def use_profile(profile):
+    """
+    Point the default connection at ``profile``; takes effect on the next connection.
+    """
+    connections.close_all()
+    settings_dict = connections['default'].settings_dict
+    settings_dict['OPTIONS'] = dict(profile['options'])
+    settings_dict['CONN_MAX_AGE'] = profile['conn_max_age']
+
+
+def create_writers(name, workers, per_worker):
+    """
+    Create ``per_worker`` users without reviews for each worker and return
+    their access tokens, so every review a worker posts is new.
+    """
+    password = make_password(None)
+    users = User.objects.bulk_create([
+        User(username=f'contention-{name}-{worker}-{index}', password=password)
+        for worker in range(workers) for index in range(per_worker)
+    ])
+    tokens = [str(AccessToken.for_user(user)) for user in users]
+    return [tokens[worker * per_worker:(worker + 1) * per_worker] for worker in range(workers)]
+
+
+def work(profile, seed, tokens, movies, write_ratio, deadline, results):
+    # Runs in a forked worker process.
+    logging.disable(logging.CRITICAL)
+    use_profile(profile)
+    ReviewListView.throttle_classes = []
+    ReviewCreateView.throttle_classes = []
+    handler = get_wsgi_application()
+    rng = random.Random(seed)
+    failures = []
+    got_request_exception.connect(lambda sender, **kwargs: failures.append(sys.exc_info()[1]), weak=False)
+
+    shuffled = list(movies)
+    rng.shuffle(shuffled)
+    posts = ((token, movie) for token in tokens for movie in shuffled)
+    stats = {'reads': [], 'writes': [], 'locked': 0, 'errors': 0}
+
+    while time.perf_counter() < deadline:
+        write = rng.random() < write_ratio
+        if write:
+            token, movie = next(posts)
+            body = json.dumps({'rating': rng.randint(1, 5)}).encode()
+            environ = wsgi_environ(reverse('review-create', args=[movie]), 'POST', body, 'application/json',
+                                   {'Authorization': f'Bearer {token}'})
+        else:
+            environ = wsgi_environ(reverse('review-list', args=[rng.choice(movies)]))
+
+        statuses = []
+        failures.clear()
+        start = time.perf_counter()
+        response = handler(environ, lambda status, headers: statuses.append(status))
+        for _ in response:
+            pass
+        response.close()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if statuses[0].startswith('2'):
+            stats['writes' if write else 'reads'].append(elapsed)
+        elif statuses[0].startswith('503') or any(
+                isinstance(error, OperationalError) and 'locked' in str(error) for error in failures):
+            # API views answer a lock they could not get with 503, see watchlist.db.
+            stats['locked'] += 1
+        else:
+            stats['errors'] += 1
+    connections.close_all()
+    results.put(stats)
+
+
+def run(name, profile, args, movies):
+    """
+    Run the workers under ``profile`` for ``args.duration`` seconds and summarise.
+    """
+    tokens = create_writers(name, args.workers, args.users_per_worker)
+    use_profile(profile)
+    with override_settings(SQLITE_PRAGMAS=profile['pragmas']):
+        # The journal mode is stored in the file; set it before the workers connect.
+        connections['default'].ensure_connection()
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        deadline = time.perf_counter() + args.duration
+        workers = [
+            context.Process(target=work, args=(profile, index, tokens[index], movies, args.write_ratio, deadline, results))
+            for index in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        stats = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    reads = sum((worker['reads'] for worker in stats), [])
+    writes = sum((worker['writes'] for worker in stats), [])
+    return {
+        'reads_per_second': round(len(reads) / args.duration, 1),
+        'writes_per_second': round(len(writes) / args.duration, 1),
+        'read_p99_ms': round(percentile(reads, 0.99), 2) if reads else None,
+        'write_p50_ms': round(percentile(writes, 0.5), 2) if writes else None,
+        'write_p99_ms': round(percentile(writes, 0.99), 2) if writes else None,
+        'lock_errors': sum(worker['locked'] for worker in stats),
+        'other_errors': sum(worker['errors'] for worker in stats),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16, help="Concurrent worker processes.")
+    parser.add_argument('--write-ratio', type=float, default=0.3, help="Share of requests that create a review.")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per profile.")
+    parser.add_argument('--movies', type=int, default=1000)
+    parser.add_argument('--users-per-worker', type=int, default=5, help="Review authors per worker.")
+    parser.add_argument('--output', default=str(OUTPUT))
+    args = parser.parse_args(argv)
+
+    results = {'environment': environment(), 'parameters': vars(args), 'results': {}}
+    with test_database():
+        call_command('generate_data', movies=args.movies, users=max(100, args.movies // 2), stdout=StringIO(), stderr=StringIO())
+        movies = list(WatchList.objects.values_list('pk', flat=True))
+        for name, profile in PROFILES.items():
+            result = results['results'][name] = run(name, profile, args, movies)
+            print(f"  {name:<11} reads {result['reads_per_second']:>8.1f}/s  writes {result['writes_per_second']:>7.1f}/s"
+                  f"  write p50 {result['write_p50_ms']} ms  p99 {result['write_p99_ms']} ms"
+                  f"  read p99 {result['read_p99_ms']} ms  locked {result['lock_errors']}  errors {result['other_errors']}")
+
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
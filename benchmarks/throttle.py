@@ -0,0 +1,123 @@
+"""
+Throttle backend benchmark: per-check overhead and multi-process correctness.
+
+Compares DRF's cache-backed SimpleRateThrottle, which keeps a list of request
+timestamps per key in the (per-process) default cache, with SharedRateThrottle
+backed by the SQLite sliding-window store.
+
+    python -m benchmarks.throttle
+    python -m benchmarks.throttle --histories 10,1000,10000 --processes 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks import setup, percentile, environment, write_json, BENCHMARK_DIR
+
+setup()
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from watchlist.throttling import SharedRateThrottle, throttle_store
+
+OUTPUT = BENCHMARK_DIR / 'results' / 'throttle.json'
+
+
+def throttle_class(base, rate):
+    """
+    A throttle of ``base`` with a fixed rate whose key does not depend on the request.
+    """
+    return type(base.__name__, (base,), {
+        'rate': rate,
+        'get_rate': lambda self: rate,
+        'get_cache_key': lambda self, request, view: 'benchmark',
+    })
+
+
+def reset():
+    cache.clear()
+    throttle_store.clear()
+
+
+def check_overhead(base, history, checks):
+    """
+    Time ``checks`` allowed checks once ``history`` requests are already counted
+    in the current window.
+    """
+    throttle = throttle_class(base, f'{history + checks + 1}/day')
+    reset()
+    for _ in range(history):
+        throttle().allow_request(None, None)
+    timings = []
+    for _ in range(checks):
+        start = time.perf_counter()
+        allowed = throttle().allow_request(None, None)
+        timings.append((time.perf_counter() - start) * 1e6)
+        assert allowed
+    return {'p50_us': round(percentile(timings, 0.5), 1), 'p99_us': round(percentile(timings, 0.99), 1)}
+
+
+def hammer(base, limit, attempts, results):
+    # Runs in a forked worker: like a gunicorn worker, it gets its own LocMem cache.
+    throttle = throttle_class(base, f'{limit}/hour')
+    results.put(sum(bool(throttle().allow_request(None, None)) for _ in range(attempts)))
+
+
+def concurrency(base, processes, limit, attempts):
+    """
+    Let ``processes`` workers race ``attempts`` checks each against one key and
+    return how many were allowed in total.
+    """
+    reset()
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=hammer, args=(base, limit, attempts, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return allowed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--histories', default='0,100,1000,10000', help="Requests already counted for the key.")
+    parser.add_argument('--checks', type=int, default=500, help="Timed checks per history size.")
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--limit', type=int, default=100, help="Quota of the key raced by the processes.")
+    parser.add_argument('--attempts', type=int, default=200, help="Checks per process.")
+    parser.add_argument('--output', default=str(OUTPUT))
+    args = parser.parse_args(argv)
+
+    backends = {'cache history': SimpleRateThrottle, 'shared sliding window': SharedRateThrottle}
+    results = {'environment': environment(), 'overhead': {}, 'concurrency': {}}
+    with tempfile.TemporaryDirectory() as directory, \
+            override_settings(THROTTLE_STORE_PATH=os.path.join(directory, 'throttle.sqlite3')):
+        for name, base in backends.items():
+            results['overhead'][name] = {}
+            for history in [int(history) for history in args.histories.split(',')]:
+                timing = check_overhead(base, history, args.checks)
+                results['overhead'][name][str(history)] = timing
+                print(f"  {name:<22} history {history:>6}  p50 {timing['p50_us']:>8.1f} us  p99 {timing['p99_us']:>8.1f} us")
+
+        for name, base in backends.items():
+            allowed = concurrency(base, args.processes, args.limit, args.attempts)
+            results['concurrency'][name] = {'processes': args.processes, 'limit': args.limit, 'allowed': allowed}
+            print(f"  {name:<22} {args.processes} processes, limit {args.limit}: {allowed} allowed")
+
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    if results['concurrency']['shared sliding window']['allowed'] != args.limit:
+        print("FAILED: the shared throttle let a different number of requests through than its limit.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def ensure_triggers(sender, using, **kwargs):
+    from watchlist.changes import ensure_change_triggers
+    from watchlist.search import ensure_fts_triggers
+    ensure_fts_triggers(connections[using])
+    ensure_change_triggers(connections[using])
 
 
 class WatchlistConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'watchlist'
+
+    def ready(self):
+        from watchlist import signals # noqa: F401 Cache invalidation receivers
+        from watchlist.db import configure_sqlite
+        from watchlist.metrics import install_query_timer
+        post_migrate.connect(ensure_triggers, sender=self)
+        connection_created.connect(configure_sqlite)
+        connection_created.connect(install_query_timer)
@@ -0,0 +1,26 @@
+from django.urls import path
+
+from watchlist import urls
+from watchlist.async_views import (
+    AsyncWatchListView,
+    AsyncMovieDetailView,
+    AsyncStreamPlatformListView,
+    AsyncStreamPlatformDetailView,
+    AsyncReviewListView,
+)
+
+# Routes served under ASGI: the same as watchlist/urls.py, with the read
+# endpoints swapped for their async versions.
+ASYNC_VIEWS = {
+    'watch-list': AsyncWatchListView,
+    'movie-detail': AsyncMovieDetailView,
+    'platform-list': AsyncStreamPlatformListView,
+    'platform-detail': AsyncStreamPlatformDetailView,
+    'review-list': AsyncReviewListView,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name].as_view(), name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in urls.urlpatterns
+]
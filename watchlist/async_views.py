@@ -0,0 +1,158 @@
+"""
+Async versions of the read endpoints, served by IMDB/asgi.py.
+
+Each view subclasses its synchronous counterpart in watchlist/views.py and
+only replaces the GET handler, so querysets, serializers, filters, pagination,
+permissions and throttles stay shared. Other methods are dispatched to the
+synchronous view in a worker thread.
+"""
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from rest_framework import status
+from rest_framework.authentication import get_authorization_header
+from rest_framework.response import Response
+
+from watchlist.cache import response_cache
+from watchlist.fieldsets import FieldSelection, SparseFieldsetFilter
+from watchlist.replicas import primary_reads
+from watchlist.views import (
+    WatchListView,
+    MovieDetailView,
+    StreamPlatformListView,
+    StreamPlatformDetailView,
+    ReviewListView,
+)
+
+
+async def acached_payload(request, view, namespace, ident, serialize):
+    """
+    ``cached_payload`` for async views; ``serialize`` is a coroutine function.
+    """
+    async def build():
+        with primary_reads():
+            return await serialize(view.get_queryset())
+
+    selection = FieldSelection.from_request(request)
+    if not selection:
+        return await response_cache.aget_or_set(namespace, ident, build)
+    data = await response_cache.aget(namespace, ident)
+    if data is not None:
+        return selection.apply(data)
+    return await serialize(SparseFieldsetFilter().filter_queryset(request, view.get_queryset(), view))
+
+
+class AsyncResponse(Response):
+    """
+    Response rendered on the event loop.
+
+    Django's async handler awaits a coroutine ``render`` instead of sending a
+    plain one to a worker thread. JSON rendering does no I/O, so a thread would
+    only add a hop. Only valid under ASGI.
+    """
+    async def render(self):
+        return super().render()
+
+
+class AsyncReadMixin:
+    """
+    Serve GET and HEAD natively on the event loop and everything else through
+    the synchronous view.
+
+    Authentication, permission and throttle checks follow ``APIView.initial``:
+    checks that may block (loading the user of a token, counting the request in
+    the throttle store) run in a thread, the rest on the loop.
+    """
+    view_is_async = True
+    read_methods = ('GET', 'HEAD')
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in self.read_methods:
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            response = await self.get(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        request.accepted_renderer, request.accepted_media_type = self.perform_content_negotiation(request)
+        request.version, request.versioning_scheme = self.determine_version(request, *args, **kwargs)
+
+        if get_authorization_header(request):
+            await sync_to_async(self.perform_authentication)(request)
+        else:
+            # Without credentials every authenticator returns None at once.
+            self.perform_authentication(request)
+        self.check_permissions(request)
+        if self.throttle_classes:
+            await sync_to_async(self.check_throttles, thread_sensitive=False)(request)
+
+    async def alist(self, request):
+        """
+        ``ListModelMixin.list`` on the async ORM, through the view's
+        RowSerializer when it has one.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = self.get_row_serializer() if hasattr(self, 'get_row_serializer') else None
+        if rows is not None:
+            queryset = rows.queryset(queryset)
+            serialize = rows.serialize
+        else:
+            serialize = lambda objects: self.get_serializer(objects, many=True).data
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                return AsyncResponse(self.paginator.get_paginated_response(serialize(page)).data)
+        objects = [obj async for obj in queryset]
+        return AsyncResponse(serialize(objects))
+
+
+class AsyncWatchListView(AsyncReadMixin, WatchListView):
+    async def get(self, request):
+        return await self.alist(request)
+
+
+class AsyncMovieDetailView(AsyncReadMixin, MovieDetailView):
+    async def get(self, request, pk):
+        async def serialize(queryset):
+            movie = await aget_object_or_404(queryset, pk=pk)
+            return self.serializer_class(movie, context={'request': request}).data
+
+        data = await acached_payload(request, self, 'movie', pk, serialize)
+        return AsyncResponse(data, status=status.HTTP_200_OK)
+
+
+class AsyncStreamPlatformListView(AsyncReadMixin, StreamPlatformListView):
+    async def get(self, request):
+        async def serialize(queryset):
+            platforms = [platform async for platform in queryset]
+            return self.serializer_class(platforms, many=True, context={'request': request}).data
+
+        data = await acached_payload(request, self, 'platform', 'list', serialize)
+        return AsyncResponse(data, status=status.HTTP_200_OK)
+
+
+class AsyncStreamPlatformDetailView(AsyncReadMixin, StreamPlatformDetailView):
+    async def get(self, request, pk):
+        async def serialize(queryset):
+            platform = await aget_object_or_404(queryset, pk=pk)
+            return self.serializer_class(platform, context={'request': request}).data
+
+        data = await acached_payload(request, self, 'platform', pk, serialize)
+        return AsyncResponse(data, status=status.HTTP_200_OK)
+
+
+class AsyncReviewListView(AsyncReadMixin, ReviewListView):
+    async def get(self, request, pk):
+        return await self.alist(request)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+
+def is_lock_error(exc):
+    return isinstance(exc, OperationalError) and 'database is locked' in str(exc)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Django's SQLite backend, retrying ``BEGIN IMMEDIATE`` when the write lock
+    is still taken after busy_timeout.
+
+    Nothing has run in the transaction when BEGIN fails, so it is safe to try
+    again. After ``SQLITE_BEGIN_RETRIES`` more attempts the error is raised;
+    API views answer it with 503, see watchlist.db.exception_handler.
+    """
+    def _start_transaction_under_autocommit(self):
+        retries = settings.SQLITE_BEGIN_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                return super()._start_transaction_under_autocommit()
+            except OperationalError as exc:
+                if attempt == retries or not is_lock_error(exc):
+                    raise
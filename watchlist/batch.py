@@ -0,0 +1,141 @@
+import copy
+
+from django.conf import settings
+from django.core import exceptions
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from watchlist.cache import invalidate_movie, invalidate_platform
+from watchlist.models import StreamPlatform
+from watchlist.serializers import WatchListWriteSerializer, StreamPlatformSerializer
+
+
+def to_id(model, value):
+    """
+    Return ``value`` as a primary key of ``model``, or None if it is not one.
+    Like the serializers' fields, this takes numeric strings such as ``"3"``
+    but not JSON true, which Python would read as 1.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        return model._meta.pk.to_python(value)
+    except exceptions.ValidationError:
+        return None
+
+
+class BatchWriter:
+    """
+    Create or update many objects of one model in one transaction.
+
+    Every item is validated with ``serializer_class`` before anything is
+    written. If any item is invalid nothing is written, and the errors are
+    returned per item as ``{'index': i, 'errors': {...}}``, ``i`` being the
+    item's position in the request. Otherwise all items are written with one
+    ``bulk_create`` or ``bulk_update``. Both skip model signals, so cached
+    payloads of the objects written are invalidated here.
+    """
+    serializer_class = None
+
+    def create(self, items):
+        """
+        Return the created objects and an empty list, or None and the errors.
+        """
+        self.check_items(items)
+        context = self.get_context(items)
+        validated, errors = [], []
+        for index, item in enumerate(items):
+            serializer = self.serializer_class(data=item, context=context)
+            if serializer.is_valid():
+                validated.append(serializer.validated_data)
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        if errors:
+            return None, errors
+
+        model = self.serializer_class.Meta.model
+        with transaction.atomic():
+            objects = model.objects.bulk_create([model(**attrs) for attrs in validated])
+        self.invalidate(objects)
+        return objects, []
+
+    def update(self, items):
+        """
+        Apply partial updates to the objects the items' ``id`` keys name.
+        Return the updated objects and an empty list, or None and the errors.
+        """
+        self.check_items(items)
+        model = self.serializer_class.Meta.model
+        ids = [to_id(model, item.get('id')) if isinstance(item, dict) else None for item in items]
+        instances = model.objects.in_bulk([pk for pk in ids if pk is not None])
+        context = self.get_context(items)
+
+        updated, originals, fields, errors, seen = [], [], set(), [], set()
+        for index, (item, pk) in enumerate(zip(items, ids)):
+            if pk is None:
+                errors.append({'index': index, 'errors': {'id': ['A valid integer is required.']}})
+                continue
+            if pk in seen:
+                errors.append({'index': index, 'errors': {'id': ['Duplicate id.']}})
+                continue
+            seen.add(pk)
+            instance = instances.get(pk)
+            if instance is None:
+                errors.append({'index': index, 'errors': {'id': ['Not found.']}})
+                continue
+            serializer = self.serializer_class(instance, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors.append({'index': index, 'errors': serializer.errors})
+                continue
+            originals.append(copy.copy(instance))
+            for attr, value in serializer.validated_data.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+            updated.append(instance)
+        if errors:
+            return None, errors
+
+        if fields:
+            # bulk_update leaves auto_now fields alone.
+            now = timezone.now()
+            for instance in updated:
+                instance.updated = now
+            with transaction.atomic():
+                model.objects.bulk_update(updated, sorted(fields | {'updated'}))
+        # Before and after, in case an update moved an object between parents.
+        self.invalidate(originals + updated)
+        return updated, []
+
+    def check_items(self, items):
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        if len(items) > settings.BATCH_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [f'At most {settings.BATCH_MAX_ITEMS} items per request.']})
+
+    def get_context(self, items):
+        return {}
+
+    def invalidate(self, objects):
+        pass
+
+
+class WatchListBatchWriter(BatchWriter):
+    serializer_class = WatchListWriteSerializer
+
+    def get_context(self, items):
+        platform_ids = {to_id(StreamPlatform, item.get('platform')) for item in items if isinstance(item, dict)}
+        platform_ids = [pk for pk in platform_ids if pk is not None]
+        return {'platform_ids': set(StreamPlatform.objects.filter(pk__in=platform_ids).values_list('pk', flat=True))}
+
+    def invalidate(self, objects):
+        for movie_id, platform_id in {(movie.pk, movie.platform_id) for movie in objects}:
+            invalidate_movie(movie_id, platform_id)
+
+
+class StreamPlatformBatchWriter(BatchWriter):
+    serializer_class = StreamPlatformSerializer
+
+    def invalidate(self, objects):
+        for platform_id in {platform.pk for platform in objects}:
+            invalidate_platform(platform_id)
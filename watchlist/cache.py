@@ -0,0 +1,174 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+class ResponseCache:
+    """
+    Cache of serialized API payloads built on Django's cache framework.
+
+    Entries are keyed per resource (``movie:<pk>``, ``platform:<pk>``,
+    ``platform:list``) inside a versioned namespace. Deleting a key invalidates
+    one resource; bumping a namespace version invalidates all of its entries at
+    once, which is what bulk writes that skip model signals should do.
+
+    The backend is the ``responses`` alias in CACHES. With a per-process backend
+    such as LocMemCache, deletes and bumps only reach the process making them;
+    other processes keep serving their entries until they expire.
+    """
+    def __init__(self, alias='responses'):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def is_shared(self):
+        """
+        Whether every process reads the same backend, so invalidations made
+        here reach the running servers.
+        """
+        return not isinstance(self.cache, LocMemCache)
+
+    def version(self, namespace):
+        key = f'{namespace}:version'
+        version = self.cache.get(key)
+        if version is None:
+            # Start from the clock rather than 1, so an evicted version key can
+            # never bring back entries written under an older version.
+            self.cache.add(key, time.time_ns(), timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def make_key(self, namespace, ident):
+        return f'{namespace}:{self.version(namespace)}:{ident}'
+
+    def get(self, namespace, ident):
+        """
+        Return the cached payload for a resource, or None on a miss.
+        """
+        data = self.cache.get(self.make_key(namespace, ident))
+        self._count(namespace, 'misses' if data is None else 'hits')
+        return data
+
+    def get_or_set(self, namespace, ident, build):
+        """
+        Return the cached payload for a resource, building and storing it on a miss.
+        """
+        key = self.make_key(namespace, ident)
+        data = self.cache.get(key)
+        if data is not None:
+            self._count(namespace, 'hits')
+            return data
+        self._count(namespace, 'misses')
+        data = build()
+        self.cache.set(key, data)
+        return data
+
+    async def aget(self, namespace, ident):
+        """
+        ``get`` for async views.
+        """
+        if isinstance(self.cache, LocMemCache):
+            return self.get(namespace, ident)
+        data = await self.cache.aget(f'{namespace}:{await self.aversion(namespace)}:{ident}')
+        self._count(namespace, 'misses' if data is None else 'hits')
+        return data
+
+    async def aget_or_set(self, namespace, ident, build):
+        """
+        ``get_or_set`` for async views; ``build`` is a coroutine function.
+        """
+        # A process-local dict never blocks, so skip the worker thread that
+        # the async cache API would hop to.
+        local = isinstance(self.cache, LocMemCache)
+        if local:
+            key = self.make_key(namespace, ident)
+            data = self.cache.get(key)
+        else:
+            key = f'{namespace}:{await self.aversion(namespace)}:{ident}'
+            data = await self.cache.aget(key)
+        if data is not None:
+            self._count(namespace, 'hits')
+            return data
+        self._count(namespace, 'misses')
+        data = await build()
+        if local:
+            self.cache.set(key, data)
+        else:
+            await self.cache.aset(key, data)
+        return data
+
+    async def aversion(self, namespace):
+        key = f'{namespace}:version'
+        version = await self.cache.aget(key)
+        if version is None:
+            await self.cache.aadd(key, time.time_ns(), timeout=None)
+            version = await self.cache.aget(key)
+        return version
+
+    def delete(self, namespace, *idents):
+        """
+        Invalidate resources now and again once the current transaction commits,
+        so a request racing the commit cannot leave a stale entry behind.
+        """
+        keys = [self.make_key(namespace, ident) for ident in idents]
+        self.cache.delete_many(keys)
+        transaction.on_commit(lambda: self.cache.delete_many(keys))
+
+    def bump(self, namespace):
+        """
+        Invalidate every entry in a namespace.
+        """
+        self.cache.set(f'{namespace}:version', time.time_ns(), timeout=None)
+
+    def stats(self):
+        """
+        Return the hits, misses and hit ratio per namespace of this process
+        only; every worker counts its own.
+        """
+        with self._lock:
+            stats = {namespace: dict(counts) for namespace, counts in self._stats.items()}
+        for counts in stats.values():
+            lookups = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = counts['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def _count(self, namespace, outcome):
+        with self._lock:
+            counts = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+            counts[outcome] += 1
+
+
+response_cache = ResponseCache()
+
+
+def invalidate_movie(movie_id, platform_id):
+    response_cache.delete('movie', movie_id)
+    invalidate_platform(platform_id)
+
+
+def invalidate_platform(platform_id):
+    response_cache.delete('platform', platform_id, 'list')
+
+
+def invalidate_all():
+    """
+    Invalidate every cached movie and platform payload, for writes that skip
+    the model signals. Return a warning for the operator when the backend is
+    per process, as running servers then keep their entries.
+    """
+    response_cache.bump('movie')
+    response_cache.bump('platform')
+    if response_cache.is_shared:
+        return None
+    return (
+        "The response cache is per process: restart the server, or it serves "
+        f"cached payloads for up to {response_cache.cache.default_timeout} seconds."
+    )
@@ -0,0 +1,124 @@
+from django.conf import settings
+
+from watchlist.models import Change
+from watchlist.rows import RowSerializer
+
+CHANGE_TABLE = 'watchlist_change'
+# Tables whose writes are logged, by the kind their changes are logged as.
+TRACKED_TABLES = {
+    Change.PLATFORM: 'watchlist_streamplatform',
+    Change.MOVIE: 'watchlist_watchlist',
+}
+
+
+def change_triggers(kind, table):
+    # REPLACE deletes the object's previous row and appends a new one, which
+    # takes the next sequence number. ``updated`` is left to the ORM, so an
+    # update writes the object's row once.
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_change_insert AFTER INSERT ON {table} BEGIN
+            REPLACE INTO {CHANGE_TABLE} (kind, object_id, deleted) VALUES ('{kind}', new.id, 0);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_change_update AFTER UPDATE ON {table} BEGIN
+            REPLACE INTO {CHANGE_TABLE} (kind, object_id, deleted) VALUES ('{kind}', new.id, 0);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_change_delete AFTER DELETE ON {table} BEGIN
+            REPLACE INTO {CHANGE_TABLE} (kind, object_id, deleted) VALUES ('{kind}', old.id, 1);
+        END
+        """,
+    ]
+
+
+CHANGE_TRIGGERS = [statement for kind, table in TRACKED_TABLES.items() for statement in change_triggers(kind, table)]
+
+DROP_CHANGE_TRIGGERS = [
+    f"DROP TRIGGER IF EXISTS {table}_change_{event}"
+    for table in TRACKED_TABLES.values() for event in ('insert', 'update', 'delete')
+]
+
+
+def create_change_log(connection):
+    """
+    Install the triggers that log changes and log every existing row once,
+    platforms first, so a client syncing from the start gets the whole
+    catalog. SQLite only; other databases get no change log.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in CHANGE_TRIGGERS:
+            cursor.execute(statement)
+        for kind, table in TRACKED_TABLES.items():
+            cursor.execute(
+                f"INSERT OR IGNORE INTO {CHANGE_TABLE} (kind, object_id, deleted) "
+                f"SELECT '{kind}', id, 0 FROM {table} ORDER BY id"
+            )
+
+
+def drop_change_log(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_CHANGE_TRIGGERS:
+            cursor.execute(statement)
+
+
+def ensure_change_triggers(connection):
+    """
+    Recreate the change triggers if they are missing; like the FTS triggers,
+    they are dropped when a migration rebuilds their table.
+    """
+    if connection.vendor != 'sqlite' or CHANGE_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in CHANGE_TRIGGERS:
+            cursor.execute(statement)
+
+
+class ChangeFeed:
+    """
+    Pages of the change log after a given sequence number.
+
+    Each entry is ``{'type', 'id', 'deleted', 'data'}``, ``data`` being the
+    object's current fields, or None for a deleted one. Movies carry their
+    platform as an id. Objects are read after the log, so one written in
+    between may come with fields newer than its entry, and then comes again
+    with its new entry; one deleted in between is reported deleted.
+
+    A page costs one query for the log and one per kind of object on it,
+    whatever the size of the catalog.
+    """
+    def __init__(self, serializers):
+        # Kind -> (model, RowSerializer) for the objects of that kind.
+        self.rows = {
+            kind: (serializer.Meta.model, RowSerializer(serializer))
+            for kind, serializer in serializers.items()
+        }
+
+    def page(self, since, limit=None):
+        """
+        Return the entries after ``since``, at most ``limit`` of them, the
+        sequence number to ask for next and whether more entries follow.
+        """
+        limit = limit or settings.CHANGES_PAGE_SIZE
+        changes = list(Change.objects.filter(seq__gt=since).order_by('seq')[:limit + 1])
+        more = len(changes) > limit
+        changes = changes[:limit]
+
+        objects = {}
+        for kind, (model, rows) in self.rows.items():
+            ids = [change.object_id for change in changes if change.kind == kind and not change.deleted]
+            if ids:
+                queryset = rows.queryset(model.objects.filter(pk__in=ids))
+                objects[kind] = {item['id']: item for item in rows.serialize(queryset)}
+
+        entries = []
+        for change in changes:
+            data = None if change.deleted else objects.get(change.kind, {}).get(change.object_id)
+            entries.append({'type': change.kind, 'id': change.object_id, 'deleted': data is None, 'data': data})
+        return entries, changes[-1].seq if changes else since, more
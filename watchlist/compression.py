@@ -0,0 +1,151 @@
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError: # Optional, responses are gzipped without it
+    brotli = None
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+# Payload types worth compressing. HTML is left out: the browsable API puts
+# CSRF tokens next to reflected input, which compression would expose (BREACH).
+COMPRESSIBLE = re.compile(r'^(text/(plain|csv)|application/(json|msgpack|x-ndjson|[\w.+-]+\+json))\b')
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5 # Beyond 5 brotli gets much slower for little gain on JSON
+
+
+class Gzip:
+    name = 'gzip'
+
+    def __init__(self):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) # gzip container
+
+    def compress(self, data):
+        return self.compressor.compress(data) + self.compressor.flush()
+
+    def compress_chunk(self, data):
+        # Flushed per chunk, so a streaming client gets each chunk as it is sent.
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class Brotli:
+    name = 'br'
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self.compressor.process(data) + self.compressor.finish()
+
+    def compress_chunk(self, data):
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+# In order of preference.
+CODECS = [codec for codec in (Brotli if brotli else None, Gzip) if codec]
+
+
+def accepted_codec(accept_encoding):
+    """
+    Return the preferred codec the ``Accept-Encoding`` header allows, or None.
+    """
+    accepted = {}
+    for coding in accept_encoding.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.lower()] = quality
+    for codec in CODECS:
+        if accepted.get(codec.name, accepted.get('*', 0.0)) > 0:
+            return codec
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli (when installed) or gzip, whichever the
+    client's ``Accept-Encoding`` prefers.
+
+    Only JSON, MessagePack and plain text payloads are compressed, and only
+    bodies of at least ``COMPRESSION_MIN_SIZE`` bytes, where the saving pays
+    for the CPU time. Streaming responses are compressed chunk by chunk as
+    they are sent. Responses that already carry a ``Content-Encoding``, such
+    as the gzipped catalog export, pass through. Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.has_header('Content-Encoding') or 'no-transform' in response.get('Cache-Control', ''):
+            return response
+        if not COMPRESSIBLE.match(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = accepted_codec(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_stream(codec(), response.streaming_content)
+            else:
+                response.streaming_content = self.compress_stream(codec(), response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = codec().compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed body is not the same bytes, so a strong ETag no longer holds.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codec.name
+        return response
+
+    @staticmethod
+    def compress_stream(codec, chunks):
+        for chunk in chunks:
+            data = codec.compress_chunk(chunk)
+            if data:
+                yield data
+        yield codec.finish()
+
+    @staticmethod
+    async def acompress_stream(codec, chunks):
+        async for chunk in chunks:
+            data = codec.compress_chunk(chunk)
+            if data:
+                yield data
+        yield codec.finish()
@@ -0,0 +1,39 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from watchlist.backends.sqlite3.base import is_lock_error
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    connection_created receiver applying ``SQLITE_PRAGMAS`` to every new SQLite
+    connection. They run on the raw connection, outside query logging and the
+    metrics' query timer.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The database is busy, try again in a moment.'
+    default_code = 'database_busy'
+
+    def __init__(self):
+        super().__init__()
+        # Sent as Retry-After by DRF's exception handler.
+        self.wait = settings.DATABASE_BUSY_RETRY_AFTER
+
+
+def exception_handler(exc, context):
+    """
+    DRF's exception handler, answering SQLite's "database is locked" with
+    DatabaseBusy (503 with Retry-After) instead of letting it become a 500.
+    """
+    if is_lock_error(exc):
+        exc = DatabaseBusy()
+    return drf_exception_handler(exc, context)
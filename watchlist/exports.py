@@ -0,0 +1,102 @@
+import csv
+import re
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from watchlist.models import STARS, WatchList
+
+COLUMNS = ('id', 'title', 'storyline', 'platform_id', 'active', 'created')
+# Extra columns per ``include`` option.
+INCLUDES = {
+    'platform': ('platform__name',),
+    'ratings': ('average_rating', 'number_of_rating', *(f'rating_{star}' for star in STARS)),
+}
+# Output names of columns that are not plain model fields.
+NAMES = {'platform__name': 'platform'}
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+class Echo:
+    """
+    File-like object whose ``write`` hands back what it was given, so
+    ``csv.writer`` formats rows without buffering them.
+    """
+    def write(self, value):
+        return value
+
+
+class CatalogExport:
+    """
+    Stream the whole movie catalog as NDJSON or CSV.
+
+    Rows are read in primary key order, ``chunk_size`` at a time, with one
+    keyset query per chunk (``id > last id``), so memory use does not depend
+    on the catalog size and no read transaction stays open for the whole
+    export. Every row carries its id; an interrupted export resumes with
+    ``since_id`` set to the last id received.
+    """
+    chunk_size = 2000
+    formats = ('ndjson', 'csv')
+
+    def __init__(self, output='ndjson', include=(), since_id=0):
+        self.output = output
+        self.since_id = since_id
+        self.columns = COLUMNS + tuple(column for option in include for column in INCLUDES[option])
+        self.names = [NAMES.get(column, column) for column in self.columns]
+
+    def chunks(self):
+        """
+        Yield lists of row tuples.
+        """
+        last = self.since_id
+        while True:
+            rows = list(
+                WatchList.objects.filter(pk__gt=last).order_by('pk').values_list(*self.columns)[:self.chunk_size]
+            )
+            if rows:
+                yield rows
+            if len(rows) < self.chunk_size:
+                return
+            last = rows[-1][0]
+
+    def __iter__(self):
+        if self.output == 'csv':
+            writer = csv.writer(Echo())
+            yield writer.writerow(self.names)
+            for rows in self.chunks():
+                yield ''.join(writer.writerow(row) for row in rows)
+        else:
+            encoder = DjangoJSONEncoder(ensure_ascii=False)
+            for rows in self.chunks():
+                yield ''.join(encoder.encode(dict(zip(self.names, row))) + '\n' for row in rows)
+
+    def encoded(self, gzip=False):
+        """
+        Yield the export as UTF-8 bytes, gzip-compressed chunk by chunk if asked.
+        """
+        if not gzip:
+            for text in self:
+                yield text.encode()
+            return
+        compressor = zlib.compressobj(wbits=31) # gzip container
+        for text in self:
+            data = compressor.compress(text.encode())
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @property
+    def content_type(self):
+        return 'text/csv; charset=utf-8' if self.output == 'csv' else 'application/x-ndjson'
+
+
+async def aiterate(iterator):
+    """
+    Drain a synchronous iterator in a worker thread, one item at a time.
+    """
+    done = object()
+    while (item := await sync_to_async(next)(iterator, done)) is not done:
+        yield item
@@ -0,0 +1,216 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import SAFE_METHODS
+
+
+class FieldSelection:
+    """
+    The fields of a payload a client asked for with ``?fields=`` and ``?exclude=``.
+
+    Both parameters take comma-separated field names; a dotted name selects
+    inside a nested object, so ``?fields=id,name,watchlist.title`` on a platform
+    keeps only the title of each of its movies and ``?exclude=watchlist.storyline``
+    drops the storylines. Unknown names are ignored.
+    """
+    fields_param = 'fields'
+    exclude_param = 'exclude'
+
+    def __init__(self):
+        self.include = None  # None keeps every field
+        self.exclude = set()
+        self.nested = {}
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Return the selection of a read request, or None if it asks for every field.
+
+        Writes always get the whole serializer, so sparse fieldsets never
+        change which fields are validated.
+        """
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        selection = cls()
+        for path in cls.split(request.query_params.get(cls.fields_param)):
+            selection.add_include(path)
+        for path in cls.split(request.query_params.get(cls.exclude_param)):
+            selection.add_exclude(path)
+        return selection or None
+
+    @staticmethod
+    def split(value):
+        for path in (value or '').split(','):
+            names = [name.strip() for name in path.split('.')]
+            if all(names):
+                yield names
+
+    def add_include(self, names):
+        name, *rest = names
+        if self.include is None:
+            self.include = set()
+        self.include.add(name)
+        if rest:
+            self.child(name).add_include(rest)
+
+    def add_exclude(self, names):
+        name, *rest = names
+        if rest:
+            self.child(name).add_exclude(rest)
+        else:
+            self.exclude.add(name)
+
+    def child(self, name):
+        return self.nested.setdefault(name, FieldSelection())
+
+    def __bool__(self):
+        return self.include is not None or bool(self.exclude) or any(self.nested.values())
+
+    def keeps(self, name):
+        return (self.include is None or name in self.include) and name not in self.exclude
+
+    def apply(self, data):
+        """
+        Cut the selection out of an already serialized payload.
+        """
+        if isinstance(data, list):
+            return [self.apply(item) for item in data]
+        result = {}
+        for name, value in data.items():
+            if not self.keeps(name):
+                continue
+            nested = self.nested.get(name)
+            if nested and isinstance(value, (list, dict)):
+                value = nested.apply(value)
+            result[name] = value
+        return result
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that drops the fields left out by a FieldSelection.
+
+    The outermost serializer reads the selection from the request in its
+    context, unless one is passed as ``selection``, and hands the dotted part
+    on to nested serializers that use the mixin too.
+    """
+    def __init__(self, *args, selection=None, **kwargs):
+        self.selection = selection
+        super().__init__(*args, **kwargs)
+
+    def get_selection(self):
+        if self.selection is not None:
+            return self.selection
+        parent = getattr(self, 'parent', None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is None:
+            return FieldSelection.from_request(self.context.get('request'))
+        return None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.get_selection()
+        if not selection:
+            return fields
+        for name in list(fields):
+            if not selection.keeps(name):
+                del fields[name]
+            elif name in selection.nested:
+                nested = getattr(fields[name], 'child', fields[name])
+                if isinstance(nested, SparseFieldsetMixin):
+                    nested.selection = selection.nested[name]
+        return fields
+
+
+def restrict_queryset(queryset, serializer, required=()):
+    """
+    Return ``queryset`` loading only the columns the fields of ``serializer`` read.
+
+    Plain fields map to their model column, ``a.b`` sources through a
+    select_related relation to ``a__b``, and nested serializers of a reverse
+    relation to a restricted prefetch. Relations and prefetches no field reads
+    are dropped. Serializers can name the columns of computed fields in
+    ``Meta.sparse_columns``; any other field that is not backed by the model
+    leaves the queryset as it is.
+    """
+    opts = queryset.model._meta
+    columns = {opts.pk.name, *required}
+    reads = set()
+    related = {}  # relation -> attributes read through it, None for the whole object
+    prefetches = {}
+    extra = getattr(serializer.Meta, 'sparse_columns', {})
+
+    for name, field in serializer.fields.items():
+        if name in extra:
+            columns.update(extra[name])
+            continue
+        if field.source == '*':
+            return queryset
+        attr, *path = field.source_attrs
+        try:
+            model_field = opts.get_field(attr)
+        except FieldDoesNotExist:
+            return queryset
+        reads.add(attr)
+        if model_field.concrete:
+            columns.add(attr)
+        if model_field.many_to_one or model_field.one_to_one:
+            if path and related.get(attr, set()) is not None:
+                related.setdefault(attr, set()).add(path[0])
+            else:
+                related[attr] = None
+        elif model_field.one_to_many and isinstance(field, serializers.ListSerializer) \
+                and isinstance(field.child, SparseFieldsetMixin):
+            prefetches[attr] = restrict_prefetch(attr, model_field, field.child, columns)
+
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        kept = [relation for relation in select_related if relation in related]
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*kept)
+        for relation in kept:
+            if related[relation]:
+                columns.update(f'{relation}__{attr}' for attr in related[relation])
+
+    lookups = queryset._prefetch_related_lookups
+    if lookups:
+        queryset = queryset.prefetch_related(None).prefetch_related(*[
+            prefetches.get(lookup, lookup) for lookup in lookups
+            if not isinstance(lookup, str) or lookup.split('__')[0] in reads
+        ])
+    return queryset.only(*columns)
+
+
+def restrict_prefetch(lookup, relation, serializer, columns):
+    """
+    Build the restricted Prefetch of a reverse relation serialized by ``serializer``.
+
+    The prefetch points each related object back at its parent, so attributes
+    the nested fields read through that foreign key are added to the parent's
+    ``columns``.
+    """
+    foreign_key = relation.field.name
+    for field in serializer.fields.values():
+        attr, *path = field.source_attrs or ('',)
+        if attr == foreign_key and path:
+            columns.add(path[0])
+    queryset = relation.related_model._default_manager.all()
+    return Prefetch(lookup, queryset=restrict_queryset(queryset, serializer, required=(foreign_key,)))
+
+
+class SparseFieldsetFilter(BaseFilterBackend):
+    """
+    Filter backend that pushes the request's FieldSelection down into the
+    queryset, so columns the response leaves out are never read.
+    """
+    def filter_queryset(self, request, queryset, view):
+        selection = FieldSelection.from_request(request)
+        if not selection:
+            return queryset
+        serializer_class = view.get_serializer_class() if hasattr(view, 'get_serializer_class') else view.serializer_class
+        if not issubclass(serializer_class, SparseFieldsetMixin):
+            return queryset
+        return restrict_queryset(queryset, serializer_class(selection=selection))
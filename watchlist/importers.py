@@ -0,0 +1,145 @@
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework import serializers
+
+from watchlist.cache import invalidate_movie
+from watchlist.models import WatchList, Review
+
+
+class ReviewImportSerializer(serializers.Serializer):
+    """
+    One line of a review feed. The author is given either as a user id or as a
+    username.
+    """
+    watchlist = serializers.IntegerField()
+    user = serializers.IntegerField(required=False)
+    username = serializers.CharField(required=False)
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    description = serializers.CharField(max_length=200, required=False, allow_null=True, allow_blank=True)
+    active = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if 'user' not in attrs and 'username' not in attrs:
+            raise serializers.ValidationError('Either user or username is required.')
+        return attrs
+
+
+class ReviewImporter:
+    """
+    Stream newline-delimited JSON reviews into the database.
+
+    Lines are read lazily and handled in batches: every batch is validated,
+    checked against existing movies, users and reviews with a few set-based
+    queries, inserted with ``bulk_create`` and followed by one recompute of the
+    affected movies' rating aggregates. Memory use depends on the batch size,
+    not on the size of the input.
+
+    Reviews for a movie the user has already reviewed are skipped. Invalid lines
+    are reported with their line number, up to ``max_errors`` of them.
+    """
+    def __init__(self, batch_size=500, max_errors=100):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, lines):
+        numbered = enumerate(lines, start=1)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+    def import_batch(self, batch):
+        rows = []
+        for line_number, line in batch:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                self.fail(line_number, str(e))
+                continue
+            serializer = ReviewImportSerializer(data=data)
+            if serializer.is_valid():
+                rows.append((line_number, serializer.validated_data))
+            else:
+                self.fail(line_number, serializer.errors)
+        if not rows:
+            return
+
+        platforms = dict(
+            WatchList.objects.filter(pk__in={row['watchlist'] for _, row in rows}).values_list('pk', 'platform_id')
+        )
+        users_by_name = dict(
+            User.objects.filter(username__in={row['username'] for _, row in rows if 'username' in row}).values_list('username', 'pk')
+        )
+        user_ids = set(
+            User.objects.filter(pk__in={row['user'] for _, row in rows if 'user' in row}).values_list('pk', flat=True)
+        )
+
+        reviews = []
+        for line_number, row in rows:
+            user_id = row['user'] if 'user' in row else users_by_name.get(row['username'])
+            if row['watchlist'] not in platforms:
+                self.fail(line_number, {'watchlist': ['Watchlist does not exist.']})
+            elif user_id is None or ('user' in row and user_id not in user_ids):
+                self.fail(line_number, {'user': ['User does not exist.']})
+            else:
+                reviews.append(Review(
+                    watchlist_id=row['watchlist'],
+                    user_id=user_id,
+                    rating=row['rating'],
+                    description=row.get('description'),
+                    active=row['active'],
+                ))
+        if not reviews:
+            return
+
+        # The duplicate check and the insert share one transaction, which
+        # takes the write lock first (BEGIN IMMEDIATE), so a review another
+        # request commits in between cannot make the insert fail.
+        with transaction.atomic():
+            existing = set(
+                Review.objects.filter(
+                    watchlist_id__in={review.watchlist_id for review in reviews},
+                    user_id__in={review.user_id for review in reviews},
+                ).values_list('watchlist_id', 'user_id')
+            )
+            new_reviews = []
+            for review in reviews:
+                key = (review.watchlist_id, review.user_id)
+                if key in existing:
+                    continue
+                existing.add(key)
+                new_reviews.append(review)
+            if new_reviews:
+                affected = {review.watchlist_id for review in new_reviews}
+                Review.objects.bulk_create(new_reviews)
+                WatchList.objects.filter(pk__in=affected).recompute_ratings()
+                for watchlist_id in affected:
+                    invalidate_movie(watchlist_id, platforms[watchlist_id])
+        self.created += len(new_reviews)
+        self.skipped += len(reviews) - len(new_reviews)
+
+    def fail(self, line_number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line_number, 'errors': errors})
@@ -0,0 +1,153 @@
+import random
+from array import array
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from auth_app.authentication import forget_users
+from watchlist.cache import invalidate_all
+from watchlist.models import STARS, StreamPlatform, WatchList, Review, leaderboard_score
+
+ADJECTIVES = (
+    "Silent", "Broken", "Golden", "Hidden", "Last", "Crimson", "Distant", "Frozen", "Wild", "Endless",
+    "Midnight", "Burning", "Fallen", "Secret", "Electric", "Lonely", "Savage", "Bright", "Hollow", "Restless",
+)
+NOUNS = (
+    "Harbour", "Empire", "Garden", "Horizon", "River", "Signal", "Kingdom", "Mirror", "Storm", "Frontier",
+    "Machine", "Orchard", "Station", "Voyage", "Legacy", "Circuit", "Desert", "Lantern", "Echo", "Citadel",
+)
+WORDS = (
+    "a", "the", "detective", "family", "secret", "city", "war", "love", "journey", "island", "returns", "must",
+    "find", "before", "after", "young", "old", "friends", "stranger", "discovers", "against", "time", "world",
+    "hunt", "heist", "small", "town", "crew", "escape", "truth", "past", "future", "ship", "forest", "mystery",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic catalog of platforms, movies, users and reviews for load testing. "
+        "Output is fully determined by --seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--platforms', type=int, default=20)
+        parser.add_argument('--movies', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--mean-reviews', type=float, default=10.0, help="Average reviews per movie.")
+        parser.add_argument('--skew', type=float, default=1.5, help="Pareto shape of reviews per movie; lower is more skewed.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--password', default='loadtest@123', help="Password shared by all generated users.")
+
+    def handle(self, *args, **options):
+        if options['skew'] <= 1:
+            raise CommandError("--skew must be greater than 1 for the mean to exist.")
+        if options['users'] < 1 and options['mean_reviews'] > 0:
+            raise CommandError("Reviews need at least one user.")
+        if options['platforms'] < 1 and options['movies'] > 0:
+            raise CommandError("Movies need at least one platform.")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        username_prefix = f"gen{options['seed']}-"
+        if User.objects.filter(username__startswith=username_prefix).exists():
+            raise CommandError(f"Users prefixed '{username_prefix}' already exist; pick another --seed.")
+
+        platform_ids = self.create_platforms(options['platforms'])
+        user_ids = self.create_users(options['users'], username_prefix, options['password'])
+        reviews = self.create_movies(options['movies'], platform_ids, user_ids, options['mean_reviews'], options['skew'])
+
+        # bulk_create skips the model signals that invalidate cached payloads.
+        warning = invalidate_all()
+        if warning:
+            self.stderr.write(self.style.WARNING(warning))
+        forget_users(user_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(platform_ids)} platforms, {options['movies']} movies, "
+            f"{len(user_ids)} users and {reviews} reviews."
+        ))
+
+    def create_platforms(self, count):
+        platforms = [
+            StreamPlatform(
+                name=f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)} {index}"[:30],
+                about=self.sentence(150),
+                website=f"https://platform{index}.example.com",
+            )
+            for index in range(count)
+        ]
+        return [platform.pk for platform in StreamPlatform.objects.bulk_create(platforms, batch_size=self.batch_size)]
+
+    def create_users(self, count, prefix, password):
+        # Hash once: every generated user shares the password.
+        password = make_password(password)
+        user_ids = array('q')
+        for start in range(0, count, self.batch_size):
+            users = [
+                User(username=f"{prefix}{index}", email=f"{prefix}{index}@example.com", password=password)
+                for index in range(start, min(start + self.batch_size, count))
+            ]
+            user_ids.extend(user.pk for user in User.objects.bulk_create(users))
+        return user_ids
+
+    def create_movies(self, count, platform_ids, user_ids, mean_reviews, skew):
+        """
+        Create movies in batches together with their reviews.
+
+        Reviews per movie follow a Pareto (power-law) distribution scaled to
+        ``mean_reviews``, so a few titles collect most of the reviews. Each
+        movie's ratings are drawn before it is inserted, so its precomputed
+        aggregates are written with the row.
+        """
+        scale = mean_reviews * (skew - 1)
+        created_reviews = 0
+        for start in range(0, count, self.batch_size):
+            movies, movie_ratings = [], []
+            for _ in range(start, min(start + self.batch_size, count)):
+                ratings = self.ratings(min(len(user_ids), int((self.rng.paretovariate(skew) - 1) * scale)))
+                movies.append(WatchList(
+                    title=f"The {self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)}",
+                    storyline=self.sentence(200),
+                    platform_id=self.rng.choice(platform_ids),
+                    active=self.rng.random() < 0.7,
+                    rating_sum=sum(ratings),
+                    number_of_rating=len(ratings),
+                    average_rating=sum(ratings) / len(ratings) if ratings else 0,
+                    **{f'rating_{star}': ratings.count(star) for star in STARS},
+                ))
+                movie_ratings.append(ratings)
+
+            with transaction.atomic():
+                WatchList.objects.bulk_create(movies)
+                # Scored in SQL so the formula lives in one place.
+                WatchList.objects.filter(pk__in=[movie.pk for movie in movies]).update(score=leaderboard_score())
+                reviews = []
+                for movie, ratings in zip(movies, movie_ratings):
+                    authors = self.rng.sample(range(len(user_ids)), len(ratings))
+                    for author, rating in zip(authors, ratings):
+                        reviews.append(Review(
+                            watchlist_id=movie.pk,
+                            user_id=user_ids[author],
+                            rating=rating,
+                            description=self.sentence(200) if self.rng.random() < 0.5 else None,
+                            active=self.rng.random() < 0.9,
+                        ))
+                    if len(reviews) >= self.batch_size:
+                        Review.objects.bulk_create(reviews)
+                        created_reviews += len(reviews)
+                        reviews = []
+                Review.objects.bulk_create(reviews)
+                created_reviews += len(reviews)
+            self.stdout.write(f"  {min(start + self.batch_size, count)}/{count} movies")
+        return created_reviews
+
+    def ratings(self, count):
+        # Every movie has its own quality; ratings scatter around it.
+        quality = self.rng.gauss(3.4, 0.8)
+        return [min(5, max(1, round(self.rng.gauss(quality, 1.0)))) for _ in range(count)]
+
+    def sentence(self, max_length):
+        words = self.rng.choices(WORDS, k=self.rng.randint(4, 30))
+        return " ".join(words).capitalize()[:max_length]
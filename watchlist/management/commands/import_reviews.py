@@ -0,0 +1,33 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from watchlist.importers import ReviewImporter
+
+
+class Command(BaseCommand):
+    help = "Import reviews from a newline-delimited JSON file ('-' reads standard input)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="JSONL file with one review object per line, or '-' for stdin.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Reviews validated and inserted per batch.")
+        parser.add_argument('--max-errors', type=int, default=100, help="Invalid lines to report in detail.")
+
+    def handle(self, *args, **options):
+        importer = ReviewImporter(batch_size=options['batch_size'], max_errors=options['max_errors'])
+        if options['path'] == '-':
+            summary = importer.run(sys.stdin)
+        else:
+            try:
+                with open(options['path'], encoding='utf-8') as feed:
+                    summary = importer.run(feed)
+            except OSError as e:
+                raise CommandError(e)
+
+        for error in summary['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['created']} reviews, skipped {summary['skipped']} duplicates, "
+            f"rejected {summary['failed']} lines."
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from watchlist.cache import invalidate_all
+from watchlist.models import WatchList
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the rating aggregates and histograms of movies from their reviews, "
+        "e.g. after a backfill or a manual fix of the review table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help="Movies to rebuild; all movies if none are given.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Movies rebuilt per UPDATE.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        movies = WatchList.objects.order_by('pk')
+        if options['ids']:
+            movies = movies.filter(pk__in=options['ids'])
+
+        # Batches are ranges of the primary key, so each UPDATE is short and
+        # concurrent reviews only wait for the batch holding their movie.
+        rebuilt, last = 0, 0
+        while True:
+            batch = list(movies.filter(pk__gt=last).values_list('pk', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            with transaction.atomic():
+                rebuilt += WatchList.objects.filter(pk__in=batch).recompute_ratings()
+            last = batch[-1]
+
+        # Queryset updates skip the model signals that invalidate cached payloads.
+        warning = invalidate_all()
+        if warning:
+            self.stderr.write(self.style.WARNING(warning))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the ratings of {rebuilt} movies."))
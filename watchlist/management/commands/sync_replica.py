@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from watchlist.replicas import replicate
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the replicas in DATABASE_REPLICAS, "
+        "once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help="Keep syncing, waiting this many seconds between copies.")
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replicas configured; set DATABASE_REPLICA_PATH.")
+        while True:
+            start = time.perf_counter()
+            try:
+                replicate()
+            except ValueError as e:
+                raise CommandError(e)
+            self.stdout.write(
+                f"Synced {', '.join(settings.DATABASE_REPLICAS)} in {(time.perf_counter() - start) * 1000:.1f} ms."
+            )
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
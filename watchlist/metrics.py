@@ -0,0 +1,393 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+
+# Upper bounds of the request latency histogram, in seconds.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED = 'unmatched'
+
+# Totals of the processes that have exited, in METRICS_DIR.
+EXITED_FILE = 'exited.json'
+
+
+class MetricsRegistry:
+    """
+    Per-route request metrics, aggregated in process memory.
+
+    Every series is a monotonically increasing counter keyed by URL name and
+    HTTP method, so the totals of several processes can simply be added up.
+    With ``METRICS_DIR`` set, each process periodically writes its totals to its
+    own file in that directory and the exporter sums all files, which keeps the
+    numbers correct behind a pre-forking server. Without it only the serving
+    process is reported.
+
+    A process folds its totals into ``exited.json`` when it exits, and so does
+    the collector for files of processes that are no longer running, so the
+    counters never go backwards when workers are replaced. The directory must
+    therefore be local to the host.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._last_flush = 0.0
+        self._pid = None
+
+    def observe(self, view, method, status, duration, queries, query_seconds, size):
+        with self._lock:
+            series = self._get(view, method)
+            status = str(status)
+            series['requests'][status] = series['requests'].get(status, 0) + 1
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    series['buckets'][index] += 1
+                    break
+            series['duration_sum'] += duration
+            series['queries'] += queries
+            series['query_seconds'] += query_seconds
+            series['response_bytes'] += size
+            if status == '429':
+                series['throttled'] += 1
+        self._maybe_flush()
+
+    def add_response_bytes(self, view, method, size):
+        with self._lock:
+            self._get(view, method)['response_bytes'] += size
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: {**series, 'requests': dict(series['requests']), 'buckets': list(series['buckets'])}
+                for key, series in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def collect(self):
+        """
+        Return the totals of every process as ``{(view, method): series}``.
+        """
+        totals = {}
+        merge(totals, self.snapshot())
+        directory = self.directory()
+        if directory is None or not directory.exists():
+            return totals
+        # Under the lock no file is folded into exited.json while it is read.
+        with locked(directory):
+            for path in directory.glob('*.json'):
+                if path.name in (self.file_name(), EXITED_FILE):
+                    continue
+                if not is_running(path.name.partition('-')[0]):
+                    try:
+                        series = decode(json.loads(path.read_text()))
+                    except (OSError, ValueError):
+                        continue
+                    retire(directory, series, path)
+            for path in directory.glob('*.json'):
+                if path.name == self.file_name():
+                    continue
+                try:
+                    merge(totals, decode(json.loads(path.read_text())))
+                except (OSError, ValueError):
+                    # A file another process is replacing right now; skip it this scrape.
+                    continue
+        return totals
+
+    def flush(self):
+        directory = self.directory()
+        if directory is None:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / self.file_name()
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(encode(self.snapshot())))
+        os.replace(temporary, path)
+
+    def remove(self):
+        """
+        Fold this process's totals into the exited processes' and delete its
+        file, if it has written one.
+        """
+        directory = self.directory()
+        if directory is None or self._pid != os.getpid():
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        with locked(directory):
+            retire(directory, self.snapshot(), directory / self.file_name())
+        # A forked worker also inherits its parent's registration of this.
+        self._pid = None
+
+    def file_name(self):
+        # Named per process, as a registry created before a server forks is
+        # shared by its workers. Process ids are reused across restarts; the
+        # start time keeps files apart.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._file_name = f'{self._pid}-{time.time_ns()}.json'
+            atexit.register(self.remove)
+        return self._file_name
+
+    def directory(self):
+        directory = getattr(settings, 'METRICS_DIR', None)
+        return Path(directory) if directory else None
+
+    def _get(self, view, method):
+        key = (view, method)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = {
+                'requests': {},
+                'buckets': [0] * len(DURATION_BUCKETS),
+                'duration_sum': 0.0,
+                'queries': 0,
+                'query_seconds': 0.0,
+                'response_bytes': 0,
+                'throttled': 0,
+            }
+        return series
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        self.flush()
+
+
+@contextmanager
+def locked(directory):
+    with open(directory / 'exited.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def retire(directory, series, path):
+    """
+    Add ``series`` to the exited processes' totals and delete ``path``, the
+    file it was read from. Call with the directory locked.
+    """
+    exited = directory / EXITED_FILE
+    totals = {}
+    if exited.exists():
+        merge(totals, decode(json.loads(exited.read_text())))
+    merge(totals, series)
+    temporary = exited.with_suffix('.tmp')
+    temporary.write_text(json.dumps(encode(totals)))
+    os.replace(temporary, exited)
+    path.unlink(missing_ok=True)
+
+
+def is_running(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        # Running, as another user.
+        return True
+    return True
+
+
+def encode(series):
+    return [[view, method, data] for (view, method), data in series.items()]
+
+
+def decode(rows):
+    return {(view, method): data for view, method, data in rows}
+
+
+def merge(totals, series):
+    for key, data in series.items():
+        total = totals.get(key)
+        if total is None:
+            totals[key] = {**data, 'requests': dict(data['requests']), 'buckets': list(data['buckets'])}
+            continue
+        for status, count in data['requests'].items():
+            total['requests'][status] = total['requests'].get(status, 0) + count
+        total['buckets'] = [a + b for a, b in zip(total['buckets'], data['buckets'])]
+        for name in ('duration_sum', 'queries', 'query_seconds', 'response_bytes', 'throttled'):
+            total[name] += data[name]
+
+
+registry = MetricsRegistry()
+
+
+class QueryTimer:
+    """
+    Count the queries of one request and their time.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# The timer of the request being handled. Context variables follow a request
+# into the threads that run its ORM calls under ASGI.
+current_timer = ContextVar('current_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.seconds += time.perf_counter() - start
+        timer.count += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    connection_created receiver adding ``time_query`` to every database
+    connection once, so requests need not wrap each connection themselves.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class MetricsMiddleware:
+    """
+    Record count, latency, SQL queries and time, response size and throttle
+    rejections of every request, labelled with the URL name of its route.
+    Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.observe(request, response, timer, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.observe(request, response, timer, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, timer, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match is not None and match.url_name else UNMATCHED
+        if response.streaming:
+            size = 0
+            if response.is_async:
+                content = self.acount_bytes(response.streaming_content, view, request.method)
+            else:
+                content = self.count_bytes(response.streaming_content, view, request.method)
+            response.streaming_content = content
+        else:
+            size = len(response.content)
+        registry.observe(view, request.method, response.status_code, duration, timer.count, timer.seconds, size)
+
+    def count_bytes(self, content, view, method):
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            registry.add_response_bytes(view, method, size)
+
+    async def acount_bytes(self, content, view, method):
+        size = 0
+        try:
+            async for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            registry.add_response_bytes(view, method, size)
+
+
+def render(totals):
+    """
+    Format merged totals in the Prometheus text exposition format.
+    """
+    lines = []
+
+    def family(name, kind, description):
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    def labels(view, method, **extra):
+        pairs = {'view': view, 'method': method, **extra}
+        return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in pairs.items()) + '}'
+
+    keys = sorted(totals)
+
+    family('http_requests_total', 'counter', 'Requests handled, by route, method and status code.')
+    for view, method in keys:
+        for status, count in sorted(totals[view, method]['requests'].items()):
+            lines.append(f'http_requests_total{labels(view, method, status=status)} {count}')
+
+    family('http_request_duration_seconds', 'histogram', 'Request latency, by route and method.')
+    for view, method in keys:
+        series = totals[view, method]
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, series['buckets']):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{labels(view, method, le=repr(bound))} {cumulative}')
+        total = sum(series['requests'].values())
+        lines.append(f'http_request_duration_seconds_bucket{labels(view, method, le="+Inf")} {total}')
+        lines.append(f'http_request_duration_seconds_sum{labels(view, method)} {series["duration_sum"]!r}')
+        lines.append(f'http_request_duration_seconds_count{labels(view, method)} {total}')
+
+    counters = (
+        ('http_db_queries_total', 'queries', 'SQL queries executed while handling requests.'),
+        ('http_db_query_duration_seconds_total', 'query_seconds', 'Time spent executing SQL queries.'),
+        ('http_response_size_bytes_total', 'response_bytes', 'Bytes of response bodies sent.'),
+        ('http_requests_throttled_total', 'throttled', 'Requests rejected by a rate limit.'),
+    )
+    for name, field, description in counters:
+        family(name, 'counter', description)
+        for view, method in keys:
+            lines.append(f'{name}{labels(view, method)} {totals[view, method][field]!r}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        # Errors such as a failed permission check come back as dicts.
+        return json.dumps(data).encode(self.charset)
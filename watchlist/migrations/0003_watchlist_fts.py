@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# The SQL as of this migration, frozen here rather than imported from
+# watchlist.search, so later changes there do not rewrite history.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS watchlist_watchlist_fts USING fts5(
+        title,
+        storyline,
+        content='watchlist_watchlist',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS watchlist_watchlist_fts_insert AFTER INSERT ON watchlist_watchlist BEGIN
+        INSERT INTO watchlist_watchlist_fts (rowid, title, storyline) VALUES (new.id, new.title, new.storyline);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS watchlist_watchlist_fts_delete AFTER DELETE ON watchlist_watchlist BEGIN
+        INSERT INTO watchlist_watchlist_fts (watchlist_watchlist_fts, rowid, title, storyline)
+        VALUES ('delete', old.id, old.title, old.storyline);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS watchlist_watchlist_fts_update AFTER UPDATE OF title, storyline ON watchlist_watchlist BEGIN
+        INSERT INTO watchlist_watchlist_fts (watchlist_watchlist_fts, rowid, title, storyline)
+        VALUES ('delete', old.id, old.title, old.storyline);
+        INSERT INTO watchlist_watchlist_fts (rowid, title, storyline) VALUES (new.id, new.title, new.storyline);
+    END
+    """,
+    "INSERT INTO watchlist_watchlist_fts (watchlist_watchlist_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS watchlist_watchlist_fts_insert",
+    "DROP TRIGGER IF EXISTS watchlist_watchlist_fts_delete",
+    "DROP TRIGGER IF EXISTS watchlist_watchlist_fts_update",
+    "DROP TABLE IF EXISTS watchlist_watchlist_fts",
+]
+
+
+def forwards(apps, schema_editor):
+    # SQLite only; other databases keep LIKE searching.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_FTS:
+        schema_editor.execute(statement)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_FTS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0002_watchlist_average_rating_watchlist_number_of_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
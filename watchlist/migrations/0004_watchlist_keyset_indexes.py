@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0003_watchlist_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='watchlist',
+            index=models.Index(fields=['created', 'id'], name='watchlist_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='watchlist',
+            index=models.Index(fields=['average_rating', 'id'], name='watchlist_rating_id_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_rating_sum(apps, schema_editor):
+    WatchList = apps.get_model('watchlist', 'WatchList')
+    Review = apps.get_model('watchlist', 'Review')
+    reviews = Review.objects.filter(watchlist=OuterRef('pk')).order_by().values('watchlist')
+    rating_sum = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), Value(0))
+    number_of_rating = Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total')), Value(0))
+    WatchList.objects.update(rating_sum=rating_sum, number_of_rating=number_of_rating)
+    WatchList.objects.filter(number_of_rating__gt=0).update(
+        average_rating=Cast('rating_sum', FloatField()) / models.F('number_of_rating')
+    )
+    WatchList.objects.filter(number_of_rating=0).update(average_rating=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0004_watchlist_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='watchlist',
+            name='rating_sum',
+            field=models.IntegerField(default=0, verbose_name='Sum of ratings'),
+        ),
+        migrations.RunPython(backfill_rating_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_histogram(apps, schema_editor):
+    WatchList = apps.get_model('watchlist', 'WatchList')
+    Review = apps.get_model('watchlist', 'Review')
+    reviews = Review.objects.filter(watchlist=OuterRef('pk')).order_by().values('watchlist')
+    WatchList.objects.update(**{
+        f'rating_{star}': Coalesce(Subquery(
+            reviews.filter(rating=star).annotate(total=Count('id')).values('total')
+        ), Value(0))
+        for star in range(1, 6)
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0005_watchlist_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='watchlist',
+            name='rating_1',
+            field=models.IntegerField(default=0, verbose_name='1-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='watchlist',
+            name='rating_2',
+            field=models.IntegerField(default=0, verbose_name='2-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='watchlist',
+            name='rating_3',
+            field=models.IntegerField(default=0, verbose_name='3-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='watchlist',
+            name='rating_4',
+            field=models.IntegerField(default=0, verbose_name='4-star ratings'),
+        ),
+        migrations.AddField(
+            model_name='watchlist',
+            name='rating_5',
+            field=models.IntegerField(default=0, verbose_name='5-star ratings'),
+        ),
+        migrations.RunPython(backfill_histogram, migrations.RunPython.noop),
+    ]
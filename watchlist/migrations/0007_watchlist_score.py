@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Value
+
+
+def backfill_score(apps, schema_editor):
+    WatchList = apps.get_model('watchlist', 'WatchList')
+    weight = settings.RATING_PRIOR_WEIGHT
+    WatchList.objects.filter(number_of_rating__gte=settings.LEADERBOARD_MIN_VOTES).update(
+        score=(Value(float(weight * settings.RATING_PRIOR_MEAN)) + F('rating_sum'))
+        / (Value(float(weight)) + F('number_of_rating'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0006_watchlist_rating_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='watchlist',
+            name='score',
+            field=models.FloatField(blank=True, null=True, verbose_name='Leaderboard score'),
+        ),
+        migrations.RunPython(backfill_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='watchlist',
+            index=models.Index(condition=models.Q(('active', True), ('score__isnull', False)), fields=['-score', '-id'], name='watchlist_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='watchlist',
+            index=models.Index(condition=models.Q(('active', True), ('score__isnull', False)), fields=['platform', '-score', '-id'], name='watchlist_platform_top_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, F, FloatField, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """
+    Keep the first review of each user for a movie, so the unique constraint
+    can be added, and rebuild the rating aggregates of the movies affected.
+    """
+    WatchList = apps.get_model('watchlist', 'WatchList')
+    Review = apps.get_model('watchlist', 'Review')
+    duplicates = (
+        Review.objects.order_by().values('watchlist', 'user')
+        .annotate(first=Min('id'), total=Count('id')).filter(total__gt=1)
+    )
+    affected = set()
+    for row in duplicates:
+        Review.objects.filter(watchlist=row['watchlist'], user=row['user']).exclude(pk=row['first']).delete()
+        affected.add(row['watchlist'])
+    if not affected:
+        return
+
+    reviews = Review.objects.filter(watchlist=OuterRef('pk')).order_by().values('watchlist')
+    rating_sum = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), Value(0))
+    number_of_rating = Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total')), Value(0))
+    WatchList.objects.filter(pk__in=affected).update(
+        rating_sum=rating_sum,
+        number_of_rating=number_of_rating,
+        **{
+            f'rating_{star}': Coalesce(Subquery(
+                reviews.filter(rating=star).annotate(total=Count('id')).values('total')
+            ), Value(0))
+            for star in range(1, 6)
+        },
+    )
+    weight = settings.RATING_PRIOR_WEIGHT
+    WatchList.objects.filter(pk__in=affected).update(
+        average_rating=Coalesce(Cast(F('rating_sum'), FloatField()) / NullIf(F('number_of_rating'), 0), Value(0.0)),
+        score=Case(
+            When(number_of_rating__gte=settings.LEADERBOARD_MIN_VOTES, then=(
+                (Value(float(weight * settings.RATING_PRIOR_MEAN)) + F('rating_sum'))
+                / (Value(float(weight)) + F('number_of_rating'))
+            )),
+            default=Value(None),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0007_watchlist_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('watchlist', 'user'), name='review_unique_watchlist_user'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['watchlist', 'active'], name='review_watchlist_active_idx'),
+        ),
+        # Covered by the unique constraint, whose first column it is.
+        migrations.AlterField(
+            model_name='review',
+            name='watchlist',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='watchlist.watchlist'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+# The SQL as of this migration, frozen here rather than imported from
+# watchlist.changes, so later changes there do not rewrite history.
+TRACKED_TABLES = {
+    'platform': 'watchlist_streamplatform',
+    'movie': 'watchlist_watchlist',
+}
+
+
+def change_triggers(kind, table):
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_change_insert AFTER INSERT ON {table} BEGIN
+            REPLACE INTO watchlist_change (kind, object_id, deleted) VALUES ('{kind}', new.id, 0);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_change_update AFTER UPDATE ON {table} BEGIN
+            UPDATE {table} SET updated = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = new.id AND new.updated IS old.updated;
+            REPLACE INTO watchlist_change (kind, object_id, deleted) VALUES ('{kind}', new.id, 0);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_change_delete AFTER DELETE ON {table} BEGIN
+            REPLACE INTO watchlist_change (kind, object_id, deleted) VALUES ('{kind}', old.id, 1);
+        END
+        """,
+    ]
+
+
+def forwards(apps, schema_editor):
+    # SQLite only; other databases get no change log.
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for kind, table in TRACKED_TABLES.items():
+            for statement in change_triggers(kind, table):
+                cursor.execute(statement)
+        for kind, table in TRACKED_TABLES.items():
+            cursor.execute(
+                f"INSERT OR IGNORE INTO watchlist_change (kind, object_id, deleted) "
+                f"SELECT '{kind}', id, 0 FROM {table} ORDER BY id"
+            )
+
+
+def backwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for table in TRACKED_TABLES.values():
+            for event in ('insert', 'update', 'delete'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {table}_change_{event}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0008_review_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='streamplatform',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='watchlist',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('movie', 'Movie'), ('platform', 'Platform')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='change_unique_object')],
+            },
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# The SQL as of this migration, frozen here rather than imported from
+# watchlist.changes, so later changes there do not rewrite history.
+TRACKED_TABLES = {
+    'platform': 'watchlist_streamplatform',
+    'movie': 'watchlist_watchlist',
+}
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for kind, table in TRACKED_TABLES.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_change_update")
+            cursor.execute(f"""
+                CREATE TRIGGER {table}_change_update AFTER UPDATE ON {table} BEGIN
+                    REPLACE INTO watchlist_change (kind, object_id, deleted) VALUES ('{kind}', new.id, 0);
+                END
+            """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('watchlist', '0009_change_log'),
+    ]
+
+    operations = [
+        # The update triggers no longer set ``updated``, the ORM does.
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,158 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.lookups import GreaterThanOrEqual
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class StreamPlatform(models.Model):
     name = models.CharField(max_length=30)
     about = models.CharField(max_length=150)
     website = models.URLField(max_length=100)
+    # Writes that bypass save() set it themselves, see watchlist.batch.
+    updated = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
     
+
+STARS = range(1, 6)
+
+
+def average_of(rating_sum, number_of_rating):
+    return Coalesce(Cast(rating_sum, FloatField()) / NullIf(number_of_rating, 0), Value(0.0))
+
+
+def star_at(position):
+    """
+    The star of the ``position``-th lowest rating, read off the histogram.
+    """
+    cumulative = F('rating_1')
+    cases = [When(GreaterThanOrEqual(cumulative, position), then=Value(1))]
+    for star in STARS[1:-1]:
+        cumulative = cumulative + F(f'rating_{star}')
+        cases.append(When(GreaterThanOrEqual(cumulative, position), then=Value(star)))
+    return Case(*cases, default=Value(STARS[-1]))
+
+
+def median_rating():
+    """
+    Median rating from the histogram: the middle star, or the mean of the two
+    middle stars for an even number of ratings. 0 for unrated movies, like
+    ``average_rating``.
+    """
+    lower = star_at((F('number_of_rating') + 1) / 2)
+    upper = star_at(F('number_of_rating') / 2 + 1)
+    return Case(
+        When(number_of_rating=0, then=Value(0.0)),
+        default=Cast(lower + upper, FloatField()) / 2,
+    )
+
+
+def bayesian_rating(rating_sum=F('rating_sum'), number_of_rating=F('number_of_rating')):
+    """
+    Average rating shrunk towards ``RATING_PRIOR_MEAN`` as if every movie had
+    ``RATING_PRIOR_WEIGHT`` extra ratings of that value, so a movie with two
+    five-star reviews does not outrank one with a thousand 4.8s.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (
+        (Value(float(weight * settings.RATING_PRIOR_MEAN)) + rating_sum)
+        / (Value(float(weight)) + number_of_rating)
+    )
+
+
+def leaderboard_score(rating_sum=F('rating_sum'), number_of_rating=F('number_of_rating')):
+    """
+    The stored ``score`` of a movie: its Bayesian rating once it has
+    ``LEADERBOARD_MIN_VOTES`` ratings, NULL before, which keeps it off the
+    leaderboards.
+    """
+    return Case(
+        When(GreaterThanOrEqual(number_of_rating, settings.LEADERBOARD_MIN_VOTES),
+             then=bayesian_rating(rating_sum, number_of_rating)),
+        default=Value(None),
+        output_field=FloatField(),
+    )
+
+
+class WatchListQuerySet(models.QuerySet):
+    def apply_rating_change(self, pk, added=None, removed=None):
+        """
+        Apply a review change to a movie's rating aggregates: ``added`` is the
+        rating of a new or updated review, ``removed`` the rating it replaces
+        or of a deleted review.
+
+        The running sum, count and histogram are updated and the average and
+        leaderboard score derived from them in a single UPDATE, so concurrent
+        reviews cannot overwrite each other and the rest of the row, but for
+        ``updated``, is left untouched.
+        """
+        if added == removed:
+            return 0
+        changes = {}
+        rating_sum = F('rating_sum')
+        number_of_rating = F('number_of_rating')
+        if added is not None:
+            rating_sum = rating_sum + added
+            number_of_rating = number_of_rating + 1
+            changes[f'rating_{added}'] = F(f'rating_{added}') + 1
+        if removed is not None:
+            rating_sum = rating_sum - removed
+            number_of_rating = number_of_rating - 1
+            changes[f'rating_{removed}'] = F(f'rating_{removed}') - 1
+        return self.filter(pk=pk).update(
+            rating_sum=rating_sum,
+            number_of_rating=number_of_rating,
+            average_rating=average_of(rating_sum, number_of_rating),
+            score=leaderboard_score(rating_sum, number_of_rating),
+            updated=timezone.now(),
+            **changes,
+        )
+
+    def recompute_ratings(self):
+        """
+        Rebuild the rating aggregates, histograms and leaderboard scores of
+        these movies from their reviews, with one UPDATE for the whole queryset.
+        """
+        reviews = Review.objects.filter(watchlist=OuterRef('pk')).order_by().values('watchlist')
+        rating_sum = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), Value(0))
+        number_of_rating = Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total')), Value(0))
+        histogram = {
+            f'rating_{star}': Coalesce(Subquery(
+                reviews.filter(rating=star).annotate(total=Count('id')).values('total')
+            ), Value(0))
+            for star in STARS
+        }
+        return self.update(
+            rating_sum=rating_sum,
+            number_of_rating=number_of_rating,
+            average_rating=average_of(rating_sum, number_of_rating),
+            score=leaderboard_score(rating_sum, number_of_rating),
+            updated=timezone.now(),
+            **histogram,
+        )
+
+    def with_rating_stats(self):
+        """
+        Annotate ``median_rating`` and ``bayesian_rating``, computed from the
+        stored aggregates without reading any reviews.
+        """
+        return self.annotate(median_rating=median_rating(), bayesian_rating=bayesian_rating())
+
+    def top_rated(self, platform=None):
+        """
+        Active movies on the leaderboard, best score first. The partial score
+        indexes hold exactly these rows in this order, so the first N rows
+        are an index range read however large the catalog is.
+        """
+        queryset = self.filter(active=True, score__isnull=False)
+        if platform is not None:
+            queryset = queryset.filter(platform=platform)
+        return queryset.order_by('-score', '-id')
+
     
 class WatchList(models.Model):
     title = models.CharField(max_length=50, verbose_name="Movie title")
@@ -17,21 +160,92 @@ class WatchList(models.Model):
     platform = models.ForeignKey(StreamPlatform, on_delete=models.CASCADE ,related_name="watchlist")
     average_rating = models.FloatField(default=0, verbose_name="Average rating")
     number_of_rating = models.IntegerField(default=0, verbose_name="Number of rating")
+    rating_sum = models.IntegerField(default=0, verbose_name="Sum of ratings")
+    # Rating histogram: number of reviews with each star rating.
+    rating_1 = models.IntegerField(default=0, verbose_name="1-star ratings")
+    rating_2 = models.IntegerField(default=0, verbose_name="2-star ratings")
+    rating_3 = models.IntegerField(default=0, verbose_name="3-star ratings")
+    rating_4 = models.IntegerField(default=0, verbose_name="4-star ratings")
+    rating_5 = models.IntegerField(default=0, verbose_name="5-star ratings")
+    # Leaderboard score, see leaderboard_score; NULL below the vote threshold.
+    score = models.FloatField(null=True, blank=True, verbose_name="Leaderboard score")
     active = models.BooleanField(default=True, verbose_name="Active")
     created = models.DateTimeField(auto_now_add=True)
-    
+    # Writes that bypass save(), such as rating updates, set it themselves.
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = WatchListQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination keys, see WatchListKeysetPagination
+            models.Index(fields=['created', 'id'], name='watchlist_created_id_idx'),
+            models.Index(fields=['average_rating', 'id'], name='watchlist_rating_id_idx'),
+            # Leaderboards, see WatchListQuerySet.top_rated
+            models.Index(
+                fields=['-score', '-id'], name='watchlist_top_idx',
+                condition=models.Q(active=True, score__isnull=False),
+            ),
+            models.Index(
+                fields=['platform', '-score', '-id'], name='watchlist_platform_top_idx',
+                condition=models.Q(active=True, score__isnull=False),
+            ),
+        ]
     
     def __str__(self): 
         return self.title
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'rating_{star}') for star in STARS}
     
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     rating = models.PositiveIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)], verbose_name="Rating")
     description = models.CharField(max_length=200, null=True)
-    watchlist = models.ForeignKey(WatchList, on_delete=models.CASCADE, related_name="reviews")
+    # Indexed as the leading column of the constraint and index below.
+    watchlist = models.ForeignKey(WatchList, on_delete=models.CASCADE, related_name="reviews", db_index=False)
     active = models.BooleanField(default=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # One review per user and movie; also serves lookups by movie.
+            models.UniqueConstraint(fields=['watchlist', 'user'], name='review_unique_watchlist_user'),
+        ]
+        indexes = [
+            # Review list filtered by status, see ReviewListView
+            models.Index(fields=['watchlist', 'active'], name='review_watchlist_active_idx'),
+        ]
     
     def __str__(self):
-        return str(self.rating) + "-" + str(self.watchlist.title)
\ No newline at end of file
+        return str(self.rating) + "-" + str(self.watchlist.title)
+
+
+class Change(models.Model):
+    """
+    Latest change of each movie and platform, in the order they happened.
+
+    Rows are written by database triggers, see watchlist.changes, so bulk and
+    queryset writes are recorded too. A write replaces the object's row with
+    one at the end of the sequence, so there is one row per object however
+    often it changes; a deleted object keeps a row with ``deleted`` set, its
+    tombstone.
+    """
+    MOVIE = 'movie'
+    PLATFORM = 'platform'
+
+    # AUTOINCREMENT on SQLite: sequence numbers only grow and are never reused.
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=[(MOVIE, 'Movie'), (PLATFORM, 'Platform')])
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='change_unique_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.seq} {self.kind} {self.object_id}{' deleted' if self.deleted else ''}"
@@ -1,4 +1,11 @@
-from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination, CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from watchlist.filters import RATING_STATS
 
 class WatchListPagination(PageNumberPagination):
     page_size = 5
@@ -8,3 +15,173 @@ class WatchListPagination(PageNumberPagination):
 
 class WatchListLimitOffSet(LimitOffsetPagination):
     default_limit = 5
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset`` for async views, using the async ORM.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [obj async for obj in queryset[self.offset:self.offset + self.limit]]
+
+class WatchListKeysetPagination(CursorPagination):
+    """
+    Keyset pagination for the movie list, opted into with ``?pagination=cursor``.
+    Pages filter on ``(ordering key, id)`` instead of skipping rows with OFFSET,
+    and no COUNT(*) is run. Cursors are signed, so they cannot be forged.
+    Only indexed columns are offered as keys: the median and Bayesian ratings
+    are computed per row, so every page would sort the whole table.
+    """
+    page_size = 5
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering_query_param = 'ordering'
+    orderings = ('-created', 'created', '-average_rating', 'average_rating')
+    ordering = '-created'
+    mode_query_param = 'pagination'
+    cursor_salt = 'watchlist.pagination.keyset'
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return params.get(cls.mode_query_param) == 'cursor' or cls.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset`` for async views, using the async ORM.
+        """
+        queryset = self.page_queryset(queryset, request, view)
+        return self.set_page([obj async for obj in queryset])
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        Return the query for the requested page plus one row to tell whether
+        another page follows.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            (key, reverse, position) = (self.get_ordering(request, queryset, view), False, None)
+        else:
+            (key, reverse, position) = self.cursor
+        self.ordering = key
+        self.key_field = key.lstrip('-')
+
+        # A sparse fieldset may leave the key out, but the cursor links read it.
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred and self.key_field not in loaded and self.key_field not in queryset.query.annotations:
+            queryset = queryset.only(*loaded, self.key_field)
+
+        descending = key.startswith('-') != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(prefix + self.key_field, prefix + 'id')
+
+        if position is not None:
+            value, pk = position
+            if descending:
+                # ``key <= value`` bounds the index range scan; the OR only resolves ties.
+                queryset = queryset.filter(
+                    Q(**{self.key_field + '__lte': value}),
+                    Q(**{self.key_field + '__lt': value}) | Q(id__lt=pk),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{self.key_field + '__gte': value}),
+                    Q(**{self.key_field + '__gt': value}) | Q(id__gt=pk),
+                )
+
+        self.position, self.backwards = position, reverse
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+
+        if self.backwards:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_query_param, self.ordering)
+        if ordering.lstrip('-') in RATING_STATS:
+            raise ValidationError({
+                self.ordering_query_param: f'{ordering.lstrip("-")} is only available with offset pagination.'
+            })
+        return ordering if ordering in self.orderings else self.ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Paging forward from an empty page resumes where we came from.
+            return self.encode_cursor((self.ordering, False, self.cursor[2]))
+        return self.encode_cursor((self.ordering, False, self._get_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor((self.ordering, True, self.cursor[2]))
+        return self.encode_cursor((self.ordering, True, self._get_position(self.page[0])))
+
+    def _get_position(self, instance):
+        value = getattr(instance, self.key_field)
+        if self.key_field == 'created':
+            value = value.isoformat()
+        return (value, instance.pk)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            key, reverse, position = signing.loads(encoded, salt=self.cursor_salt)
+            if key not in self.orderings:
+                raise ValueError(key)
+            value, pk = position
+            if key.lstrip('-') == 'created':
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError(position)
+            else:
+                value = float(value)
+            return (key, bool(reverse), (value, int(pk)))
+        except (signing.BadSignature, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        key, reverse, (value, pk) = cursor
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        encoded = signing.dumps([key, reverse, [value, pk]], salt=self.cursor_salt, compress=True)
+        # The cursor carries the ordering and implies cursor mode.
+        url = remove_query_param(self.base_url, self.ordering_query_param)
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
@@ -0,0 +1,19 @@
+try:
+    import msgpack
+except ImportError: # Optional, MessagePackParser is only listed in settings with it
+    msgpack = None
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses request bodies sent as ``Content-Type: application/msgpack``.
+    """
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
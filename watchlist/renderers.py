@@ -0,0 +1,60 @@
+try:
+    import orjson
+except ImportError: # Optional, JSONRenderer is used without it
+    orjson = None
+try:
+    import msgpack
+except ImportError: # Optional, MessagePackRenderer is only listed in settings with it
+    msgpack = None
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# JSONRenderer escapes these for JavaScript; orjson writes them as they are.
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson, several times faster on large lists.
+
+    Matches JSONRenderer's output with DRF's default compact, unescaped
+    settings, except for floats below 1e-4 or from 1e16 up, which orjson
+    spells differently: ``0.00001`` and ``1e16`` where JSONRenderer writes
+    ``1e-05`` and ``1e+16``. The numbers parse the same; the API's ratings
+    never fall in those ranges. Dates, decimals and other values orjson does
+    not handle natively go through DRF's encoder. Indented output, other JSON
+    settings and data orjson rejects (such as integers beyond 64 bits) fall
+    back to JSONRenderer, as does a missing orjson.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii \
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for character, escaped in LINE_SEPARATORS:
+            if character in ret:
+                ret = ret.replace(character, escaped)
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders MessagePack for clients that send ``Accept: application/msgpack``.
+
+    The data is what the JSON renderer gets. Values MessagePack has no type for
+    (dates, decimals, UUIDs) are converted as DRF's JSON encoder converts them.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
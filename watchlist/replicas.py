@@ -0,0 +1,173 @@
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    """
+    Routing decisions of one request: whether its reads must see the primary,
+    and whether it wrote anything.
+    """
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+# The state of the request being handled. It is set once per request and then
+# mutated, so writes made in a worker thread under ASGI are seen by the
+# middleware.
+current_state = ContextVar('replica_routing', default=None)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the reads made inside the block to the primary, for results that
+    outlive the request, such as shared cache entries: one filled from a
+    lagging replica would stay stale after the invalidation that caused it.
+    """
+    state = current_state.get()
+    if state is None:
+        yield
+        return
+    pinned, state.pinned = state.pinned, True
+    try:
+        yield
+    finally:
+        state.pinned = pinned or state.wrote
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random database of ``DATABASE_REPLICAS`` and everything
+    else to the primary.
+
+    Reads stay on the primary outside a request (management commands, shell),
+    inside a transaction, in requests with an unsafe method, and for clients
+    pinned by ReplicaPinMiddleware after a write, so nobody reads a replica
+    that has not caught up with their own changes yet.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        state = current_state.get()
+        if not replicas or state is None or state.pinned or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema together with the data, see replicate.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """
+    Read-your-writes for replica routing.
+
+    A request that writes to the primary keeps the client's reads on the
+    primary for ``REPLICA_PIN_SECONDS``, which must exceed the replication lag.
+    Browsers are pinned with a signed cookie, so it cannot be forged to keep
+    reads off the replicas. Token and JWT clients, which often drop cookies,
+    are pinned by their Authorization header in the ``REPLICA_PIN_CACHE``
+    cache; with a per-process cache that pin only holds within one worker.
+    Works under WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'replica_pin'
+    cookie_salt = 'watchlist.replicas.pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.start(request)
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return self.finish(request, state, response)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        token = current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return self.finish(request, state, response)
+
+    def start(self, request):
+        if request.method not in SAFE_METHODS:
+            return RoutingState(pinned=True)
+        if not settings.DATABASE_REPLICAS:
+            # Every read goes to the primary anyway.
+            return RoutingState(pinned=False)
+        cookie = request.get_signed_cookie(
+            self.cookie_name, default=None, salt=self.cookie_salt, max_age=settings.REPLICA_PIN_SECONDS
+        )
+        if cookie is not None:
+            return RoutingState(pinned=True)
+        key = self.credentials_key(request)
+        return RoutingState(pinned=key is not None and caches[settings.REPLICA_PIN_CACHE].get(key) is not None)
+
+    def finish(self, request, state, response):
+        if state.wrote:
+            response.set_signed_cookie(
+                self.cookie_name, '1', salt=self.cookie_salt,
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+            key = self.credentials_key(request)
+            if key is not None:
+                caches[settings.REPLICA_PIN_CACHE].set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def credentials_key(self, request):
+        credentials = request.META.get('HTTP_AUTHORIZATION')
+        if not credentials:
+            return None
+        return f'{self.cookie_name}:{hashlib.sha256(credentials.encode()).hexdigest()}'
+
+
+def replicate(source=DEFAULT_DB_ALIAS, replicas=None):
+    """
+    Copy the SQLite primary into each replica database with SQLite's online
+    backup, which stands in for streaming replication in local setups.
+    Readers of a replica see either the old or the new copy.
+    """
+    replicas = settings.DATABASE_REPLICAS if replicas is None else replicas
+    primary = connections[source]
+    primary.ensure_connection()
+    for alias in replicas:
+        replica = connections[alias]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise ValueError("Only SQLite databases can be replicated this way; use the database's own replication.")
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
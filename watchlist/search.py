@@ -0,0 +1,122 @@
+import re
+
+from django.db import connections
+from rest_framework import filters
+
+FTS_TABLE = 'watchlist_watchlist_fts'
+CONTENT_TABLE = 'watchlist_watchlist'
+
+# External-content FTS5 index: the virtual table stores only the inverted index
+# and reads the documents back from watchlist_watchlist by rowid.
+CREATE_FTS_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title,
+    storyline,
+    content='{CONTENT_TABLE}',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+# Only title/storyline updates touch the index, so rating updates stay cheap.
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, storyline) VALUES (new.id, new.title, new.storyline);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, storyline) VALUES ('delete', old.id, old.title, old.storyline);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF title, storyline ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, storyline) VALUES ('delete', old.id, old.title, old.storyline);
+        INSERT INTO {FTS_TABLE} (rowid, title, storyline) VALUES (new.id, new.title, new.storyline);
+    END
+    """,
+]
+
+DROP_FTS = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_fts_index(connection):
+    """
+    Create the full-text index over WatchList titles and storylines and fill it
+    from the existing rows. SQLite only; other databases keep LIKE searching.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_FTS_TABLE)
+        for statement in FTS_TRIGGERS:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_fts_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_FTS:
+            cursor.execute(statement)
+
+
+def ensure_fts_triggers(connection):
+    """
+    Recreate the sync triggers if they are missing.
+
+    SQLite migrations that alter watchlist_watchlist rebuild the table, which
+    silently drops its triggers. Row ids survive the rebuild, so the index itself
+    stays valid and only the triggers need to come back.
+    """
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in FTS_TRIGGERS:
+            cursor.execute(statement)
+
+
+def build_match_query(terms):
+    """
+    Turn free-text search terms into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix query and all words must match, which
+    mirrors the old icontains behaviour while keeping FTS syntax out of user input.
+    """
+    tokens = re.findall(r'\w+', ' '.join(terms))
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Search backend for WatchList backed by the FTS5 index.
+
+    Matches ``?search=`` against title and storyline and orders the results by
+    bm25 relevance. On databases without the index it behaves like SearchFilter
+    over the view's ``search_fields``.
+    """
+    def filter_queryset(self, request, queryset, view):
+        connection = connections[queryset.db]
+        if connection.vendor != 'sqlite':
+            return super().filter_queryset(request, queryset, view)
+
+        terms = request.query_params.get(self.search_param, '').split()
+        match = build_match_query(terms)
+        if not match:
+            return queryset
+
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {CONTENT_TABLE}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+            order_by=['search_rank', 'id'],
+        )
@@ -1,21 +1,84 @@
 from rest_framework import serializers
-from watchlist.models import WatchList, StreamPlatform, Review 
+from watchlist.models import STARS, WatchList, StreamPlatform, Review 
+from watchlist.fieldsets import SparseFieldsetMixin # ?fields= / ?exclude=
 
-class ReviewSerializer(serializers.ModelSerializer):
+RATING_COLUMNS = tuple(f'rating_{star}' for star in STARS)
+
+
+def rating_histogram(*counts):
+    return {str(star): count for star, count in zip(STARS, counts)}
+
+
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
 
     class Meta:
         model = Review
         exclude = ('watchlist',)
+        # Computed fields for RowSerializer: name -> (lookups, function)
+        row_fields = {'user': (('user__username',), str)}
         
-class WatchListSerializer(serializers.ModelSerializer): 
+class WatchListSerializer(SparseFieldsetMixin, serializers.ModelSerializer): 
     platform = serializers.CharField(source='platform.name', read_only=True)
+    # Number of reviews per star, keyed "1" to "5"
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model = WatchList
+        # The histogram columns are exposed as ``rating_histogram``
+        exclude = ('rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5')
+        # Maintained by the review endpoints, see WatchList.objects.apply_rating_change
+        read_only_fields = ('average_rating', 'number_of_rating', 'rating_sum', 'score')
+        # Columns behind computed fields, for sparse fieldset queries
+        sparse_columns = {'rating_histogram': RATING_COLUMNS}
+        # Computed fields for RowSerializer: name -> (lookups, function)
+        row_fields = {'rating_histogram': (RATING_COLUMNS, rating_histogram)}
+
+class WatchListWriteSerializer(WatchListSerializer):
+    """
+    WatchListSerializer that takes the platform as an id, for batch writes.
+
+    The ids of the platforms that exist can be passed as
+    ``context['platform_ids']``, so a batch checks all its items against one
+    query rather than one each.
+    """
+    platform = serializers.IntegerField(source='platform_id')
+
+    def validate_platform(self, value):
+        platform_ids = self.context.get('platform_ids')
+        if platform_ids is None:
+            exists = StreamPlatform.objects.filter(pk=value).exists()
+        else:
+            exists = value in platform_ids
+        if not exists:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return value
+
+class WatchListChangeSerializer(WatchListSerializer):
+    """
+    WatchListSerializer with the platform as an id, for the change feed, where
+    platforms are entries of their own.
+    """
+    platform = serializers.IntegerField(source='platform_id', read_only=True)
+
+
+class StreamPlatformChangeSerializer(serializers.ModelSerializer):
+    """
+    StreamPlatformSerializer without the nested movies, for the change feed.
+    """
+    class Meta:
+        model = StreamPlatform
         fields = "__all__"
+
+
+class LeaderboardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    platform = serializers.CharField(source='platform.name', read_only=True)
+
+    class Meta:
+        model = WatchList
+        fields = ('id', 'title', 'platform', 'score', 'average_rating', 'number_of_rating')
     
-class StreamPlatformSerializer(serializers.ModelSerializer):
+class StreamPlatformSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     watchlist = WatchListSerializer(many=True, read_only=True)
 
     class Meta:
@@ -0,0 +1,19 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+from watchlist.models import WatchList, StreamPlatform
+from watchlist.cache import invalidate_movie, invalidate_platform
+
+# Reviews only reach cached payloads through the rating aggregates, so the
+# review views invalidate the movie themselves when they adjust them. A
+# post_delete receiver on Review would also stop Django from fast-deleting
+# reviews on cascades.
+
+
+@receiver([post_save, post_delete], sender=WatchList)
+def invalidate_cached_movie(sender, instance, **kwargs):
+    invalidate_movie(instance.pk, instance.platform_id)
+
+
+@receiver([post_save, post_delete], sender=StreamPlatform)
+def invalidate_cached_platform(sender, instance, **kwargs):
+    invalidate_platform(instance.pk)
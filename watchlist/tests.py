@@ -1,9 +1,68 @@
-from django.urls import reverse
+import gzip
+import json
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from concurrent.futures import ThreadPoolExecutor
+from django.urls import get_resolver, resolve, reverse
+from django.db import connection, connections, transaction
+from unittest import skipUnless
+from django.test import TransactionTestCase, RequestFactory
+from django.http import StreamingHttpResponse
+from django.core.management import call_command, CommandError
+from django.db.models import Count, Sum
+from django.core.cache import caches
+from django.conf import settings
+from django.test.utils import override_settings
 from rest_framework import status
-from rest_framework.test import APITestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory, force_authenticate
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.tokens import RefreshToken
 from watchlist.models import StreamPlatform, WatchList, Review
+from watchlist.views import ReviewCreateView, ReviewDetailView, ReviewListView, ReviewImportView
+from watchlist.cache import response_cache
+from watchlist.exports import CatalogExport
+from watchlist.metrics import MetricsRegistry, registry
+from watchlist.throttling import SharedRateThrottle, SlidingWindowStore, throttle_store
+from watchlist.rows import RowListMixin, RowSerializer
+from watchlist.renderers import FastJSONRenderer, msgpack, orjson
+from watchlist.compression import CompressionMiddleware
+from watchlist.serializers import WatchListSerializer
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+class QueryBudgetMixin:
+    """
+    Assertion helper for catching N+1 queries.
+
+    ``assertQueryBudget`` grows the dataset between requests and fails when the
+    number of SQL statements an endpoint runs changes with the result size.
+    """
+    def assertQueryBudget(self, url, grow, steps=(1, 5, 20), budget=None):
+        counts = []
+        for step in steps:
+            grow(step)
+            for alias in settings.CACHES: # Cached responses
+                caches[alias].clear()
+            throttle_store.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(queries))
+        self.assertEqual(
+            len(set(counts)), 1,
+            f"{url} ran {counts} queries as the dataset grew; the count must not depend on result size."
+        )
+        if budget is not None:
+            self.assertLessEqual(counts[0], budget, f"{url} ran {counts[0]} queries, budget is {budget}.")
+
 
 class StreamPlatformTestCase(APITestCase):
     def setUp(self) -> None:
@@ -163,4 +222,1424 @@ class ReviewTestCase(APITestCase):
     
     def test_detail_review(self):
         response = self.client.get(reverse('review-detail', args=[self.review.id]))
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class QueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self) -> None:
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        self.watchlist = WatchList.objects.create(
+            platform = self.platform,
+            title = "movies test case",
+            storyline = "test case story",
+            active = True
+        )
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.review = Review.objects.create(
+            user = self.user,
+            rating = 4,
+            description = "Not bad",
+            watchlist = self.watchlist,
+            active = True
+        )
+
+    def add_movies(self, count):
+        for _ in range(count):
+            platform = StreamPlatform.objects.create(name="Platform", about="About", website="https://example.com")
+            WatchList.objects.bulk_create([
+                WatchList(platform=platform, title="Movie", storyline="Story"),
+                WatchList(platform=self.platform, title="Movie", storyline="Story"),
+            ])
+
+    def add_reviews(self, count):
+        for _ in range(count):
+            user = User.objects.create(username=f"reviewer{User.objects.count()}")
+            Review.objects.create(user=user, rating=3, watchlist=self.watchlist)
+
+    def test_watchlist_query_budget(self):
+        self.assertQueryBudget(reverse('watch-list') + '?limit=100', self.add_movies, budget=2)
+
+    def test_movie_detail_query_budget(self):
+        self.assertQueryBudget(reverse('movie-detail', args=[self.watchlist.id]), self.add_movies, budget=1)
+
+    def test_platform_list_query_budget(self):
+        self.assertQueryBudget(reverse('platform-list'), self.add_movies, budget=2)
+
+    def test_platform_detail_query_budget(self):
+        self.assertQueryBudget(reverse('platform-detail', args=[self.platform.id]), self.add_movies, budget=2)
+
+    def test_review_list_query_budget(self):
+        self.assertQueryBudget(reverse('review-list', args=[self.watchlist.id]), self.add_reviews, budget=1)
+
+    def test_review_detail_query_budget(self):
+        self.assertQueryBudget(reverse('review-detail', args=[self.review.id]), self.add_reviews, budget=1)
+
+
+class WatchListSearchTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        self.storyline_match = WatchList.objects.create(
+            platform = self.platform,
+            title = "The Quiet Harbour",
+            storyline = "A detective returns to the harbour town"
+        )
+        self.title_match = WatchList.objects.create(
+            platform = self.platform,
+            title = "Detective Detective",
+            storyline = "Two detectives and one case"
+        )
+        WatchList.objects.create(
+            platform = self.platform,
+            title = "Space Opera",
+            storyline = "Nothing to see here"
+        )
+
+    def search(self, term):
+        response = self.client.get(reverse('watch-list'), {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie['id'] for movie in response.data['results']]
+
+    def test_search_ranks_by_relevance(self):
+        self.assertEqual(self.search('detective'), [self.title_match.id, self.storyline_match.id])
+
+    def test_search_matches_prefixes_of_every_term(self):
+        self.assertEqual(self.search('harb detec'), [self.storyline_match.id])
+
+    def test_search_ignores_fts_syntax(self):
+        self.assertEqual(self.search('"detective" OR NEAR('), [])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.storyline_match.title = "Lighthouse"
+        self.storyline_match.storyline = "A keeper alone"
+        self.storyline_match.save()
+        self.assertEqual(self.search('harbour'), [])
+        self.assertEqual(self.search('lighthouse'), [self.storyline_match.id])
+
+        self.title_match.delete()
+        self.assertEqual(self.search('detective'), [])
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        ratings = [4.5, 3.0, 4.5, 1.0, 5.0, 3.0, 3.0, 2.5, 4.5, 0.0, 3.0, 2.0]
+        self.movies = [
+            WatchList.objects.create(
+                platform = self.platform,
+                title = f"Movie {index}",
+                storyline = "test case story",
+                average_rating = rating
+            )
+            for index, rating in enumerate(ratings)
+        ]
+
+    def walk(self, url, params=None, link='next'):
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append([movie['id'] for movie in response.data['results']])
+            if not response.data[link]:
+                return pages, response
+            response = self.client.get(response.data[link])
+
+    def test_pages_follow_composite_key(self):
+        pages, _ = self.walk(reverse('watch-list'), {'pagination': 'cursor', 'ordering': '-average_rating'})
+        expected = [movie.id for movie in sorted(self.movies, key=lambda movie: (-movie.average_rating, -movie.id))]
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_links_walk_back_through_same_pages(self):
+        forward, last = self.walk(reverse('watch-list'), {'pagination': 'cursor', 'ordering': 'created', 'limit': 4})
+        backward = [forward[-1]]
+        response = self.client.get(last.data['previous'])
+        while True:
+            backward.append([movie['id'] for movie in response.data['results']])
+            if not response.data['previous']:
+                break
+            response = self.client.get(response.data['previous'])
+        self.assertEqual(backward[::-1], forward)
+        self.assertEqual(sum(forward, []), [movie.id for movie in self.movies])
+
+    def test_cursor_pages_do_not_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('watch-list'), {'pagination': 'cursor'})
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get(reverse('watch-list'), {'pagination': 'cursor'})
+        cursor = response.data['next'].split('cursor=')[1]
+        response = self.client.get(reverse('watch-list'), {'cursor': cursor[:-2] + 'xx'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_limit_offset_remains_default(self):
+        response = self.client.get(reverse('watch-list'), {'offset': 10})
+        self.assertEqual(response.data['count'], len(self.movies))
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class RatingAggregateTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.client.force_authenticate(self.user)
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        self.watchlist = WatchList.objects.create(
+            platform = self.platform,
+            title = "movies test case",
+            storyline = "test case story"
+        )
+        other = User.objects.create_user(username='other', password='other@123')
+        Review.objects.create(user=other, rating=2, watchlist=self.watchlist)
+        WatchList.objects.apply_rating_change(self.watchlist.pk, added=2)
+
+    def assertAggregates(self, rating_sum, number_of_rating):
+        self.watchlist.refresh_from_db()
+        self.assertEqual(self.watchlist.rating_sum, rating_sum)
+        self.assertEqual(self.watchlist.number_of_rating, number_of_rating)
+        self.assertEqual(self.watchlist.average_rating, rating_sum / number_of_rating if number_of_rating else 0)
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    @patch.object(ReviewDetailView, 'throttle_classes', [])
+    def test_create_update_delete_keep_aggregates(self):
+        response = self.client.post(reverse('review-create', args=[self.watchlist.id]), {'rating': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertAggregates(7, 2)
+
+        review_url = reverse('review-detail', args=[response.data['id']])
+        response = self.client.put(review_url, {'rating': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertAggregates(5, 2)
+
+        response = self.client.delete(review_url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertAggregates(2, 1)
+
+    def test_aggregate_update_leaves_other_columns_alone(self):
+        with CaptureQueriesContext(connection) as queries:
+            WatchList.objects.apply_rating_change(self.watchlist.pk, added=4)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"title"', queries[0]['sql'])
+        self.assertAggregates(6, 2)
+
+
+class RatingHistogramTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.client.force_authenticate(self.user)
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        # ratings -> median, Bayesian average with a prior of 10 ratings of 3.0
+        catalog = {
+            "Few raves": [5, 5],                 # 5.0, 3.33
+            "Many goods": [4] * 20,              # 4.0, 3.67
+            "Split": [1, 1, 5, 5, 5],            # 5.0, 3.13
+            "Even count": [2, 3, 4, 4],          # 3.5, 3.0
+            "Unrated": [],                       # 0.0, 3.0
+        }
+        self.movies = {}
+        for title, ratings in catalog.items():
+            movie = WatchList.objects.create(platform=self.platform, title=title, storyline="test case story")
+            for index, rating in enumerate(ratings):
+                author = User.objects.create_user(username=f'{title}-{index}', password='other@123')
+                Review.objects.create(user=author, rating=rating, watchlist=movie)
+            self.movies[title] = movie
+        WatchList.objects.recompute_ratings()
+
+    def histogram(self, title):
+        movie = self.movies[title]
+        movie.refresh_from_db()
+        return movie.rating_histogram
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    @patch.object(ReviewDetailView, 'throttle_classes', [])
+    def test_reviews_update_histogram(self):
+        movie = self.movies["Split"]
+        response = self.client.post(reverse('review-create', args=[movie.id]), {'rating': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.histogram("Split"), {1: 2, 2: 0, 3: 1, 4: 0, 5: 3})
+
+        review_url = reverse('review-detail', args=[response.data['id']])
+        self.client.put(review_url, {'rating': 2}, format='json')
+        self.assertEqual(self.histogram("Split"), {1: 2, 2: 1, 3: 0, 4: 0, 5: 3})
+
+        self.client.delete(review_url)
+        self.assertEqual(self.histogram("Split"), {1: 2, 2: 0, 3: 0, 4: 0, 5: 3})
+
+    def test_histogram_is_serialized(self):
+        response = self.client.get(reverse('movie-detail', args=[self.movies["Even count"].id]))
+        self.assertEqual(response.data['rating_histogram'], {'1': 0, '2': 1, '3': 1, '4': 2, '5': 0})
+        self.assertNotIn('rating_4', response.data)
+
+    def test_ordering_by_rating_stats_does_not_read_reviews(self):
+        for ordering, expected in (
+            ('-median_rating', ["Split", "Few raves", "Many goods", "Even count", "Unrated"]),
+            ('-bayesian_rating', ["Many goods", "Few raves", "Split", "Even count", "Unrated"]),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('watch-list'), {'ordering': ordering})
+            self.assertEqual([movie['title'] for movie in response.data['results']], expected)
+            self.assertFalse(any('watchlist_review' in query['sql'] for query in queries))
+
+    def test_keyset_pagination_rejects_rating_stats(self):
+        for ordering in ('-median_rating', 'bayesian_rating'):
+            response = self.client.get(reverse('watch-list'), {'pagination': 'cursor', 'ordering': ordering})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('ordering', response.data)
+
+    def test_rebuild_command(self):
+        WatchList.objects.update(rating_1=0, rating_5=0, rating_sum=0, number_of_rating=0, average_rating=0)
+        out, err = StringIO(), StringIO()
+        call_command('rebuild_ratings', '--batch-size', '2', stdout=out, stderr=err)
+        self.assertIn("Rebuilt the ratings of 5 movies.", out.getvalue())
+        # The test settings keep the per-process LocMemCache.
+        self.assertIn("restart the server", err.getvalue())
+        self.assertEqual(self.histogram("Split"), {1: 2, 2: 0, 3: 0, 4: 0, 5: 3})
+        movie = self.movies["Split"]
+        self.assertEqual((movie.rating_sum, movie.number_of_rating, movie.average_rating), (17, 5, 3.4))
+
+
+class LeaderboardTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.client.force_authenticate(self.user)
+        self.platforms = [
+            StreamPlatform.objects.create(name=name, about="Entertainment OTT", website="https://alttv.com")
+            for name in ("Alt tv", "Netflix")
+        ]
+        self.raters = [User.objects.create_user(username=f'rater{index}', password='rater@123') for index in range(8)]
+        self.movies = {}
+        # title -> platform, ratings, active
+        catalog = {
+            "Solid": (0, [4] * 8, True),
+            "Good": (0, [4, 4, 3, 4, 4], True),
+            "Too few": (0, [5, 5, 5, 5], True),
+            "Hidden": (0, [5] * 8, False),
+            "Other": (1, [5] * 6, True),
+        }
+        for title, (platform, ratings, active) in catalog.items():
+            movie = WatchList.objects.create(
+                platform=self.platforms[platform], title=title, storyline="test case story", active=active
+            )
+            for rater, rating in zip(self.raters, ratings):
+                Review.objects.create(user=rater, rating=rating, watchlist=movie)
+            self.movies[title] = movie
+        WatchList.objects.recompute_ratings()
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie['title'] for movie in response.data]
+
+    def test_boards_rank_by_score_above_threshold(self):
+        self.assertEqual(self.titles(self.client.get(reverse('top-rated'))), ["Other", "Solid", "Good"])
+        board = self.client.get(reverse('platform-top-rated', args=[self.platforms[0].id]))
+        self.assertEqual(self.titles(board), ["Solid", "Good"])
+        self.assertAlmostEqual(board.data[0]['score'], (10 * 3.0 + 32) / 18)
+        self.assertEqual(self.titles(self.client.get(reverse('top-rated'), {'limit': 1})), ["Other"])
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    @patch.object(ReviewDetailView, 'throttle_classes', [])
+    def test_reviews_move_movies_on_the_board(self):
+        movie = self.movies["Too few"]
+        response = self.client.post(reverse('review-create', args=[movie.id]), {'rating': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        board = reverse('platform-top-rated', args=[self.platforms[0].id])
+        self.assertEqual(self.titles(self.client.get(board)), ["Too few", "Solid", "Good"])
+
+        self.client.delete(reverse('review-detail', args=[response.data['id']]))
+        self.assertEqual(self.titles(self.client.get(board)), ["Solid", "Good"])
+
+    def test_board_is_read_from_the_score_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('platform-top-rated', args=[self.platforms[0].id]))
+        self.assertEqual(len(queries), 1)
+        plan = WatchList.objects.top_rated(self.platforms[0].id)[:100].explain()
+        self.assertIn('watchlist_platform_top_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_unknown_platform(self):
+        response = self.client.get(reverse('platform-top-rated', args=[9999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryPlanTestCase(APITestCase):
+    """
+    The hot queries must be served by an index: EXPLAIN QUERY PLAN may show
+    index searches and LIMITed index scans, but no full table scan and no sort.
+    """
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        self.watchlist = WatchList.objects.create(
+            platform = self.platform,
+            title = "movies test case",
+            storyline = "test case story"
+        )
+        Review.objects.create(user=self.user, rating=4, watchlist=self.watchlist)
+
+    def assertIndexed(self, queryset):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            detail = line.split(' ', 3)[-1]
+            self.assertFalse(
+                detail.startswith('SCAN ') and ' INDEX ' not in detail,
+                f"Full scan in the plan of {queryset.query}:\n{plan}"
+            )
+            self.assertNotIn('TEMP B-TREE', detail, f"Sort in the plan of {queryset.query}:\n{plan}")
+
+    def test_hot_queries_use_indexes(self):
+        reviews = Review.objects.filter(watchlist=self.watchlist.pk).select_related('user')
+        page = WatchList.objects.select_related('platform')
+        queries = {
+            'duplicate review': Review.objects.filter(watchlist=self.watchlist, user=self.user),
+            'review list': reviews,
+            'review list by status': reviews.filter(active=True),
+            'review list by author': reviews.filter(user__username='testcase'),
+            'movies by date': page.order_by('-created', '-id')[:5],
+            'movies by rating': page.order_by('average_rating', 'id')[:5],
+            'movie keyset page': page.filter(created__lte=self.watchlist.created).order_by('-created', '-id')[:6],
+            'leaderboard': WatchList.objects.top_rated()[:100],
+            'platform leaderboard': WatchList.objects.top_rated(self.platform.pk)[:100],
+        }
+        for name, queryset in queries.items():
+            with self.subTest(name):
+                self.assertIndexed(queryset)
+
+    def test_duplicate_review_is_rejected_by_constraint(self):
+        other = WatchList.objects.create(platform=self.platform, title="other", storyline="test case story")
+        self.client.force_authenticate(self.user)
+        with patch.object(ReviewCreateView, 'throttle_classes', []):
+            self.client.post(reverse('review-create', args=[other.id]), {'rating': 5}, format='json')
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse('review-create', args=[other.id]), {'rating': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(any(query['sql'].startswith('SELECT') and 'watchlist_review' in query['sql'] for query in queries))
+        other.refresh_from_db()
+        self.assertEqual((other.rating_sum, other.number_of_rating), (5, 1))
+
+
+class DatabaseProfileTestCase(TransactionTestCase):
+    def test_new_connections_get_pragmas(self):
+        connection.close()
+        with connection.cursor() as cursor:
+            for name, expected in (('journal_mode', 'wal'), ('synchronous', 1), ('busy_timeout', 5000)):
+                self.assertEqual(cursor.execute(f'PRAGMA {name}').fetchone()[0], expected)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTestCase(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self) -> None:
+        platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        self.watchlist = WatchList.objects.create(platform=platform, title="Replicated", storyline="test case story")
+        self.author = User.objects.create_user(username='author', password='author@123')
+        self.other = User.objects.create_user(username='other', password='other@123')
+        call_command('sync_replica', stdout=StringIO())
+        caches['responses'].clear()
+
+    def reviews(self, client):
+        response = client.get(reverse('review-list', args=[self.watchlist.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [review['user'] for review in response.data]
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    @patch.object(ReviewListView, 'throttle_classes', [])
+    def test_writer_reads_own_writes_until_replica_catches_up(self):
+        writer, reader = APIClient(), APIClient()
+        writer.force_authenticate(self.author)
+        reader.force_authenticate(self.other)
+
+        response = writer.post(reverse('review-create', args=[self.watchlist.id]), {'rating': 4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.cookies['replica_pin']['max-age'], settings.REPLICA_PIN_SECONDS)
+
+        # The writer is pinned to the primary; everyone else reads the stale replica.
+        self.assertEqual(self.reviews(writer), ['author'])
+        self.assertEqual(self.reviews(reader), [])
+
+        call_command('sync_replica', stdout=StringIO())
+        self.assertEqual(self.reviews(reader), ['author'])
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    @patch.object(ReviewListView, 'throttle_classes', [])
+    def test_token_clients_are_pinned_without_cookies(self):
+        writer = APIClient()
+        writer.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.author).access_token}')
+        response = writer.post(reverse('review-create', args=[self.watchlist.id]), {'rating': 4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        writer.cookies.clear()
+        self.assertEqual(self.reviews(writer), ['author'])
+
+    @patch.object(ReviewListView, 'throttle_classes', [])
+    def test_forged_pin_cookie_is_ignored(self):
+        Review.objects.create(watchlist=self.watchlist, user=self.author, rating=4)
+        reader = APIClient()
+        reader.force_authenticate(self.other)
+        reader.cookies['replica_pin'] = '1'
+        self.assertEqual(self.reviews(reader), [])
+
+    def test_cache_fills_read_the_primary(self):
+        # The save invalidates the cached payload, but the replica lags behind.
+        self.watchlist.title = "Renamed"
+        self.watchlist.save()
+        response = self.client.get(reverse('movie-detail', args=[self.watchlist.id]))
+        self.assertEqual(response.data['title'], "Renamed")
+
+    def test_request_reads_go_to_replica(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('watch-list'))
+        self.assertEqual(response.data['count'], 1)
+        self.assertNotIn('replica_pin', response.cookies)
+        self.assertEqual((len(primary), len(replica)), (0, 2))
+        # Outside a request, e.g. in management commands, reads use the primary.
+        self.assertEqual(WatchList.objects.all().db, 'default')
+
+
+class CatalogExportTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.staff = User.objects.create_user(username='staff', password='staff@123', is_staff=True)
+        self.client.force_authenticate(self.staff)
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        self.movies = [
+            WatchList.objects.create(platform=self.platform, title=f"Movie {index}", storyline="test case story")
+            for index in range(7)
+        ]
+        WatchList.objects.apply_rating_change(self.movies[0].pk, added=4)
+
+    def export(self, **params):
+        response = self.client.get(reverse('catalog-export'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_streams_every_movie_in_chunks(self):
+        with patch.object(CatalogExport, 'chunk_size', 3), CaptureQueriesContext(connection) as queries:
+            rows = [json.loads(line) for line in self.export(include='platform,ratings').decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [movie.id for movie in self.movies])
+        self.assertEqual(rows[0]['platform'], "Alt tv")
+        self.assertEqual((rows[0]['average_rating'], rows[0]['rating_4']), (4.0, 1))
+        # One keyset query per chunk, never a COUNT.
+        self.assertEqual(len(queries), 3)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+    def test_csv_resumes_after_since_id(self):
+        lines = self.export(output='csv', since_id=self.movies[4].id).decode().splitlines()
+        self.assertEqual(lines[0], 'id,title,storyline,platform_id,active,created')
+        self.assertEqual([int(line.split(',')[0]) for line in lines[1:]], [movie.id for movie in self.movies[5:]])
+
+    def test_gzip(self):
+        response = self.client.get(reverse('catalog-export'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(len(body.splitlines()), len(self.movies))
+
+    def test_invalid_parameters_and_permissions(self):
+        for params in ({'output': 'xml'}, {'include': 'reviews'}, {'since_id': '-1'}):
+            self.assertEqual(self.client.get(reverse('catalog-export'), params).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(User.objects.create_user(username='user', password='user@123'))
+        self.assertEqual(self.client.get(reverse('catalog-export')).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SparseFieldsetTestCase(APITestCase):
+    def setUp(self) -> None:
+        caches['responses'].clear()
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        self.movies = [
+            WatchList.objects.create(platform=self.platform, title=f"Movie {index}", storyline="test case story")
+            for index in range(3)
+        ]
+        Review.objects.create(watchlist=self.movies[0], user=self.user, rating=4, description="Great")
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.sql = ' '.join(query['sql'] for query in queries)
+        self.queries = len(queries)
+        return response.json()
+
+    def test_fields_select_columns(self):
+        data = self.get(reverse('watch-list') + '?fields=id,title')
+        self.assertEqual([list(movie) for movie in data['results']], [['id', 'title']] * 3)
+        self.assertNotIn('storyline', self.sql)
+        self.assertNotIn('watchlist_streamplatform', self.sql)
+
+        data = self.get(reverse('movie-detail', args=[self.movies[0].id]) + '?fields=title,platform,rating_histogram')
+        self.assertEqual(data, {'platform': "Alt tv", 'title': "Movie 0", 'rating_histogram': {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0}})
+        self.assertNotIn('storyline', self.sql)
+
+        data = self.get(reverse('review-list', args=[self.movies[0].id]) + '?fields=user,rating')
+        self.assertEqual(data, [{'user': 'testcase', 'rating': 4}])
+        self.assertNotIn('description', self.sql)
+
+    def test_exclude_keeps_keyset_pagination_working(self):
+        data = self.get(reverse('watch-list') + '?exclude=storyline,created&pagination=cursor&limit=2')
+        self.assertNotIn('storyline', data['results'][0])
+        self.assertNotIn('created', data['results'][0])
+        self.assertNotIn('storyline', self.sql)
+        following = self.client.get(data['next']).json()
+        self.assertEqual([movie['title'] for movie in data['results'] + following['results']], ["Movie 2", "Movie 1", "Movie 0"])
+
+    def test_nested_fields(self):
+        data = self.get(reverse('platform-list') + '?fields=name,watchlist.title')
+        self.assertEqual(data, [{'watchlist': [{'title': f"Movie {index}"} for index in range(3)], 'name': "Alt tv"}])
+        self.assertNotIn('storyline', self.sql)
+        self.assertNotIn('website', self.sql)
+
+        data = self.get(reverse('platform-detail', args=[self.platform.id]) + '?exclude=watchlist')
+        self.assertEqual(set(data), {'id', 'name', 'about', 'website', 'updated'})
+        self.assertEqual(self.queries, 1) # No movie prefetch
+
+    def test_sparse_reads_use_cached_payloads(self):
+        url = reverse('platform-detail', args=[self.platform.id])
+        full = self.get(url)
+        data = self.get(url + '?fields=id,watchlist.id&exclude=watchlist.storyline')
+        self.assertEqual(self.queries, 0)
+        self.assertEqual(data, {'id': full['id'], 'watchlist': [{'id': movie['id']} for movie in full['watchlist']]})
+
+        # Sparse payloads are not cached, so invalidation covers them.
+        WatchList.objects.filter(pk=self.movies[0].pk).update(title="Bulk")
+        response_cache.bump('platform')
+        self.assertEqual(self.get(url + '?fields=watchlist.title')['watchlist'][0]['title'], "Bulk")
+
+    def test_writes_ignore_fields(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.put(
+            reverse('movie-detail', args=[self.movies[0].id]) + '?fields=title',
+            {'title': 'Renamed', 'storyline': 'New story', 'active': True},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['storyline'], 'New story')
+
+
+class FastReadPathTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        self.users = [User.objects.create_user(username=f'rater{index}', password='rater@123') for index in range(3)]
+        for index in range(4):
+            movie = WatchList.objects.create(
+                platform=self.platform, title=f"Movie {index} \u00e9\u2028", storyline="test case story", active=index != 2
+            )
+            for user in self.users[:index]:
+                Review.objects.create(watchlist=movie, user=user, rating=index + 1, description=None if index % 2 else "Good")
+        WatchList.objects.recompute_ratings()
+        self.movie = movie
+
+    def compared_urls(self):
+        return [
+            reverse('watch-list'),
+            reverse('watch-list') + '?limit=2&offset=1&ordering=-bayesian_rating',
+            reverse('watch-list') + '?search=movie&fields=id,title,rating_histogram',
+            reverse('review-list', args=[self.movie.id]),
+            reverse('review-list', args=[self.movie.id]) + '?exclude=description',
+        ]
+
+    @patch.object(ReviewListView, 'throttle_classes', [])
+    def test_output_matches_serializers(self):
+        for url in self.compared_urls():
+            with CaptureQueriesContext(connection) as queries:
+                fast = self.client.get(url, HTTP_ACCEPT='application/json')
+            # Only the serialized columns of related rows are read.
+            self.assertNotIn('"website"', queries[-1]['sql'])
+            self.assertNotIn('"password"', queries[-1]['sql'])
+            with patch.object(RowListMixin, 'get_row_serializer', lambda view: None), patch('watchlist.renderers.orjson', None):
+                expected = self.client.get(url, HTTP_ACCEPT='application/json')
+            self.assertEqual(fast.status_code, status.HTTP_200_OK)
+            self.assertEqual(fast.content, expected.content, url)
+
+    def test_every_row_list_view_is_compared(self):
+        # The fast path turns on whenever a serializer compiles, so every view
+        # using it must be in test_output_matches_serializers.
+        def views(patterns):
+            for pattern in patterns:
+                if hasattr(pattern, 'url_patterns'):
+                    yield from views(pattern.url_patterns)
+                else:
+                    yield pattern.name, getattr(pattern.callback, 'view_class', None)
+
+        fast = {name for name, view in views(get_resolver().url_patterns) if view and issubclass(view, RowListMixin)}
+        compared = {resolve(url.partition('?')[0]).url_name for url in self.compared_urls()}
+        self.assertEqual(fast, compared)
+
+    def test_unsupported_fields_use_the_serializer(self):
+        class MethodSerializer(WatchListSerializer):
+            title = serializers.SerializerMethodField()
+
+            def get_title(self, movie):
+                return movie.title.upper()
+
+        self.assertIsNone(RowSerializer.for_serializer(MethodSerializer()))
+        self.assertIsNotNone(RowSerializer.for_serializer(WatchListSerializer()))
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            'created': self.movie.created, 'text': "line\u2028break \u00e9", 'rating': 3.5,
+            'big': 2 ** 70, 'nested': [{'a': None, 'b': True}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2'),
+        )
+
+    @skipUnless(orjson, "orjson is not installed")
+    def test_renderer_spells_extreme_floats_differently(self):
+        data = [1e-05, 1e16, 0.0001, 3.4]
+        self.assertEqual(FastJSONRenderer().render(data), b'[0.00001,1e16,0.0001,3.4]')
+        self.assertEqual(JSONRenderer().render(data), b'[1e-05,1e+16,0.0001,3.4]')
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), data)
+
+
+class CompressionTestCase(APITestCase):
+    def setUp(self) -> None:
+        caches['responses'].clear()
+        self.platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        for index in range(20):
+            WatchList.objects.create(platform=self.platform, title=f"Movie {index}", storyline="test case story")
+
+    def test_large_payloads_are_compressed(self):
+        plain = self.client.get(reverse('platform-list'), HTTP_ACCEPT='application/json')
+        compressed = self.client.get(reverse('platform-list'), HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+        self.assertEqual(int(compressed['Content-Length']), len(compressed.content))
+        self.assertLess(len(compressed.content), len(plain.content))
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+
+    def test_small_html_and_refused_payloads_are_not(self):
+        small = self.client.get(reverse('movie-detail', args=[WatchList.objects.first().id]), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        html = self.client.get(reverse('platform-list'), HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(html.has_header('Content-Encoding'))
+        refused = self.client.get(reverse('platform-list'), HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(refused.has_header('Content-Encoding'))
+
+    def test_streams_are_compressed_chunk_by_chunk(self):
+        chunks = [json.dumps({'id': index, 'title': f"Movie {index}"}).encode() + b'\n' for index in range(100)]
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+
+        async def astream():
+            for chunk in chunks:
+                yield chunk
+
+        middleware = CompressionMiddleware(lambda request: StreamingHttpResponse(iter(chunks), content_type='application/x-ndjson'))
+        response = middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+        async def get_response(request):
+            return StreamingHttpResponse(astream(), content_type='application/x-ndjson')
+
+        async def consume():
+            response = await CompressionMiddleware(get_response)(request)
+            return b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(gzip.decompress(async_to_sync(consume)()), b''.join(chunks))
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    def test_messagepack_is_negotiated(self):
+        expected = self.client.get(reverse('platform-list'), HTTP_ACCEPT='application/json').json()
+        response = self.client.get(reverse('platform-list'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+        self.client.force_authenticate(User.objects.create_user(username='testcase', password='testcase@123'))
+        movie = WatchList.objects.first()
+        response = self.client.post(
+            reverse('review-create', args=[movie.id]),
+            msgpack.packb({'rating': 4, 'description': "Packed"}),
+            content_type='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Review.objects.get(watchlist=movie).description, "Packed")
+        response = self.client.post(reverse('review-create', args=[movie.id]), b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConcurrentReviewTestCase(TransactionTestCase):
+    """
+    Posts reviews from many threads at once, each with its own database
+    connection, and checks that no aggregate update is lost.
+    """
+    threads = 4
+    users = 1000
+
+    def setUp(self) -> None:
+        platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        self.watchlists = WatchList.objects.bulk_create([
+            WatchList(platform=platform, title="Contended", storyline="First"),
+            WatchList(platform=platform, title="Contended", storyline="Second"),
+        ])
+        User.objects.bulk_create([User(username=f"stress{index}") for index in range(self.users)])
+        self.posts = [
+            (user, watchlist.pk, (user.pk + watchlist.pk) % 5 + 1)
+            for user in User.objects.all()
+            for watchlist in self.watchlists
+        ]
+
+    def post_reviews(self, posts):
+        client = APIClient()
+        try:
+            for user, watchlist_pk, rating in posts:
+                client.force_authenticate(user)
+                response = client.post(reverse('review-create', args=[watchlist_pk]), {'rating': rating}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        finally:
+            connection.close()
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    def test_concurrent_posts_keep_exact_aggregates(self):
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            batches = [self.posts[index::self.threads] for index in range(self.threads)]
+            for future in [executor.submit(self.post_reviews, batch) for batch in batches]:
+                future.result()
+
+        for watchlist in WatchList.objects.all():
+            ratings = [rating for _, watchlist_pk, rating in self.posts if watchlist_pk == watchlist.pk]
+            self.assertEqual(watchlist.number_of_rating, len(ratings))
+            self.assertEqual(watchlist.rating_sum, sum(ratings))
+            self.assertEqual(watchlist.average_rating, sum(ratings) / len(ratings))
+
+
+class DatabaseBusyTestCase(TransactionTestCase):
+    """
+    Writes while another connection holds SQLite's write lock.
+    """
+    def setUp(self) -> None:
+        platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        self.watchlist = WatchList.objects.create(platform=platform, title="Locked", storyline="Out")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='testcase', password='testcase@123'))
+        self.holder = sqlite3.connect(connection.settings_dict['NAME'], isolation_level=None)
+        self.addCleanup(self.holder.close)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout = 20')
+        self.addCleanup(connection.close) # Back to the configured busy_timeout
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    def test_begin_is_retried_then_answered_with_503(self):
+        self.holder.execute('BEGIN IMMEDIATE')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('review-create', args=[self.watchlist.pk]), {'rating': 4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], str(settings.DATABASE_BUSY_RETRY_AFTER))
+        self.assertEqual(len([query for query in queries if query['sql'] == 'BEGIN IMMEDIATE']), settings.SQLITE_BEGIN_RETRIES + 1)
+
+        self.holder.execute('ROLLBACK')
+        response = self.client.post(reverse('review-create', args=[self.watchlist.pk]), {'rating': 4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self) -> None:
+        caches['responses'].clear()
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        self.watchlist = WatchList.objects.create(
+            platform = self.platform,
+            title = "movies test case",
+            storyline = "test case story"
+        )
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_repeated_reads_skip_the_database(self):
+        for url in [reverse('movie-detail', args=[self.watchlist.id]), reverse('platform-detail', args=[self.platform.id]), reverse('platform-list')]:
+            first = self.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                second = self.get(url)
+            self.assertEqual(len(queries), 0)
+            self.assertEqual(first, second)
+
+    def test_saves_and_deletes_invalidate(self):
+        movie_url = reverse('movie-detail', args=[self.watchlist.id])
+        platform_url = reverse('platform-detail', args=[self.platform.id])
+        self.get(movie_url)
+        self.get(platform_url)
+        self.get(reverse('platform-list'))
+
+        self.watchlist.title = "Renamed"
+        self.watchlist.save()
+        self.assertEqual(self.get(movie_url)['title'], "Renamed")
+        self.assertEqual(self.get(platform_url)['watchlist'][0]['title'], "Renamed")
+
+        WatchList.objects.create(platform=self.platform, title="Second", storyline="Story")
+        self.assertEqual(len(self.get(reverse('platform-list'))[0]['watchlist']), 2)
+
+        self.platform.name = "Renamed tv"
+        self.platform.save()
+        self.assertEqual(self.get(platform_url)['name'], "Renamed tv")
+
+        self.watchlist.delete()
+        self.assertEqual(self.client.get(movie_url).status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch.object(ReviewCreateView, 'throttle_classes', [])
+    def test_reviews_invalidate_rating_aggregates(self):
+        movie_url = reverse('movie-detail', args=[self.watchlist.id])
+        self.get(movie_url)
+        self.client.force_authenticate(self.user)
+        self.client.post(reverse('review-create', args=[self.watchlist.id]), {'rating': 4}, format='json')
+        self.assertEqual(self.get(movie_url)['average_rating'], 4.0)
+        self.assertEqual(self.get(reverse('platform-list'))[0]['watchlist'][0]['number_of_rating'], 1)
+
+    def test_bump_invalidates_namespace(self):
+        movie_url = reverse('movie-detail', args=[self.watchlist.id])
+        self.get(movie_url)
+        WatchList.objects.filter(pk=self.watchlist.pk).update(title="Bulk")
+        self.assertEqual(self.get(movie_url)['title'], "movies test case")
+        response_cache.bump('movie')
+        self.assertEqual(self.get(movie_url)['title'], "Bulk")
+
+    def test_stats_are_staff_only(self):
+        self.get(reverse('movie-detail', args=[self.watchlist.id]))
+        self.get(reverse('movie-detail', args=[self.watchlist.id]))
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        stats = self.get(reverse('cache-stats'))['movie']
+        self.assertGreaterEqual(stats['hits'], 1)
+        self.assertGreaterEqual(stats['misses'], 1)
+
+
+class ReviewImportTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.staff = User.objects.create_user(username='staff', password='staff@123', is_staff=True)
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.platform = StreamPlatform.objects.create(
+            name="Alt tv",
+            about="Entertainment OTT",
+            website="https://alttv.com"
+        )
+        self.watchlist = WatchList.objects.create(
+            platform = self.platform,
+            title = "movies test case",
+            storyline = "test case story"
+        )
+        Review.objects.create(user=self.user, rating=1, watchlist=self.watchlist)
+        WatchList.objects.apply_rating_change(self.watchlist.pk, added=1)
+
+    def feed(self):
+        lines = [
+            {"watchlist": self.watchlist.id, "username": "staff", "rating": 5, "description": "Great"},
+            {"watchlist": self.watchlist.id, "user": self.user.id, "rating": 4},
+            {"watchlist": self.watchlist.id, "username": "nobody", "rating": 3},
+            {"watchlist": 999, "user": self.user.id, "rating": 3},
+            {"watchlist": self.watchlist.id, "user": self.user.id, "rating": 9},
+        ]
+        return "\n".join([json.dumps(line) for line in lines] + ["not json", ""])
+
+    def test_import_endpoint(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.post(reverse('review-import') + '?batch_size=2', self.feed(), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['skipped'], response.data['failed']), (1, 1, 4))
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4, 5, 6])
+
+        self.watchlist.refresh_from_db()
+        self.assertEqual((self.watchlist.number_of_rating, self.watchlist.rating_sum, self.watchlist.average_rating), (2, 6, 3.0))
+
+    def test_import_skips_review_committed_during_import(self):
+        atomic = transaction.atomic
+        concurrent = []
+
+        def atomic_after_concurrent_review(*args, **kwargs):
+            # Another request reviews the movie between the importer's checks
+            # and its transaction. save() opens no transaction of its own.
+            if not concurrent:
+                concurrent.append(Review(user=self.staff, rating=2, watchlist=self.watchlist))
+                concurrent[0].save()
+            return atomic(*args, **kwargs)
+
+        self.client.force_authenticate(self.staff)
+        with patch('watchlist.importers.transaction.atomic', atomic_after_concurrent_review):
+            response = self.client.post(reverse('review-import'), self.feed(), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['skipped'], response.data['failed']), (0, 2, 4))
+        self.assertEqual(Review.objects.get(user=self.staff).rating, 2)
+
+        self.watchlist.refresh_from_db()
+        self.assertEqual((self.watchlist.number_of_rating, self.watchlist.rating_sum), (1, 1))
+
+    def test_import_without_content_length_is_rejected(self):
+        request = APIRequestFactory().post(reverse('review-import'), self.feed(), content_type='application/x-ndjson')
+        del request.META['CONTENT_LENGTH']
+        request.META['HTTP_TRANSFER_ENCODING'] = 'chunked'
+        force_authenticate(request, user=self.staff)
+        response = ReviewImportView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_411_LENGTH_REQUIRED)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_import_endpoint_is_staff_only(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('review-import'), self.feed(), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as feed:
+            feed.write(self.feed())
+            feed.flush()
+            out, err = StringIO(), StringIO()
+            call_command('import_reviews', feed.name, '--batch-size', '3', stdout=out, stderr=err)
+        self.assertIn("Created 1 reviews, skipped 1 duplicates, rejected 4 lines.", out.getvalue())
+        self.assertEqual(len(err.getvalue().splitlines()), 4)
+        self.assertEqual(Review.objects.filter(watchlist=self.watchlist).count(), 2)
+
+
+class BatchRequestTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.staff = User.objects.create_user(username='staff', password='staff@123', is_staff=True)
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        self.other = StreamPlatform.objects.create(name="Netflix", about="Streaming", website="https://netflix.com")
+        self.movies = WatchList.objects.bulk_create(
+            WatchList(platform=self.platform, title=f"movie {n}", storyline="story") for n in range(5)
+        )
+        self.client.force_authenticate(self.staff)
+
+    def test_multi_get_in_one_query(self):
+        ids = [self.movies[3].id, self.movies[0].id, self.movies[3].id, 999]
+        url = reverse('watch-list') + '?ids=' + ','.join(map(str, ids))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Unpaginated, in id order, duplicates and unknown ids left out.
+        self.assertEqual([movie['id'] for movie in response.data], [self.movies[0].id, self.movies[3].id])
+        self.assertEqual(response.data[0]['platform'], "Alt tv")
+        self.assertEqual(len([query for query in queries if 'watchlist_watchlist' in query['sql']]), 1)
+
+    def test_multi_get_rejects_bad_ids(self):
+        self.assertEqual(self.client.get(reverse('watch-list') + '?ids=1,x').status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(BATCH_MAX_ITEMS=2):
+            response = self.client.get(reverse('watch-list') + '?ids=1,2,3')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_create(self):
+        items = [
+            {"title": "new 1", "storyline": "story", "platform": self.platform.id},
+            {"title": "new 2", "storyline": "story", "platform": self.other.id, "active": False},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('watch-list-batch'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([(movie['title'], movie['platform']) for movie in response.data], [("new 1", "Alt tv"), ("new 2", "Netflix")])
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('INSERT')]), 1)
+        self.assertFalse(WatchList.objects.get(title="new 2").active)
+
+    def test_batch_create_reports_errors_per_item(self):
+        items = [
+            {"title": "new 1", "storyline": "story", "platform": self.platform.id},
+            {"title": "new 2", "platform": 999},
+            "not an object",
+        ]
+        response = self.client.post(reverse('watch-list-batch'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'storyline', 'platform'})
+        self.assertFalse(WatchList.objects.filter(title="new 1").exists())
+
+    def test_batch_create_platforms(self):
+        items = [{"name": "Hulu", "about": "Streaming", "website": "https://hulu.com"}, {"name": "Bad", "about": "x", "website": "nope"}]
+        response = self.client.post(reverse('platform-batch'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        response = self.client.post(reverse('platform-batch'), items[:1], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]['watchlist'], [])
+
+    def test_batch_update(self):
+        # Cache both platforms' payloads and the moved movie's.
+        self.client.get(reverse('platform-detail', args=[self.platform.id]))
+        self.client.get(reverse('platform-detail', args=[self.other.id]))
+        self.client.get(reverse('movie-detail', args=[self.movies[0].id]))
+
+        before = WatchList.objects.get(pk=self.movies[1].id).updated
+        items = [{"id": self.movies[0].id, "platform": self.other.id}, {"id": self.movies[1].id, "title": "renamed"}]
+        response = self.client.patch(reverse('watch-list-batch'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([movie['title'] for movie in response.data], ["movie 0", "renamed"])
+        # bulk_update skips auto_now, so the writer sets it.
+        self.assertGreater(WatchList.objects.get(pk=self.movies[1].id).updated, before)
+
+        self.assertEqual(self.client.get(reverse('movie-detail', args=[self.movies[0].id])).data['platform'], "Netflix")
+        self.assertEqual(len(self.client.get(reverse('platform-detail', args=[self.platform.id])).data['watchlist']), 4)
+        self.assertEqual(len(self.client.get(reverse('platform-detail', args=[self.other.id])).data['watchlist']), 1)
+
+    def test_batch_update_reports_errors_per_item(self):
+        items = [
+            {"id": self.movies[0].id, "title": "renamed"},
+            {"title": "no id"},
+            {"id": 999, "title": "missing"},
+            {"id": self.movies[0].id, "title": "again"},
+            {"id": self.movies[2].id, "title": "x" * 51},
+        ]
+        response = self.client.patch(reverse('watch-list-batch'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4])
+        self.assertEqual(WatchList.objects.get(pk=self.movies[0].id).title, "movie 0")
+
+    def test_batch_update_rejects_boolean_ids(self):
+        # true == 1 in Python, so a movie with id 1 must not be the one updated.
+        WatchList.objects.get_or_create(pk=1, defaults={"platform": self.platform, "title": "movie 1", "storyline": "story"})
+        items = [{"id": True, "title": "renamed"}, {"id": self.movies[2].id, "platform": True}]
+        response = self.client.patch(reverse('watch-list-batch'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 1])
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'id'})
+        self.assertNotEqual(WatchList.objects.get(pk=1).title, "renamed")
+
+    def test_batch_accepts_numeric_string_ids(self):
+        movie = self.movies[2]
+        items = [{"id": str(movie.id), "platform": str(self.platform.id), "title": "Renamed"}]
+        response = self.client.patch(reverse('watch-list-batch'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        movie.refresh_from_db()
+        self.assertEqual((movie.title, movie.platform_id), ("Renamed", self.platform.id))
+
+    def test_batch_limits_and_permissions(self):
+        self.assertEqual(self.client.post(reverse('watch-list-batch'), {"title": "x"}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(BATCH_MAX_ITEMS=1):
+            response = self.client.patch(reverse('platform-batch'), [{"id": self.platform.id}] * 2, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.post(reverse('platform-batch'), [], format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ChangeFeedTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        self.movies = [
+            WatchList.objects.create(platform=self.platform, title=f"movie {n}", storyline="story") for n in range(3)
+        ]
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+
+    def sync(self, since='0', **params):
+        response = self.client.get(reverse('changes'), {'since': since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def entries(self, data):
+        return [(change['type'], change['id'], change['deleted']) for change in data['changes']]
+
+    def test_first_sync_returns_catalog(self):
+        data = self.sync()
+        self.assertEqual(self.entries(data), [('platform', self.platform.id, False)] + [('movie', movie.id, False) for movie in self.movies])
+        self.assertFalse(data['more'])
+        movie = data['changes'][1]['data']
+        self.assertEqual((movie['title'], movie['platform']), ("movie 0", self.platform.id))
+        self.assertNotIn('watchlist', data['changes'][0]['data'])
+        self.assertEqual(self.sync(data['next'])['changes'], [])
+
+    def test_changes_since_token(self):
+        token = self.sync()['next']
+        self.movies[1].title = "renamed"
+        self.movies[1].save()
+        WatchList.objects.filter(pk=self.movies[1].pk).update(storyline="new story")
+        deleted_id = self.movies[0].id
+        self.movies[0].delete()
+
+        data = self.sync(token)
+        # One entry per object, at its latest change; deletions leave a tombstone.
+        self.assertEqual(self.entries(data), [('movie', self.movies[1].id, False), ('movie', deleted_id, True)])
+        self.assertEqual((data['changes'][0]['data']['title'], data['changes'][0]['data']['storyline']), ("renamed", "new story"))
+        self.assertIsNone(data['changes'][1]['data'])
+
+    def test_rating_changes_are_recorded_and_bump_updated(self):
+        other = StreamPlatform.objects.create(name="Netflix", about="Streaming", website="https://netflix.com")
+        other_movie = WatchList.objects.create(platform=other, title="other", storyline="story")
+        token = self.sync()['next']
+        before = WatchList.objects.get(pk=self.movies[2].pk).updated
+        # Rating aggregates are maintained with queryset updates.
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('review-create', args=[self.movies[2].id]), {"rating": 5})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertGreater(WatchList.objects.get(pk=self.movies[2].pk).updated, before)
+
+        StreamPlatform.objects.filter(pk=other.pk).delete()
+        data = self.sync(token)
+        self.assertEqual(data['changes'][0]['id'], self.movies[2].id)
+        self.assertEqual(data['changes'][0]['data']['number_of_rating'], 1)
+        # Deleting the platform deleted its movie too.
+        self.assertEqual(sorted(self.entries(data)[1:]), [('movie', other_movie.id, True), ('platform', other.id, True)])
+
+    def test_pages_follow_sequence(self):
+        seen = []
+        token, more = '0', True
+        while more:
+            data = self.sync(token, limit=3)
+            seen += self.entries(data)
+            token, more = data['next'], data['more']
+        self.assertEqual(seen, self.entries(self.sync()))
+        self.assertEqual(len(seen), 4)
+
+    def test_page_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.sync()
+        WatchList.objects.bulk_create(WatchList(platform=self.platform, title=f"more {n}", storyline="story") for n in range(20))
+        with CaptureQueriesContext(connection) as more_queries:
+            self.assertEqual(len(self.sync()['changes']), 24)
+        self.assertEqual(len(queries), len(more_queries))
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(reverse('changes'), {'since': 'abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('changes'), {'limit': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GenerateDataTestCase(APITestCase):
+    def generate(self, seed):
+        call_command('generate_data', '--platforms', '3', '--movies', '40', '--users', '25', '--mean-reviews', '4',
+                     '--seed', str(seed), '--batch-size', '16', stdout=StringIO(), stderr=StringIO())
+
+    def test_generated_aggregates_match_reviews(self):
+        self.generate(7)
+        self.assertEqual(StreamPlatform.objects.count(), 3)
+        self.assertEqual(WatchList.objects.count(), 40)
+        self.assertEqual(User.objects.count(), 25)
+        self.assertGreater(Review.objects.count(), 0)
+        for movie in WatchList.objects.annotate(total=Sum('reviews__rating'), reviews_count=Count('reviews')):
+            self.assertEqual(movie.rating_sum, movie.total or 0)
+            self.assertEqual(movie.number_of_rating, movie.reviews_count)
+            self.assertEqual(sum(movie.rating_histogram.values()), movie.reviews_count)
+        self.assertFalse(Review.objects.values('watchlist', 'user').annotate(n=Count('id')).filter(n__gt=1).exists())
+
+    def test_same_seed_generates_same_reviews(self):
+        self.generate(7)
+        first = list(Review.objects.order_by('id').values_list('rating', 'user__username'))
+        Review.objects.all().delete()
+        User.objects.all().delete()
+        self.generate(7)
+        self.assertEqual(list(Review.objects.order_by('id').values_list('rating', 'user__username')), first)
+
+    def test_seed_cannot_be_reused_on_same_database(self):
+        self.generate(7)
+        with self.assertRaises(CommandError):
+            self.generate(7)
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self) -> None:
+        registry.reset()
+        caches['responses'].clear()
+        throttle_store.clear()
+        self.staff = User.objects.create_user(username='staff', password='staff@123', is_staff=True)
+        self.platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+
+    def scrape(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('metrics'))
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode()
+
+    def test_metrics_are_staff_only(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(User.objects.create_user(username='user', password='user@123'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_requests_are_recorded_per_route(self):
+        self.client.get(reverse('platform-list'))
+        self.client.get(reverse('platform-list'))
+        self.client.get(reverse('platform-detail', args=[self.platform.id + 100]))
+        body = self.scrape()
+        self.assertIn('http_requests_total{view="platform-list",method="GET",status="200"} 2', body)
+        self.assertIn('http_requests_total{view="platform-detail",method="GET",status="404"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="platform-list",method="GET",le="+Inf"} 2', body)
+        self.assertIn('http_request_duration_seconds_count{view="platform-list",method="GET"} 2', body)
+        # The second list request is served from the response cache: only the
+        # first one's platform and prefetched movie queries are counted.
+        series = registry.snapshot()['platform-list', 'GET']
+        self.assertEqual(series['queries'], 2)
+        self.assertGreater(series['response_bytes'], 0)
+
+    def test_throttled_requests_are_counted(self):
+        for _ in range(3):
+            response = self.client.get(reverse('review-list', args=[1]))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('http_requests_throttled_total{view="review-list",method="GET"} 2', self.scrape())
+
+    def test_totals_of_other_processes_are_added(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(METRICS_DIR=directory):
+            other = MetricsRegistry()
+            other.observe('platform-list', 'GET', 200, 0.02, 3, 0.001, 100)
+            other.flush()
+            self.client.get(reverse('platform-list'))
+            body = self.scrape()
+        self.assertIn('http_requests_total{view="platform-list",method="GET",status="200"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="platform-list",method="GET",le="0.025"}', body)
+
+    def test_totals_of_exited_processes_are_kept(self):
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        total = 'http_requests_total{view="platform-list",method="GET",status="200"} %d'
+        with tempfile.TemporaryDirectory() as directory, self.settings(METRICS_DIR=directory):
+            other = MetricsRegistry()
+            other.observe('platform-list', 'GET', 200, 0.02, 3, 0.001, 100)
+            other.flush()
+            # The same totals, left behind by a process that has exited.
+            stale = Path(directory) / f'{exited.pid}-1.json'
+            stale.write_bytes((Path(directory) / other.file_name()).read_bytes())
+            self.assertIn(total % 2, self.scrape())
+            self.assertFalse(stale.exists())
+            self.assertIn(total % 2, self.scrape())
+            path = Path(directory) / other.file_name()
+            other.remove()
+            other.remove()
+            self.assertFalse(path.exists())
+            self.assertIn(total % 2, self.scrape())
+
+
+class ThrottleStoreTestCase(APITestCase):
+    def setUp(self) -> None:
+        throttle_store.clear()
+
+    def test_sliding_window_limits_requests(self):
+        hits = [throttle_store.hit('key', 3, 60, now=600 + second)[0] for second in range(5)]
+        self.assertEqual(hits, [True, True, True, False, False])
+        # Rejections are not counted: halfway through the next window half of
+        # the previous three still count, leaving room for one more request.
+        allowed, wait = throttle_store.hit('key', 3, 60, now=661)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 19.0)
+        self.assertTrue(throttle_store.hit('key', 3, 60, now=680)[0])
+        self.assertFalse(throttle_store.hit('key', 3, 60, now=681)[0])
+        # Two windows later nothing is left.
+        self.assertEqual([throttle_store.hit('key', 3, 60, now=800)[0] for _ in range(4)], [True, True, True, False])
+
+    def test_keys_are_independent(self):
+        self.assertTrue(throttle_store.hit('first', 1, 60, now=600)[0])
+        self.assertTrue(throttle_store.hit('second', 1, 60, now=600)[0])
+        self.assertFalse(throttle_store.hit('first', 1, 60, now=601)[0])
+
+    def test_concurrent_checks_never_exceed_limit(self):
+        # A separate store per thread means a separate SQLite connection, just
+        # like separate worker processes.
+        def hammer(_):
+            store = SlidingWindowStore()
+            return sum(store.hit('shared', 100, 3600, now=3600 * 1000)[0] for _ in range(25))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            allowed = sum(executor.map(hammer, range(8)))
+        self.assertEqual(allowed, 100)
+
+    def test_throttled_view_returns_retry_after(self):
+        url = reverse('review-detail', args=[1])
+        statuses = [self.client.get(url).status_code for _ in range(6)]
+        self.assertEqual(statuses, [status.HTTP_404_NOT_FOUND] * 5 + [status.HTTP_429_TOO_MANY_REQUESTS])
+        self.assertGreater(int(self.client.get(url)['Retry-After']), 0)
+
+    def test_locked_store_answers_503(self):
+        url = reverse('review-detail', args=[1])
+        blocker = sqlite3.connect(str(settings.THROTTLE_STORE_PATH), isolation_level=None)
+        blocker.execute('BEGIN IMMEDIATE')
+        try:
+            with patch.object(SharedRateThrottle, 'store', SlidingWindowStore(timeout=0)):
+                response = self.client.get(url)
+        finally:
+            blocker.execute('ROLLBACK')
+            blocker.close()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response)
+
+
+class AsyncReadPathTestCase(APITestCase):
+    def setUp(self) -> None:
+        caches['responses'].clear()
+        throttle_store.clear()
+        self.user = User.objects.create_user(username='testcase', password='testcase@123')
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.platform = StreamPlatform.objects.create(name="Alt tv", about="Entertainment OTT", website="https://alttv.com")
+        for index in range(7):
+            movie = WatchList.objects.create(platform=self.platform, title=f"Detective {index}", storyline="test case story")
+        Review.objects.create(watchlist=movie, user=self.user, rating=4, description="Great")
+
+    def async_get(self, url, **extra):
+        with self.settings(ROOT_URLCONF='IMDB.asgi_urls'):
+            return async_to_sync(self.async_client.get)(url, **extra)
+
+    @patch.object(ReviewListView, 'throttle_classes', [])
+    def test_async_reads_match_sync_views(self):
+        movie = WatchList.objects.last()
+        urls = [
+            reverse('watch-list'),
+            reverse('watch-list') + '?limit=2&offset=4',
+            reverse('watch-list') + '?search=detect',
+            reverse('watch-list') + '?pagination=cursor&limit=3',
+            reverse('movie-detail', args=[movie.id]),
+            reverse('movie-detail', args=[movie.id + 100]),
+            reverse('platform-list'),
+            reverse('platform-detail', args=[self.platform.id]),
+            reverse('review-list', args=[movie.id]),
+            reverse('review-list', args=[movie.id]) + '?active=true',
+            reverse('watch-list') + '?fields=id,title',
+            reverse('movie-detail', args=[movie.id]) + '?exclude=storyline',
+            reverse('platform-list') + '?fields=name,watchlist.title',
+        ]
+        for url in urls:
+            expected = self.client.get(url)
+            caches['responses'].clear()
+            for _ in range(2): # Cold, then from the response cache
+                response = self.async_get(url)
+                self.assertEqual(response.status_code, expected.status_code, url)
+                self.assertEqual(response.json(), expected.json(), url)
+
+    def test_async_reads_authenticate_and_throttle(self):
+        url = reverse('review-list', args=[WatchList.objects.last().id])
+        self.assertEqual(self.async_get(url, headers={'Authorization': 'Bearer ' + self.access_token}).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.async_get(url, headers={'Authorization': 'Bearer invalid'}).status_code, status.HTTP_401_UNAUTHORIZED)
+        # Anonymous review reads are limited to one a day.
+        self.assertEqual(self.async_get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.async_get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_writes_go_through_sync_views(self):
+        with self.settings(ROOT_URLCONF='IMDB.asgi_urls'):
+            response = async_to_sync(self.async_client.put)(
+                reverse('movie-detail', args=[WatchList.objects.first().id]),
+                {'title': 'Renamed', 'storyline': 'New story', 'active': True},
+                content_type='application/json',
+                headers={'Authorization': 'Bearer ' + self.access_token},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(WatchList.objects.first().title, 'Renamed')
+        self.assertEqual(self.async_get(reverse('movie-detail', args=[WatchList.objects.first().id])).json()['title'], 'Renamed')
@@ -1,7 +1,161 @@
-from rest_framework.throttling import UserRateThrottle
+import math
+import os
+import sqlite3
+import threading
+import time
 
-class ReviewCreateThrottle(UserRateThrottle):
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle, UserRateThrottle, AnonRateThrottle, ScopedRateThrottle
+
+from watchlist.db import DatabaseBusy
+
+
+class SlidingWindowStore:
+    """
+    Rate limit counters shared by every worker process through a SQLite file.
+
+    Each throttle key keeps one row with the request counts of the current and
+    the previous fixed window. The sliding-window estimate weights the previous
+    count by how much of it still overlaps the last ``duration`` seconds, so a
+    check costs one short write transaction and constant memory however high
+    the rate is. Rejected requests are not counted, like DRF's own throttles.
+
+    The database runs in WAL mode; ``BEGIN IMMEDIATE`` serializes the
+    read-modify-write of a check across threads and processes.
+    """
+    # Forget keys whose windows ended this long ago, at most once a minute per process.
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, path=None, timeout=5):
+        self._path = path
+        self._timeout = timeout
+        self._local = threading.local()
+        self._last_prune = 0.0
+
+    @property
+    def path(self):
+        return str(self._path or settings.THROTTLE_STORE_PATH)
+
+    def connect(self):
+        # One connection per thread and process; connections must not cross a fork.
+        key = (os.getpid(), self.path)
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.key == key:
+            return connection
+        connection = sqlite3.connect(self.path, timeout=self._timeout, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS throttle ('
+            ' key TEXT PRIMARY KEY,'
+            ' window INTEGER NOT NULL,'
+            ' current INTEGER NOT NULL,'
+            ' previous INTEGER NOT NULL,'
+            ' expires REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self._local.connection, self._local.key = connection, key
+        return connection
+
+    def hit(self, key, limit, duration, now=None):
+        """
+        Count a request for ``key`` if it is within ``limit`` requests per
+        ``duration`` seconds. Return ``(allowed, wait)``, where ``wait`` is the
+        number of seconds until the next request would be allowed.
+        """
+        now = time.time() if now is None else now
+        window = math.floor(now / duration)
+        elapsed = now / duration - window
+        connection = self.connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT window, current, previous FROM throttle WHERE key = ?', (key,)
+            ).fetchone()
+            current, previous = 0, 0
+            if row is not None:
+                if row[0] == window:
+                    current, previous = row[1], row[2]
+                elif row[0] == window - 1:
+                    previous = row[1]
+            allowed = previous * (1 - elapsed) + current + 1 <= limit
+            if allowed:
+                connection.execute(
+                    'INSERT INTO throttle (key, window, current, previous, expires) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (key) DO UPDATE SET window = excluded.window, current = excluded.current,'
+                    ' previous = excluded.previous, expires = excluded.expires',
+                    (key, window, current + 1, previous, (window + 2) * duration),
+                )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._maybe_prune(now)
+        if allowed:
+            return True, 0.0
+        return False, self.wait(limit, duration, window, elapsed, current, previous)
+
+    @staticmethod
+    def wait(limit, duration, window, elapsed, current, previous):
+        if current + 1 > limit:
+            # Blocked until enough of this window's count has slid out of the next one.
+            return (1 - elapsed + 1 - (limit - 1) / current) * duration
+        # Blocked until enough of the previous window's count has slid out.
+        return (1 - (limit - 1 - current) / previous - elapsed) * duration
+
+    def clear(self):
+        self.connect().execute('DELETE FROM throttle')
+
+    def _maybe_prune(self, now):
+        if now - self._last_prune < self.PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        self.connect().execute('DELETE FROM throttle WHERE expires < ?', (now,))
+
+
+throttle_store = SlidingWindowStore()
+
+
+class SharedRateThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle counting requests in the shared ``throttle_store``
+    instead of keeping a per-process history in the cache. If the store stays
+    locked past its timeout the request is answered with DatabaseBusy (503).
+    """
+    store = throttle_store
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        try:
+            allowed, self._wait = self.store.hit(self.key, self.num_requests, self.duration, self.timer())
+        except sqlite3.OperationalError as exc:
+            if 'database is locked' not in str(exc):
+                raise
+            raise DatabaseBusy() from exc
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class SharedUserRateThrottle(UserRateThrottle, SharedRateThrottle):
+    pass
+
+
+class SharedAnonRateThrottle(AnonRateThrottle, SharedRateThrottle):
+    pass
+
+
+class SharedScopedRateThrottle(ScopedRateThrottle, SharedRateThrottle):
+    pass
+
+
+class ReviewCreateThrottle(SharedUserRateThrottle):
     scope = 'review-create'
 
-class ReviewListThrottle(UserRateThrottle):
-    scope = 'review-list'
\ No newline at end of file
+class ReviewListThrottle(SharedUserRateThrottle):
+    scope = 'review-list'
@@ -2,21 +2,40 @@ from django.urls import path
 from watchlist.views import (
     WatchListView, 
     MovieDetailView,
+    WatchListBatchView,
     StreamPlatformListView, 
     StreamPlatformDetailView, 
+    StreamPlatformBatchView,
     ReviewListView,
     ReviewDetailView,
     ReviewCreateView,
+    ReviewImportView,
+    CatalogExportView,
+    ChangesView,
+    LeaderboardView,
+    PlatformLeaderboardView,
+    CacheStatsView,
+    MetricsView,
     LogoutView,
 )
 
 urlpatterns = [
     path('', WatchListView.as_view(), name='watch-list'),    
     path('<int:pk>/', MovieDetailView.as_view(), name='movie-detail'),    
+    path('batch/', WatchListBatchView.as_view(), name='watch-list-batch'),
     path('stream/', StreamPlatformListView.as_view(), name='platform-list'),    
     path('stream/<int:pk>/', StreamPlatformDetailView.as_view(), name='platform-detail'),    
+    path('stream/batch/', StreamPlatformBatchView.as_view(), name='platform-batch'),
     path('stream/<int:pk>/review-create/', ReviewCreateView.as_view(), name='review-create'), 
     path('stream/<int:pk>/review/', ReviewListView.as_view(), name='review-list'), 
     path('stream/review/<int:pk>/', ReviewDetailView.as_view(), name='review-detail'),
+    path('stream/review/import/', ReviewImportView.as_view(), name='review-import'),
+    path('export/', CatalogExportView.as_view(), name='catalog-export'),
+    path('changes/', ChangesView.as_view(), name='changes'),
+    path('top/', LeaderboardView.as_view(), name='top-rated'),
+    path('stream/<int:pk>/top/', PlatformLeaderboardView.as_view(), name='platform-top-rated'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    # No trailing slash: /metrics is the path Prometheus scrapes by default.
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path('api-auth/logout/', LogoutView.as_view(), name='logout'),
 ]
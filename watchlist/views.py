@@ -1,25 +1,60 @@
 from rest_framework import status 
+from django.conf import settings
+from django.db import transaction, IntegrityError
 from rest_framework import mixins 
 from rest_framework import generics
 from django.shortcuts import redirect
+from django.http import StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.contrib.auth import logout
 from rest_framework import permissions
 from rest_framework.views import APIView 
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from rest_framework.exceptions import ValidationError 
-from watchlist.models import WatchList, StreamPlatform, Review
-from watchlist.throttling import ReviewCreateThrottle, ReviewListThrottle
+from rest_framework.exceptions import ValidationError, NotFound
+from watchlist.models import WatchList, StreamPlatform, Review, Change
+from watchlist.throttling import ReviewCreateThrottle, ReviewListThrottle, SharedAnonRateThrottle, SharedScopedRateThrottle
 from watchlist.permissions import AdminOrReadOnly, ReviewAuthorOrReadOnly # Custom permissions 
-from rest_framework.throttling import UserRateThrottle, AnonRateThrottle, ScopedRateThrottle # Throttling
-from watchlist.serializers import WatchListSerializer, StreamPlatformSerializer, ReviewSerializer
+from watchlist.serializers import WatchListSerializer, StreamPlatformSerializer, ReviewSerializer, LeaderboardSerializer
+from watchlist.serializers import WatchListChangeSerializer, StreamPlatformChangeSerializer
+from watchlist.search import FullTextSearchFilter # Full-text search
+from watchlist.filters import RatingOrderingFilter, IdsFilter # Ordering by rating statistics, multi-get
+from watchlist.fieldsets import FieldSelection, SparseFieldsetFilter # Sparse fieldsets
+from watchlist.rows import RowListMixin # Fast read path for lists
+from watchlist.cache import response_cache, invalidate_movie # Response caching
+from watchlist.replicas import primary_reads # Read replicas
+from watchlist.importers import ReviewImporter # Bulk review ingestion
+from watchlist.batch import WatchListBatchWriter, StreamPlatformBatchWriter # Batch writes
+from watchlist.changes import ChangeFeed # Incremental sync
+from watchlist.exports import CatalogExport, INCLUDES as EXPORT_INCLUDES, ACCEPTS_GZIP, aiterate # Catalog export
+from watchlist.metrics import registry, render, PrometheusRenderer # Request metrics
 
 from django_filters.rest_framework import DjangoFilterBackend # Filtering
-from rest_framework import filters # Searching
-from watchlist.pagination import WatchListPagination, WatchListLimitOffSet # Pagination for watchlist
+from watchlist.pagination import WatchListPagination, WatchListLimitOffSet, WatchListKeysetPagination # Pagination for watchlist
 
 
-class WatchListView(generics.ListCreateAPIView):
+def cached_payload(request, view, namespace, ident, serialize):
+    """
+    Return the payload of a cached resource, ``serialize(queryset)`` building it.
+
+    Full payloads go through the response cache. A sparse fieldset is cut out
+    of the cached full payload when there is one and otherwise read with a
+    restricted queryset; it is never stored, so invalidating the resource
+    covers it too. Cache fills read the primary, see primary_reads.
+    """
+    def build():
+        with primary_reads():
+            return serialize(view.get_queryset())
+
+    selection = FieldSelection.from_request(request)
+    if not selection:
+        return response_cache.get_or_set(namespace, ident, build)
+    data = response_cache.get(namespace, ident)
+    if data is not None:
+        return selection.apply(data)
+    return serialize(SparseFieldsetFilter().filter_queryset(request, view.get_queryset(), view))
+
+class WatchListView(RowListMixin, generics.ListCreateAPIView):
     """
     View for listing and creating movies.
 
@@ -28,13 +63,30 @@ class WatchListView(generics.ListCreateAPIView):
     Attributes:
         serializer_class: The serializer class for Movie objects.
     """
-    queryset = WatchList.objects.all()
+    queryset = WatchList.objects.select_related('platform')
     serializer_class = WatchListSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title']
+    filter_backends = [IdsFilter, FullTextSearchFilter, RatingOrderingFilter, SparseFieldsetFilter]
+    search_fields = ['title', 'storyline']
+    ordering_fields = ['created', 'average_rating', 'number_of_rating', 'median_rating', 'bayesian_rating']
     pagination_class = WatchListLimitOffSet
 
+    @property
+    def paginator(self):
+        """
+        Limit/offset stays the default; ``?pagination=cursor`` switches a request
+        to keyset pagination. ``?ids=`` requests are bounded by the ids and not
+        paginated.
+        """
+        if not hasattr(self, '_paginator'):
+            if IdsFilter.is_requested(self.request):
+                self._paginator = None
+            elif WatchListKeysetPagination.is_requested(self.request):
+                self._paginator = WatchListKeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
 class MovieDetailView(APIView):
     """
     View for retrieving, updating, or deleting a movie.
@@ -46,6 +98,9 @@ class MovieDetailView(APIView):
     """
     serializer_class = WatchListSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get_queryset(self):
+        return WatchList.objects.select_related('platform')
         
     def get(self, request, pk):
         """
@@ -58,9 +113,12 @@ class MovieDetailView(APIView):
         Returns:
             Response: Serialized movie data as a JSON response or an error response in case of a not found exception.
         """
-        movie = get_object_or_404(WatchList, pk=pk)
-        serializer = self.serializer_class(movie)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def serialize(queryset):
+            movie = get_object_or_404(queryset, pk=pk)
+            return self.serializer_class(movie, context={'request': request}).data
+
+        data = cached_payload(request, self, 'movie', pk, serialize)
+        return Response(data, status=status.HTTP_200_OK)
 
     def put(self, request, pk):
         """
@@ -73,7 +131,7 @@ class MovieDetailView(APIView):
         Returns:
             Response: Serialized movie data as a JSON response after update or an error response in case of validation failure.
         """
-        movie = get_object_or_404(WatchList, pk=pk)
+        movie = get_object_or_404(self.get_queryset(), pk=pk)
         serializer = self.serializer_class(movie, data=request.data)
         if serializer.is_valid():
             serializer.save()
@@ -107,6 +165,11 @@ class StreamPlatformListView(APIView):
     """
     serializer_class = StreamPlatformSerializer
 
+    def get_queryset(self):
+        # Prefetching the reverse relation also fills each movie's platform cache,
+        # so the nested ``platform.name`` lookups do not hit the database.
+        return StreamPlatform.objects.prefetch_related('watchlist')
+
     def get(self, request):
         """
         Retrieve a list of all stream platforms.
@@ -114,9 +177,11 @@ class StreamPlatformListView(APIView):
         Returns:
             Response: A JSON response containing a list of stream platforms.
         """
-        queryset = StreamPlatform.objects.all()
-        serializer = self.serializer_class(queryset, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def serialize(queryset):
+            return self.serializer_class(queryset, many=True, context={'request': request}).data
+
+        data = cached_payload(request, self, 'platform', 'list', serialize)
+        return Response(data, status=status.HTTP_200_OK)
 
     def post(self, request):
         """
@@ -149,6 +214,9 @@ class StreamPlatformDetailView(APIView):
     """
     serializer_class = StreamPlatformSerializer
 
+    def get_queryset(self):
+        return StreamPlatform.objects.prefetch_related('watchlist')
+
     def get(self, request, pk):
         """
         Retrieve a specific stream platform.
@@ -160,9 +228,12 @@ class StreamPlatformDetailView(APIView):
         Returns:
             Response: A JSON response containing the stream platform details.
         """
-        platform = get_object_or_404(StreamPlatform, pk=pk)
-        serializer = self.serializer_class(platform,context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def serialize(queryset):
+            platform = get_object_or_404(queryset, pk=pk)
+            return self.serializer_class(platform, context={'request': request}).data
+
+        data = cached_payload(request, self, 'platform', pk, serialize)
+        return Response(data, status=status.HTTP_200_OK)
 
     def put(self, request, pk):
         """
@@ -175,7 +246,7 @@ class StreamPlatformDetailView(APIView):
         Returns:
             Response: A JSON response with the updated stream platform or validation errors.
         """
-        platform = get_object_or_404(StreamPlatform, pk=pk)
+        platform = get_object_or_404(self.get_queryset(), pk=pk)
         serializer = self.serializer_class(platform,data=request.data)
         if serializer.is_valid():
             serializer.save()
@@ -221,24 +292,23 @@ class ReviewCreateView(generics.CreateAPIView):
             None
         """
         watchlist_pk = self.kwargs['pk']
-        watchlist = WatchList.objects.get(pk=watchlist_pk)
+        watchlist = get_object_or_404(WatchList, pk=watchlist_pk)
         
         user = self.request.user
-        review = Review.objects.filter(watchlist=watchlist, user=user)
-        
-        if review.exists():
+
+        # The insert comes first so the transaction takes the write lock up front,
+        # and the aggregates are bumped in the database rather than in Python.
+        # The unique (watchlist, user) constraint rejects a second review, so no
+        # lookup is needed beforehand and concurrent duplicates cannot slip in.
+        try:
+            with transaction.atomic():
+                review = serializer.save(watchlist=watchlist, user=user)
+                WatchList.objects.apply_rating_change(watchlist.pk, added=review.rating)
+                invalidate_movie(watchlist.pk, watchlist.platform_id)
+        except IntegrityError:
             raise ValidationError('You have already reviewed this watchlist.')
-        
-        new_rating = serializer.validated_data['rating']
-        total_rating = watchlist.average_rating * watchlist.number_of_rating
-        total_rating += new_rating
-        watchlist.number_of_rating += 1
-        watchlist.average_rating = total_rating / watchlist.number_of_rating
-        
-        watchlist.save() 
-        serializer.save(watchlist=watchlist, user=user)
     
-class ReviewListView(generics.ListAPIView):
+class ReviewListView(RowListMixin, generics.ListAPIView):
     """
     API endpoint for listing and creating reviews related to a specific WatchList.
 
@@ -250,8 +320,8 @@ class ReviewListView(generics.ListAPIView):
     """
     serializer_class = ReviewSerializer
     permission_classes = [ReviewAuthorOrReadOnly]
-    throttle_classes = [ReviewListThrottle, AnonRateThrottle]
-    filter_backends = [DjangoFilterBackend]
+    throttle_classes = [ReviewListThrottle, SharedAnonRateThrottle]
+    filter_backends = [DjangoFilterBackend, SparseFieldsetFilter]
     filterset_fields = ['user__username', 'active']
 
     def get_queryset(self):
@@ -262,17 +332,238 @@ class ReviewListView(generics.ListAPIView):
             QuerySet: Reviews related to the specified WatchList.
         """
         watchlist_pk = self.kwargs['pk']
-        return Review.objects.filter(watchlist=watchlist_pk)
+        return Review.objects.filter(watchlist=watchlist_pk).select_related('user')
     
     
 class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Review.objects.all()
+    queryset = Review.objects.select_related('user', 'watchlist')
     serializer_class = ReviewSerializer
     permission_classes = [ReviewAuthorOrReadOnly]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SharedScopedRateThrottle]
     throttle_scope = 'review-detail'
+    filter_backends = [SparseFieldsetFilter]
+
+    def perform_update(self, serializer):
+        """
+        Save the review and move the movie's rating aggregates by the rating change.
+        """
+        previous_rating = serializer.instance.rating
+        with transaction.atomic():
+            review = serializer.save()
+            if review.rating != previous_rating:
+                WatchList.objects.apply_rating_change(review.watchlist_id, added=review.rating, removed=previous_rating)
+                invalidate_movie(review.watchlist_id, review.watchlist.platform_id)
+
+    def perform_destroy(self, instance):
+        """
+        Delete the review and take its rating out of the movie's aggregates.
+        """
+        with transaction.atomic():
+            instance.delete()
+            WatchList.objects.apply_rating_change(instance.watchlist_id, removed=instance.rating)
+            invalidate_movie(instance.watchlist_id, instance.watchlist.platform_id)
     
 
+class BatchWriteView(APIView):
+    """
+    Base for the batch endpoints, for staff.
+
+    POST:
+    Create every item of a JSON list. PATCH:
+    Update the objects named by each item's ``id`` with the item's other fields.
+
+    Either all items are written, in one transaction, or none are and the
+    response lists the errors of each invalid item, see BatchWriter.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    batch_writer_class = None
+
+    def post(self, request):
+        objects, errors = self.batch_writer_class().create(request.data)
+        return self.batch_response(request, objects, errors, status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        objects, errors = self.batch_writer_class().update(request.data)
+        return self.batch_response(request, objects, errors, status.HTTP_200_OK)
+
+    def batch_response(self, request, objects, errors, success_status):
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        # Read back with the list's queryset so related fields cost no query per object.
+        queryset = self.get_queryset().filter(pk__in=[obj.pk for obj in objects]).order_by('pk')
+        return Response(self.serializer_class(queryset, many=True, context={'request': request}).data, status=success_status)
+
+
+class WatchListBatchView(BatchWriteView):
+    serializer_class = WatchListSerializer
+    batch_writer_class = WatchListBatchWriter
+
+    def get_queryset(self):
+        return WatchList.objects.select_related('platform')
+
+
+class StreamPlatformBatchView(BatchWriteView):
+    serializer_class = StreamPlatformSerializer
+    batch_writer_class = StreamPlatformBatchWriter
+
+    def get_queryset(self):
+        return StreamPlatform.objects.prefetch_related('watchlist')
+
+
+class ReviewImportView(APIView):
+    """
+    API endpoint for bulk-loading reviews, for staff.
+
+    POST:
+    Stream newline-delimited JSON reviews in the request body. The body is read
+    line by line and imported in batches, see ReviewImporter. It must come with
+    a Content-Length: Django reads a chunked body without one as empty.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        """
+        Import the reviews in the request body.
+
+        Returns:
+            Response: Counts of created, skipped and rejected reviews with per-line errors.
+        """
+        batch_size = request.query_params.get('batch_size', '500')
+        if not batch_size.isdigit() or int(batch_size) < 1:
+            raise ValidationError({'batch_size': 'Must be a positive integer.'})
+        if not request.META.get('CONTENT_LENGTH'):
+            return Response({'detail': 'A Content-Length header is required.'}, status=status.HTTP_411_LENGTH_REQUIRED)
+        importer = ReviewImporter(batch_size=int(batch_size))
+        summary = importer.run(request.stream or [])
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class CatalogExportView(APIView):
+    """
+    API endpoint for exporting the whole movie catalog, for staff.
+
+    GET:
+    Stream every movie in id order, see CatalogExport. Query parameters:
+    ``output`` (``ndjson`` or ``csv``), ``include`` (comma-separated
+    ``platform`` and ``ratings``) and ``since_id`` to resume after a given id.
+    The body is gzip-compressed for clients that accept it.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        output = params.get('output', 'ndjson')
+        if output not in CatalogExport.formats:
+            raise ValidationError({'output': f"Must be one of {', '.join(CatalogExport.formats)}."})
+        include = [option for option in params.get('include', '').split(',') if option]
+        if any(option not in EXPORT_INCLUDES for option in include):
+            raise ValidationError({'include': f"Must be a comma-separated subset of {', '.join(EXPORT_INCLUDES)}."})
+        since_id = params.get('since_id', '0')
+        if not since_id.isdigit():
+            raise ValidationError({'since_id': 'Must be a non-negative integer.'})
+
+        export = CatalogExport(output, include, int(since_id))
+        gzip = bool(ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        content = export.encoded(gzip)
+        if isinstance(request._request, ASGIRequest):
+            # A synchronous iterator would be read into memory whole under ASGI.
+            content = aiterate(content)
+        response = StreamingHttpResponse(content, content_type=export.content_type)
+        response['Content-Disposition'] = f'attachment; filename="catalog.{output}"'
+        response['Vary'] = 'Accept-Encoding'
+        if gzip:
+            response['Content-Encoding'] = 'gzip'
+        return response
+
+
+class ChangesView(APIView):
+    """
+    API endpoint for syncing the catalog incrementally.
+
+    GET:
+    Movies and platforms created, updated or deleted since ``since``, the
+    ``next`` token of the previous response (``0`` for a first sync), oldest
+    first and at most ``limit`` per page. Clients ask again with the new
+    ``next`` while ``more`` is true. See ChangeFeed.
+    """
+    def get(self, request):
+        since = request.query_params.get('since', '0')
+        if not since.isdigit():
+            raise ValidationError({'since': 'Must be the next token of a previous response.'})
+        limit = request.query_params.get('limit', str(settings.CHANGES_PAGE_SIZE))
+        if not limit.isdigit() or not 1 <= int(limit) <= settings.CHANGES_PAGE_SIZE:
+            raise ValidationError({'limit': f'Must be between 1 and {settings.CHANGES_PAGE_SIZE}.'})
+
+        feed = ChangeFeed({
+            Change.MOVIE: WatchListChangeSerializer(),
+            Change.PLATFORM: StreamPlatformChangeSerializer(),
+        })
+        changes, next_seq, more = feed.page(int(since), int(limit))
+        return Response({'changes': changes, 'next': str(next_seq), 'more': more}, status=status.HTTP_200_OK)
+
+
+class LeaderboardView(generics.ListAPIView):
+    """
+    API endpoint for the best rated movies across all platforms.
+
+    GET:
+    Up to 100 active movies with at least ``LEADERBOARD_MIN_VOTES`` ratings,
+    best leaderboard score first; ``?limit=`` asks for fewer.
+
+    Scores are kept up to date as reviews are written, and the ranking is read
+    off a partial index, so a request costs the same whatever the catalog size.
+    """
+    serializer_class = LeaderboardSerializer
+    pagination_class = None
+    filter_backends = [SparseFieldsetFilter]
+    max_size = 100
+
+    def get_size(self):
+        try:
+            return min(max(int(self.request.query_params['limit']), 1), self.max_size)
+        except (KeyError, ValueError):
+            return self.max_size
+
+    def get_queryset(self):
+        return WatchList.objects.top_rated().select_related('platform')[:self.get_size()]
+
+
+class PlatformLeaderboardView(LeaderboardView):
+    """
+    API endpoint for the best rated movies of one platform, see LeaderboardView.
+    """
+    def get_queryset(self):
+        return WatchList.objects.top_rated(self.kwargs['pk']).select_related('platform')[:self.get_size()]
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Only an empty board needs the extra query to tell an unknown platform apart.
+        if not response.data and not StreamPlatform.objects.filter(pk=self.kwargs['pk']).exists():
+            raise NotFound()
+        return response
+
+
+class CacheStatsView(APIView):
+    """
+    Hit/miss counters of the response cache in this process, for staff.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats(), status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    """
+    Request metrics of all worker processes in the Prometheus text format, for staff.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request):
+        return Response(render(registry.collect()), status=status.HTTP_200_OK)
+
+
 class LogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     